@@ -0,0 +1,52 @@
+"""Add agent_contexts table with full-text search vector
+
+Revision ID: 0001_agent_contexts
+Revises:
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_agent_contexts'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases bootstrapped with create_all() may already have the table
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("agent_contexts"):
+        return
+
+    op.create_table(
+        "agent_contexts",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("agent_id", sa.String(length=255), nullable=True),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("agent_metadata", sa.JSON(), nullable=True),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', content)", persisted=True),
+            nullable=True
+        ),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index(
+        "ix_agent_contexts_search_vector", "agent_contexts", ["search_vector"], postgresql_using="gin"
+    )
+    op.create_index(
+        "ix_agent_contexts_agent_id_created_at", "agent_contexts", ["agent_id", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_agent_contexts_agent_id_created_at", table_name="agent_contexts")
+    op.drop_index("ix_agent_contexts_search_vector", table_name="agent_contexts")
+    op.drop_table("agent_contexts")
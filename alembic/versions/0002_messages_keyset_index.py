@@ -0,0 +1,37 @@
+"""Add keyset pagination index on messages
+
+Revision ID: 0002_messages_keyset_index
+Revises: 0001_agent_contexts
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_messages_keyset_index'
+down_revision = '0001_agent_contexts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Build without locking writes to a possibly large table; CONCURRENTLY needs autocommit
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_messages_conversation_id_created_at",
+            "messages",
+            ["conversation_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_messages_conversation_id_created_at",
+            table_name="messages",
+            postgresql_concurrently=True,
+            if_exists=True
+        )
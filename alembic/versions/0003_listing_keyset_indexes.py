@@ -0,0 +1,59 @@
+"""Add conversations.message_count and keyset listing indexes
+
+Revision ID: 0003_listing_keyset_indexes
+Revises: 0002_messages_keyset_index
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_listing_keyset_indexes'
+down_revision = '0002_messages_keyset_index'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_agents_is_active_created_at", "agents", ["is_active", "created_at", "id"]),
+    ("ix_conversations_created_at", "conversations", ["created_at", "id"]),
+    ("ix_conversations_agent_id_created_at", "conversations", ["agent_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    # Databases bootstrapped with create_all() may already have the column
+    has_column = not op.get_context().as_sql and "message_count" in {
+        column["name"] for column in sa.inspect(op.get_bind()).get_columns("conversations")
+    }
+    if not has_column:
+        # A constant default makes this a metadata-only change on PostgreSQL 11+
+        op.add_column(
+            "conversations",
+            sa.Column("message_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        op.execute(
+            """
+            UPDATE conversations
+            SET message_count = counts.n
+            FROM (
+                SELECT conversation_id, count(*) AS n
+                FROM messages
+                GROUP BY conversation_id
+            ) AS counts
+            WHERE conversations.id = counts.conversation_id
+            """
+        )
+
+    # Build without locking writes to possibly large tables; CONCURRENTLY needs autocommit
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.drop_column("conversations", "message_count")
@@ -0,0 +1,77 @@
+"""Store temperatures as floats and ids as native uuids
+
+Revision ID: 0004_native_column_types
+Revises: 0003_listing_keyset_indexes
+Create Date: 2026-10-16 00:00:00.000000
+
+Rewrites the agents, agent_templates, conversations and messages tables under
+an ACCESS EXCLUSIVE lock; run it in a maintenance window on large databases.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_native_column_types'
+down_revision = '0003_listing_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs holding uuids, parents before children
+UUID_COLUMNS = [
+    ("agents", "id"),
+    ("agent_templates", "id"),
+    ("conversations", "id"),
+    ("conversations", "agent_id"),
+    ("messages", "id"),
+    ("messages", "conversation_id"),
+]
+
+FOREIGN_KEYS = [
+    ("conversations_agent_id_fkey", "conversations", "agents", "agent_id"),
+    ("messages_conversation_id_fkey", "messages", "conversations", "conversation_id"),
+]
+
+
+def _drop_foreign_keys() -> None:
+    # Both sides of a foreign key must change type together
+    for name, table, _, _ in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
+
+
+def _create_foreign_keys() -> None:
+    for name, table, referent, column in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referent, [column], ["id"])
+
+
+def upgrade() -> None:
+    _drop_foreign_keys()
+    for table, column in UUID_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=postgresql.UUID(as_uuid=False),
+            postgresql_using=f"{column}::uuid"
+        )
+    _create_foreign_keys()
+
+    for table in ("agents", "agent_templates"):
+        op.alter_column(
+            table, "temperature",
+            type_=sa.Float(),
+            postgresql_using="temperature::double precision"
+        )
+
+
+def downgrade() -> None:
+    for table in ("agents", "agent_templates"):
+        op.alter_column(
+            table, "temperature",
+            type_=sa.String(length=10),
+            postgresql_using="temperature::text"
+        )
+
+    _drop_foreign_keys()
+    for table, column in UUID_COLUMNS:
+        op.alter_column(table, column, type_=sa.String(), postgresql_using=f"{column}::text")
+    _create_foreign_keys()
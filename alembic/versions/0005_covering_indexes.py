@@ -0,0 +1,67 @@
+"""Add covering agent listing index and BRIN index on messages.created_at
+
+Revision ID: 0005_covering_indexes
+Revises: 0004_native_column_types
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_covering_indexes'
+down_revision = '0004_native_column_types'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Build without locking writes to possibly large tables; CONCURRENTLY needs autocommit
+    with op.get_context().autocommit_block():
+        # Serves agent listing pages from the index alone; replaces the plain keyset index
+        op.create_index(
+            "ix_agents_listing",
+            "agents",
+            ["is_active", "created_at", "id"],
+            postgresql_include=["name", "template_name", "model", "updated_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(
+            "ix_agents_is_active_created_at",
+            table_name="agents",
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+        # Messages are appended in time order, so a block-range index stays tiny
+        op.create_index(
+            "ix_messages_created_at",
+            "messages",
+            ["created_at"],
+            postgresql_using="brin",
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_messages_created_at",
+            table_name="messages",
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+        op.create_index(
+            "ix_agents_is_active_created_at",
+            "agents",
+            ["is_active", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.drop_index(
+            "ix_agents_listing",
+            table_name="agents",
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,47 @@
+"""Optionally range-partition messages by month
+
+Revision ID: 0006_partition_messages
+Revises: 0005_covering_indexes
+Create Date: 2026-10-16 00:00:00.000000
+
+Opt-in: runs only with `alembic -x partition_messages=true upgrade head`, and
+is otherwise recorded as applied without changes. The table is copied while
+writes to messages are blocked; reads continue.
+
+To partition a database that already applied this revision without the flag,
+run `python main.py partition-messages`. It performs the same conversion and
+leaves the recorded revision alone. Downgrading past this revision with
+`-x partition_messages=true` turns a partitioned table back into a plain one,
+whichever way it was partitioned; without the flag the table is left as is.
+"""
+from alembic import context, op
+
+from microsoft_agent_framework.database.partitions import (
+    partition_messages_statements,
+    unpartition_messages_statements,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_partition_messages'
+down_revision = '0005_covering_indexes'
+branch_labels = None
+depends_on = None
+
+
+def _enabled() -> bool:
+    return context.get_x_argument(as_dictionary=True).get("partition_messages", "").lower() in ("1", "true", "yes")
+
+
+def upgrade() -> None:
+    if not _enabled():
+        return
+    for statement in partition_messages_statements(months_ahead=3):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if not _enabled():
+        return
+    for statement in unpartition_messages_statements():
+        op.execute(statement)
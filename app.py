@@ -10,9 +10,18 @@ from pydantic import BaseModel
 import json
 from contextlib import asynccontextmanager
 
-from src.microsoft_agent_framework import AgentBuilder, TeamOrchestrator
+from src.microsoft_agent_framework import AgentBuilder, TeamOrchestrator, GroqClient, ThreadCompactor
+from src.microsoft_agent_framework.core.transport import get_transport_registry, close_transports
+from src.microsoft_agent_framework.core.write_behind import flush_write_queues
+from src.microsoft_agent_framework.core.agent_cache import AgentInstanceCache, CachedAgent
 from src.microsoft_agent_framework.database import DatabaseManager, get_database, init_database
-from src.microsoft_agent_framework.database.models import Agent as AgentModel, Conversation, Message
+from src.microsoft_agent_framework.database.models import Agent as AgentModel, AgentTemplate as AgentTemplateModel, Conversation, Message, is_uuid
+from src.microsoft_agent_framework.database.history import (
+    page_messages, rehydrate_thread, save_thread_summary, summary_needs_saving
+)
+from src.microsoft_agent_framework.database.listing import page_agents, page_conversations
+from src.microsoft_agent_framework.database.message_writer import MessageWriter
+from src.microsoft_agent_framework.database.model_cache import ModelCache
 from src.microsoft_agent_framework.tools import WebTools, FileTools, CodeTools
 from src.microsoft_agent_framework.mcp import APISpecificationParser, MCPServerGenerator, get_registry
 
@@ -60,18 +69,55 @@ class DiscoverAPIsRequest(BaseModel):
     domain: str
 
 
+# Streaming frame bounds for SSE responses
+STREAM_COALESCE_MS = float(os.getenv("STREAM_COALESCE_MS", "20"))
+STREAM_COALESCE_BYTES = int(os.getenv("STREAM_COALESCE_BYTES", "64"))
+
+# Live agent instances per conversation, so threads and context survive between requests
+agent_cache = AgentInstanceCache(
+    max_agents=int(os.getenv("AGENT_CACHE_MAX_AGENTS", "256")),
+    idle_timeout=float(os.getenv("AGENT_CACHE_IDLE_SECONDS", "1800")),
+    max_bytes=int(os.getenv("AGENT_CACHE_MAX_BYTES", "0")) or None,
+    revalidate_after=float(os.getenv("AGENT_CACHE_REVALIDATE_SECONDS", "30"))
+)
+
+# History replayed into an agent rebuilt for an existing conversation; older turns
+# are covered by the conversation's rolling summary (0 tokens = no token bound)
+HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "50"))
+HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "0")) or None
+
+# Chat messages are inserted in batches off the request path
+message_writer = MessageWriter(
+    batch_size=int(os.getenv("MESSAGE_WRITE_BATCH", "200")),
+    max_delay=float(os.getenv("MESSAGE_WRITE_DELAY_MS", "50")) / 1000
+)
+
+# Agent and stored template rows, read through a TTL cache and invalidated on writes
+MODEL_CACHE_TTL = float(os.getenv("MODEL_CACHE_TTL_SECONDS", "60"))
+MODEL_CACHE_NEGATIVE_TTL = float(os.getenv("MODEL_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+agent_rows: ModelCache[AgentModel] = ModelCache(
+    AgentModel, ttl=MODEL_CACHE_TTL, negative_ttl=MODEL_CACHE_NEGATIVE_TTL
+)
+template_rows: ModelCache[AgentTemplateModel] = ModelCache(
+    AgentTemplateModel, key_column=AgentTemplateModel.name,
+    ttl=MODEL_CACHE_TTL, negative_ttl=MODEL_CACHE_NEGATIVE_TTL
+)
+
+
 # Global variables
+groq_client: Optional[GroqClient] = None
 agent_builder: Optional[AgentBuilder] = None
 team_orchestrator: Optional[TeamOrchestrator] = None
 web_tools: Optional[WebTools] = None
 file_tools: Optional[FileTools] = None
 code_tools: Optional[CodeTools] = None
+thread_compactor: Optional[ThreadCompactor] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    global agent_builder, team_orchestrator, web_tools, file_tools, code_tools
+    global groq_client, agent_builder, team_orchestrator, web_tools, file_tools, code_tools, thread_compactor
     
     # Startup
     print("🚀 Starting Microsoft Agent Framework...")
@@ -85,11 +131,14 @@ async def lifespan(app: FastAPI):
         print("🔄 Continuing without database (will retry on first request)")
     
     # Initialize agent builder and tools
-    agent_builder = AgentBuilder()
-    team_orchestrator = TeamOrchestrator()
+    groq_client = GroqClient()
+    agent_builder = AgentBuilder(groq_client)
+    team_orchestrator = TeamOrchestrator(groq_client)
     web_tools = WebTools()
     file_tools = FileTools()
     code_tools = CodeTools()
+    # Summarize conversations before their oldest turns fall out of the rehydration window
+    thread_compactor = ThreadCompactor(groq_client, max_messages=HISTORY_MAX_MESSAGES)
     
     # Register tools
     agent_builder.register_tool("fetch_url", web_tools.fetch_url, "Fetch content from a URL")
@@ -104,12 +153,20 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("🛑 Shutting down Microsoft Agent Framework...")
+    # Persist queued context and message writes while providers and the database are still open
+    await agent_cache.close()
+    await flush_write_queues()
+    
     if web_tools:
         await web_tools.close()
     
     if agent_builder:
         await agent_builder.cleanup()
     
+    if groq_client:
+        await groq_client.aclose()
+    await close_transports()
+    
     db = get_database()
     await db.close()
     print("✅ Cleanup completed")
@@ -172,6 +229,35 @@ async def health_check():
     return health_status
 
 
+@app.get("/metrics/groq")
+async def groq_metrics():
+    """Connection pool and rate limiter statistics for the shared Groq transports."""
+    return {
+        "transports": get_transport_registry().pool_stats(),
+        "rate_limiter": groq_client.get_rate_limit_metrics() if groq_client else None,
+        "completion_cache": groq_client.get_cache_stats() if groq_client else None
+    }
+
+
+@app.get("/metrics/db")
+async def database_metrics():
+    """Database connection pool occupancy, checkout wait times and message writer backlog."""
+    return {
+        "pool": get_database().get_pool_stats(),
+        "message_writer": message_writer.get_stats()
+    }
+
+
+@app.get("/metrics/agents")
+async def agent_cache_metrics():
+    """Live agent instance cache and agent/template row cache statistics."""
+    return {
+        **agent_cache.get_stats(),
+        "agent_rows": agent_rows.get_stats(),
+        "template_rows": template_rows.get_stats()
+    }
+
+
 @app.get("/templates")
 async def list_templates():
     """List available agent templates."""
@@ -189,8 +275,22 @@ async def create_agent(request: CreateAgentRequest):
         raise HTTPException(status_code=500, detail="Agent builder not initialized")
     
     try:
+        # Templates not built into the builder may be stored in the database
+        stored_template = None
+        if request.template_name and not agent_builder.get_template(request.template_name):
+            stored_template = await template_rows.get(request.template_name)
+        
         # Create agent using builder
-        if request.template_name:
+        if stored_template is not None:
+            agent = agent_builder.create_custom_agent(
+                name=request.name,
+                instructions=request.instructions or stored_template.instructions,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+                tools=request.tools or stored_template.tools
+            )
+        elif request.template_name:
             agent = agent_builder.create_agent_from_template(
                 template_name=request.template_name,
                 name=request.name,
@@ -220,56 +320,161 @@ async def create_agent(request: CreateAgentRequest):
                 template_name=request.template_name,
                 instructions=agent.config.instructions,
                 model=agent.config.model or "llama3-70b-8192",
-                temperature=str(agent.config.temperature or 0.7),
+                temperature=agent.config.temperature or 0.7,
                 max_tokens=agent.config.max_tokens or 4096,
                 tools=request.tools or [],
                 metadata=agent.config.metadata
             )
             session.add(db_agent)
             await session.flush()
-            
-            return {
-                "agent_id": db_agent.id,
-                "name": db_agent.name,
-                "template_name": db_agent.template_name,
-                "message": "Agent created successfully"
-            }
+        agent_rows.invalidate(db_agent.id)
+        
+        return {
+            "agent_id": db_agent.id,
+            "name": db_agent.name,
+            "template_name": db_agent.template_name,
+            "message": "Agent created successfully"
+        }
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/agents")
-async def list_agents():
-    """List all agents."""
+async def list_agents(limit: int = 50, after: Optional[str] = None):
+    """List agent summaries, oldest first.
+    
+    Pass the returned `next_cursor` as `after` to fetch the next page; full
+    details are served by `GET /agents/{agent_id}`.
+    """
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    
     db = get_database()
     async with db.get_session() as session:
-        from sqlalchemy import select
-        result = await session.execute(
-            select(AgentModel).where(AgentModel.is_active == True)
-        )
-        agents = result.scalars().all()
-        
-        return {
-            "agents": [agent.to_dict() for agent in agents]
-        }
+        try:
+            agents, next_cursor = await page_agents(session, limit=limit, after=after)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "agents": agents,
+        "next_cursor": next_cursor
+    }
 
 
 @app.get("/agents/{agent_id}")
 async def get_agent(agent_id: str):
     """Get agent details."""
+    agent = await agent_rows.get(agent_id) if is_uuid(agent_id) else None
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    return agent.to_dict()
+
+
+async def _load_agent_row(session, agent_id: str) -> AgentModel:
+    """Get an agent row through the row cache or raise 404."""
+    db_agent = await agent_rows.get(agent_id, session) if is_uuid(agent_id) else None
+    if not db_agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return db_agent
+
+
+async def _get_cached_agent(session, agent_id: str, conversation_id: str, db_agent: Optional[AgentModel] = None) -> CachedAgent:
+    """Get the live agent for a conversation, building and rehydrating it on a cold miss.
+    
+    Pass `db_agent` for a conversation created in this request; otherwise the
+    conversation must already exist and belong to the agent, and its latest
+    messages plus stored summary are replayed into the new agent's thread.
+    """
+    from sqlalchemy import select
+    
+    async def build():
+        row = db_agent or await _load_agent_row(session, agent_id)
+        agent = agent_builder.create_custom_agent(
+            name=row.name,
+            instructions=row.instructions,
+            model=row.model,
+            temperature=row.temperature,
+            max_tokens=row.max_tokens,
+            tools=row.tools
+        )
+        agent.compactor = thread_compactor
+        if db_agent is None:
+            result = await session.execute(
+                select(Conversation).where(
+                    Conversation.id == conversation_id,
+                    Conversation.agent_id == agent_id
+                )
+            )
+            conversation = result.scalar_one_or_none()
+            if conversation is None:
+                raise HTTPException(status_code=404, detail="Conversation not found")
+            # Make the conversation's queued messages visible before replaying it
+            await message_writer.flush()
+            await rehydrate_thread(
+                session, agent.thread, conversation,
+                max_messages=HISTORY_MAX_MESSAGES,
+                max_tokens=HISTORY_MAX_TOKENS
+            )
+        return agent, row.updated_at
+    
+    async def current_version():
+        row = await agent_rows.get(agent_id, session)
+        return row.updated_at if row else None
+    
+    return await agent_cache.get_or_create(agent_id, conversation_id, build, current_version)
+
+
+async def _start_conversation(session, agent_id: str) -> CachedAgent:
+    """Create a conversation for an agent and cache a fresh agent instance for it."""
+    db_agent = await _load_agent_row(session, agent_id)
+    conversation = Conversation(
+        agent_id=agent_id,
+        title=f"Chat with {db_agent.name}"
+    )
+    session.add(conversation)
+    await session.flush()
+    return await _get_cached_agent(session, agent_id, conversation.id, db_agent)
+
+
+async def _open_turn(agent_id: str, conversation_id: Optional[str], message: str) -> CachedAgent:
+    """Resolve the conversation's live agent and queue the user message.
+    
+    The database session is released before returning, so no connection is
+    held while the agent waits on the LLM. The entry comes back pinned in the
+    agent cache; `_close_turn` (or `agent_cache.release` on failure) unpins it.
+    """
+    if conversation_id and not is_uuid(conversation_id):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
     db = get_database()
     async with db.get_session() as session:
-        from sqlalchemy import select
-        result = await session.execute(
-            select(AgentModel).where(AgentModel.id == agent_id)
-        )
-        agent = result.scalar_one_or_none()
-        
-        if not agent:
-            raise HTTPException(status_code=404, detail="Agent not found")
-        
-        return agent.to_dict()
+        # Reuse the conversation's live agent, or create the conversation
+        if conversation_id:
+            entry = await _get_cached_agent(session, agent_id, conversation_id)
+        else:
+            entry = await _start_conversation(session, agent_id)
+    
+    try:
+        await message_writer.submit(entry.key[1], "user", message)
+    except BaseException:
+        agent_cache.release(entry)
+        raise
+    return entry
+
+
+async def _close_turn(entry: CachedAgent, response_content: str) -> None:
+    """Queue the assistant message and store a changed rolling summary."""
+    agent_cache.release(entry)
+    await message_writer.submit(entry.key[1], "assistant", response_content)
+    
+    thread = entry.agent.thread
+    if summary_needs_saving(thread):
+        db = get_database()
+        async with db.get_session() as session:
+            await save_thread_summary(session, entry.key[1], thread)
 
 
 @app.post("/agents/{agent_id}/chat")
@@ -278,74 +483,26 @@ async def chat_with_agent(agent_id: str, request: ChatRequest):
     if not agent_builder:
         raise HTTPException(status_code=500, detail="Agent builder not initialized")
     
-    db = get_database()
-    
     try:
-        async with db.get_session() as session:
-            from sqlalchemy import select
-            
-            # Get agent from database
-            result = await session.execute(
-                select(AgentModel).where(AgentModel.id == agent_id)
-            )
-            db_agent = result.scalar_one_or_none()
-            
-            if not db_agent:
-                raise HTTPException(status_code=404, detail="Agent not found")
-            
-            # Create agent instance
-            agent = agent_builder.create_custom_agent(
-                name=db_agent.name,
-                instructions=db_agent.instructions,
-                model=db_agent.model,
-                temperature=float(db_agent.temperature),
-                max_tokens=db_agent.max_tokens,
-                tools=db_agent.tools
-            )
-            
-            # Get or create conversation
-            conversation_id = request.conversation_id
-            if conversation_id:
-                result = await session.execute(
-                    select(Conversation).where(Conversation.id == conversation_id)
-                )
-                conversation = result.scalar_one_or_none()
-                if not conversation:
-                    raise HTTPException(status_code=404, detail="Conversation not found")
-            else:
-                conversation = Conversation(
-                    agent_id=agent_id,
-                    title=f"Chat with {db_agent.name}"
-                )
-                session.add(conversation)
-                await session.flush()
-                conversation_id = conversation.id
-            
-            # Add user message to database
-            user_message = Message(
-                conversation_id=conversation_id,
-                role="user",
-                content=request.message
-            )
-            session.add(user_message)
-            
-            # Get agent response
-            response = await agent.run_async(request.message)
-            
-            # Add assistant message to database
-            assistant_message = Message(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=response.content
-            )
-            session.add(assistant_message)
-            
-            return ChatResponse(
-                response=response.content,
-                conversation_id=conversation_id,
-                agent_id=agent_id
-            )
+        entry = await _open_turn(agent_id, request.conversation_id, request.message)
+        
+        # Get agent response; one turn at a time per conversation
+        try:
+            async with entry.lock:
+                response = await entry.agent.run_async(request.message)
+        except BaseException:
+            agent_cache.release(entry)
+            raise
+        await _close_turn(entry, response.content)
+        
+        return ChatResponse(
+            response=response.content,
+            conversation_id=entry.key[1],
+            agent_id=agent_id
+        )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -357,41 +514,43 @@ async def stream_chat_with_agent(agent_id: str, request: ChatRequest):
         raise HTTPException(status_code=500, detail="Agent builder not initialized")
     
     async def generate_response():
-        db = get_database()
-        
         try:
-            async with db.get_session() as session:
-                from sqlalchemy import select
-                
-                # Get agent from database
-                result = await session.execute(
-                    select(AgentModel).where(AgentModel.id == agent_id)
-                )
-                db_agent = result.scalar_one_or_none()
-                
-                if not db_agent:
-                    yield f"data: {json.dumps({'error': 'Agent not found'})}\n\n"
-                    return
-                
-                # Create agent instance
-                agent = agent_builder.create_custom_agent(
-                    name=db_agent.name,
-                    instructions=db_agent.instructions,
-                    model=db_agent.model,
-                    temperature=float(db_agent.temperature),
-                    max_tokens=db_agent.max_tokens,
-                    tools=db_agent.tools
-                )
-                
-                # Stream response
-                full_response = ""
-                async for update in agent.run_streaming_async(request.message):
-                    if not update.is_complete:
-                        full_response += update.content
-                        yield f"data: {json.dumps({'content': update.content, 'done': False})}\n\n"
-                    else:
-                        yield f"data: {json.dumps({'content': '', 'done': True, 'full_response': full_response})}\n\n"
+            entry = await _open_turn(agent_id, request.conversation_id, request.message)
+            parts: List[str] = []
+            full_content: Optional[str] = None
+            
+            # Stream response in coalesced frames to cut per-token overhead
+            try:
+                async with entry.lock:
+                    updates = entry.agent.run_streaming_async(
+                        request.message,
+                        coalesce_ms=STREAM_COALESCE_MS,
+                        coalesce_bytes=STREAM_COALESCE_BYTES,
+                        lightweight=True
+                    )
+                    try:
+                        async for update in updates:
+                            if not update.is_complete:
+                                parts.append(update.content)
+                                yield f'data: {{"content": {json.dumps(update.content)}, "done": false}}\n\n'
+                            else:
+                                full_content = update.metadata['full_content']
+                    finally:
+                        # Stop the LLM stream and let the agent record the partial reply
+                        await updates.aclose()
+            finally:
+                # Runs on errors and client disconnects too: keep what was streamed so far
+                content = full_content if full_content is not None else "".join(parts)
+                if content:
+                    # Shielded so a disconnect's cancellation cannot drop the write
+                    await asyncio.shield(_close_turn(entry, content))
+                else:
+                    agent_cache.release(entry)
+            
+            yield f"data: {json.dumps({'content': '', 'done': True, 'full_response': full_content, 'conversation_id': entry.key[1]})}\n\n"
         
+        except HTTPException as e:
+            yield f"data: {json.dumps({'error': e.detail})}\n\n"
         except Exception as e:
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
     
@@ -402,27 +561,63 @@ async def stream_chat_with_agent(agent_id: str, request: ChatRequest):
     )
 
 
+@app.get("/conversations")
+async def list_conversations(agent_id: Optional[str] = None, limit: int = 50, before: Optional[str] = None):
+    """List conversation summaries, newest first, optionally for one agent.
+    
+    Pass the returned `next_cursor` as `before` to page back through older conversations.
+    """
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    if agent_id is not None and not is_uuid(agent_id):
+        raise HTTPException(status_code=400, detail=f"Invalid agent_id: {agent_id}")
+    
+    # Include this replica's queued messages in the counts
+    await message_writer.flush()
+    
+    db = get_database()
+    async with db.get_session() as session:
+        try:
+            conversations, next_cursor = await page_conversations(
+                session, agent_id=agent_id, limit=limit, before=before
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "conversations": conversations,
+        "next_cursor": next_cursor
+    }
+
+
 @app.get("/conversations/{conversation_id}")
-async def get_conversation(conversation_id: str):
-    """Get conversation history."""
+async def get_conversation(conversation_id: str, limit: int = 100, before: Optional[str] = None):
+    """Get conversation history, newest page first.
+    
+    Pass the returned `next_cursor` as `before` to page back through older messages.
+    """
+    if not 1 <= limit <= 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    
+    # Include this replica's queued messages
+    await message_writer.flush()
+    
     db = get_database()
     async with db.get_session() as session:
-        from sqlalchemy import select
-        from sqlalchemy.orm import selectinload
-        
-        result = await session.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == conversation_id)
-        )
-        conversation = result.scalar_one_or_none()
+        conversation = await session.get(Conversation, conversation_id) if is_uuid(conversation_id) else None
         
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
+        try:
+            messages, next_cursor = await page_messages(session, conversation_id, limit=limit, before=before)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         return {
             "conversation": conversation.to_dict(),
-            "messages": [msg.to_dict() for msg in conversation.messages]
+            "messages": [msg.to_dict() for msg in messages],
+            "next_cursor": next_cursor
         }
 
 
@@ -570,13 +765,14 @@ async def create_agent_with_api_integration(request: CreateAgentWithAPIRequest):
                 name=request.name,
                 instructions=request.instructions,
                 model=request.model,
-                temperature=str(request.temperature),
+                temperature=request.temperature,
                 tools=request.api_specs,
                 agent_metadata={"api_integrated": True, "api_specs": request.api_specs}
             )
             session.add(agent_model)
             await session.commit()
             await session.refresh(agent_model)
+            agent_rows.invalidate(agent_model.id)
             
             return {
                 "agent": agent_model.to_dict(),
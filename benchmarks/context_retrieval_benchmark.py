@@ -0,0 +1,123 @@
+"""Benchmark BM25 retrieval in InMemoryContextProvider against the old substring scan.
+
+Reports indexing throughput, top-k query latency (p50/p99) and, for the
+champion-list index, recall@k against exhaustive BM25 scoring of the same entries.
+
+Usage:
+    python benchmarks/context_retrieval_benchmark.py [--entries 100000] [--queries 500] [--champion-size 128]
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from microsoft_agent_framework.core.context_provider import InMemoryContextProvider
+from microsoft_agent_framework.core.text_index import STOPWORDS, BM25Index
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    """Stopwords (the head of any real word distribution) followed by random pseudo-words."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = sorted(STOPWORDS)
+    return words + ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size - len(words))]
+
+
+def make_entry(vocabulary, cum_weights, rng: random.Random) -> str:
+    """A "User/Assistant" transcript with Zipf-distributed words."""
+    question = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(6, 14)))
+    answer = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(20, 60)))
+    return f"User: {question}\nAssistant: {answer}"
+
+
+def substring_scan(contexts, query: str, limit: int):
+    """The pre-index InMemoryContextProvider.get_context implementation."""
+    results = []
+    query_lower = query.lower()
+    for context_id, context_data in contexts.items():
+        if query_lower in context_data.get("content", "").lower():
+            results.append({"id": context_id, "timestamp": context_data.get("timestamp")})
+    results.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+    return results[:limit]
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(args):
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+
+    provider = InMemoryContextProvider(champion_size=args.champion_size)
+    start = time.perf_counter()
+    for _ in range(args.entries):
+        await provider.add_context(make_entry(vocabulary, cum_weights, rng))
+    add_rate = args.entries / (time.perf_counter() - start)
+
+    exhaustive = BM25Index(champion_size=None)
+    for context_id, context_data in provider.contexts.items():
+        exhaustive.add(context_id, context_data["content"])
+    # Keep collector pauses over the loaded corpus out of the latency figures
+    gc.collect()
+    gc.freeze()
+
+    queries = [
+        " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(3, 8)))
+        for _ in range(args.queries)
+    ]
+
+    bm25_times, returned = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results = await provider.get_context(query, limit=args.limit)
+        bm25_times.append(time.perf_counter() - start)
+        returned.append({result["id"] for result in results})
+
+    exhaustive_times, recall = [], []
+    for query, found in zip(queries, returned):
+        start = time.perf_counter()
+        expected = {doc_id for doc_id, _ in exhaustive.search(query, args.limit)}
+        exhaustive_times.append(time.perf_counter() - start)
+        if expected:
+            recall.append(len(expected & found) / len(expected))
+    hits = sum(map(bool, returned))
+
+    scan_times, scan_hits = [], 0
+    for query in queries[:args.scan_queries]:
+        start = time.perf_counter()
+        scan_hits += bool(substring_scan(provider.contexts, query, args.limit))
+        scan_times.append(time.perf_counter() - start)
+
+    print(f"entries: {args.entries:,}  indexed terms: {provider._index.get_stats()['terms']:,}  adds/s: {add_rate:,.0f}")
+    print(f"{'engine':<20}{'p50 ms':>10}{'p99 ms':>10}{'queries with hits':>20}{f'recall@{args.limit}':>12}")
+    print(f"{'bm25 champions':<20}{statistics.median(bm25_times) * 1e3:>10.3f}{percentile(bm25_times, 0.99) * 1e3:>10.3f}"
+          f"{hits / len(bm25_times):>20.0%}{statistics.mean(recall):>12.3f}")
+    print(f"{'bm25 exhaustive':<20}{statistics.median(exhaustive_times) * 1e3:>10.3f}"
+          f"{percentile(exhaustive_times, 0.99) * 1e3:>10.3f}{len(recall) / len(queries):>20.0%}{1.0:>12.3f}")
+    print(f"{'substring scan':<20}{statistics.median(scan_times) * 1e3:>10.3f}{percentile(scan_times, 0.99) * 1e3:>10.3f}"
+          f"{scan_hits / len(scan_times):>20.0%}{'':>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--scan-queries", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--champion-size", type=int, default=128)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
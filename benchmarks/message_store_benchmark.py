@@ -0,0 +1,226 @@
+"""Benchmark message inserts and history fetches against a PostgreSQL schema.
+
+Loads a synthetic dataset (one agent, `--conversations` conversations and
+`--rows` messages spread over the last year) and reports batch insert latency
+and throughput, then the latency of the latest-history and message-count
+queries the API runs for a conversation. Tables are reflected, so the same
+script runs against the original schema and the fully migrated one. On an
+empty scratch database, `--create-baseline-schema` first creates the tables as
+`create_all` made them before any migration (string ids, no indexes):
+
+    python benchmarks/message_store_benchmark.py --create-baseline-schema
+    alembic -x partition_messages=true upgrade head
+    python benchmarks/message_store_benchmark.py --rows 0          # fetches, same data
+    python benchmarks/message_store_benchmark.py --rows 100000     # inserts, new schema
+
+Use a scratch database: the data is not removed afterwards.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/message_store_benchmark.py [--rows 1000000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import MetaData, Uuid, func, insert, select, text
+
+from microsoft_agent_framework.database.connection import DatabaseManager
+
+
+# The agents, conversations and messages tables before the alembic revisions, for PostgreSQL
+BASELINE_SCHEMA = [
+    """CREATE TABLE agents (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        template_name VARCHAR(100),
+        instructions TEXT NOT NULL,
+        model VARCHAR(100),
+        temperature VARCHAR(10),
+        max_tokens INTEGER,
+        tools JSON,
+        agent_metadata JSON,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        is_active BOOLEAN
+    )""",
+    """CREATE TABLE conversations (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        agent_id VARCHAR NOT NULL REFERENCES agents (id),
+        title VARCHAR(255),
+        agent_metadata JSON,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        updated_at TIMESTAMP WITHOUT TIME ZONE,
+        is_active BOOLEAN
+    )""",
+    """CREATE TABLE messages (
+        id VARCHAR NOT NULL PRIMARY KEY,
+        conversation_id VARCHAR NOT NULL REFERENCES conversations (id),
+        role VARCHAR(20) NOT NULL,
+        content TEXT NOT NULL,
+        agent_metadata JSON,
+        created_at TIMESTAMP WITHOUT TIME ZONE
+    )""",
+]
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def new_id(column):
+    """A fresh id in the form the reflected column expects."""
+    value = uuid.uuid4()
+    return value if isinstance(column.type, Uuid) else str(value)
+
+
+def report(label: str, samples, unit_scale: float = 1e3):
+    print(f"{label:<28}{statistics.median(samples) * unit_scale:>10.2f}{percentile(samples, 0.99) * unit_scale:>10.2f}")
+
+
+async def describe(conn) -> str:
+    """One line summarizing the messages schema under test."""
+    id_type = (await conn.execute(text(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = 'messages' AND column_name = 'id'"
+    ))).scalar()
+    partitions = (await conn.execute(text(
+        "SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass('messages')"
+    ))).scalar()
+    rows = (await conn.execute(text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass('messages')"))).scalar()
+    return f"messages.id: {id_type}  partitions: {partitions}  ~rows: {max(rows, 0):,}"
+
+
+async def create_baseline_schema(db):
+    """Create the original tables, refusing to touch a database that already has them."""
+    async with db.engine.begin() as conn:
+        if (await conn.execute(text("SELECT to_regclass('messages') IS NOT NULL"))).scalar():
+            raise SystemExit("--create-baseline-schema needs an empty database; messages already exists")
+        for statement in BASELINE_SCHEMA:
+            await conn.execute(text(statement))
+
+
+async def load(db, tables, args, rng: random.Random):
+    """Insert the synthetic dataset, timing each message batch."""
+    agents, conversations, messages = tables["agents"], tables["conversations"], tables["messages"]
+    agent_id = new_id(agents.c.id)
+    conversation_ids = [new_id(conversations.c.id) for _ in range(args.conversations)]
+    now = datetime.utcnow()
+
+    async with db.engine.begin() as conn:
+        await conn.execute(insert(agents), [{
+            "id": agent_id, "name": "benchmark", "instructions": "benchmark",
+            "created_at": now, "updated_at": now, "is_active": True
+        }])
+        for start in range(0, len(conversation_ids), args.batch):
+            await conn.execute(insert(conversations), [
+                {"id": cid, "agent_id": agent_id, "title": "benchmark", "created_at": now, "updated_at": now, "is_active": True}
+                for cid in conversation_ids[start:start + args.batch]
+            ])
+
+    batch_times = []
+    started = time.perf_counter()
+    for start in range(0, args.rows, args.batch):
+        rows = [
+            {
+                "id": new_id(messages.c.id),
+                "conversation_id": rng.choice(conversation_ids),
+                "role": "user" if i % 2 else "assistant",
+                "content": f"Synthetic message {start + i} " + "lorem ipsum " * rng.randint(5, 40),
+                "agent_metadata": {},
+                "created_at": now - timedelta(seconds=rng.uniform(0, 365 * 86400))
+            }
+            for i in range(min(args.batch, args.rows - start))
+        ]
+        batch_started = time.perf_counter()
+        async with db.engine.begin() as conn:
+            await conn.execute(insert(messages), rows)
+        batch_times.append(time.perf_counter() - batch_started)
+    elapsed = time.perf_counter() - started
+
+    if batch_times:
+        print(f"inserted {args.rows:,} messages in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
+        print(f"{'query':<28}{'p50 ms':>10}{'p99 ms':>10}")
+        report(f"insert batch of {args.batch}", batch_times)
+
+
+async def fetch(db, tables, args, rng: random.Random):
+    """Time the latest-history and count queries for random conversations."""
+    messages = tables["messages"]
+    async with db.engine.connect() as conn:
+        await conn.execute(text("ANALYZE messages"))
+        conversation_ids = (await conn.execute(
+            select(messages.c.conversation_id).distinct().limit(10000)
+        )).scalars().all()
+        if not conversation_ids:
+            print("no messages to fetch; run with --rows > 0 first")
+            return
+
+        history_times, count_times = [], []
+        for _ in range(args.fetches):
+            conversation_id = rng.choice(conversation_ids)
+            started = time.perf_counter()
+            await conn.execute(
+                select(messages.c.role, messages.c.content)
+                .where(messages.c.conversation_id == conversation_id)
+                .order_by(messages.c.created_at.desc(), messages.c.id.desc())
+                .limit(args.history)
+            )
+            history_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await conn.execute(
+                select(func.count()).select_from(messages).where(messages.c.conversation_id == conversation_id)
+            )
+            count_times.append(time.perf_counter() - started)
+
+    print(f"{'query':<28}{'p50 ms':>10}{'p99 ms':>10}")
+    report(f"latest {args.history} messages", history_times)
+    report("count messages", count_times)
+
+
+async def run(args):
+    rng = random.Random(42)
+    database_url = args.database_url
+    if database_url and database_url.startswith("postgresql://"):
+        # Accept the synchronous URL alembic uses
+        database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    db = DatabaseManager(database_url)
+    if args.create_baseline_schema:
+        await create_baseline_schema(db)
+
+    metadata = MetaData()
+    async with db.engine.connect() as conn:
+        await conn.run_sync(lambda sync_conn: metadata.reflect(sync_conn, only=["agents", "conversations", "messages"]))
+        print(await describe(conn))
+    tables = metadata.tables
+
+    if args.rows:
+        await load(db, tables, args, rng)
+    await fetch(db, tables, args, rng)
+    await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--create-baseline-schema", action="store_true",
+                        help="create the pre-migration tables first (empty database only)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--conversations", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--fetches", type=int, default=1000)
+    parser.add_argument("--history", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark AgentThread against CompactAgentThread.
+
+Reports memory per 10k messages and append/scan throughput.
+
+Usage:
+    python benchmarks/thread_store_benchmark.py [--messages 10000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from microsoft_agent_framework.core.agent_thread import AgentThread
+from microsoft_agent_framework.core.compact_thread import CompactAgentThread
+
+
+def fill(thread_cls, count: int):
+    """Build a thread with `count` alternating user/assistant messages."""
+    thread = thread_cls()
+    thread.add_system_message("You are a helpful assistant.")
+    for i in range(count // 2):
+        thread.add_user_message(f"Question number {i} about the product roadmap?")
+        thread.add_assistant_message(f"Answer number {i}: here is what the roadmap says.")
+    return thread
+
+
+def measure_memory(thread_cls, count: int) -> float:
+    """Bytes retained by a thread of `count` messages."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    thread = fill(thread_cls, count)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del thread
+    return retained
+
+
+def measure_throughput(thread_cls, count: int, scans: int):
+    """Append and scan operations per second."""
+    start = time.perf_counter()
+    thread = fill(thread_cls, count)
+    append_rate = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(scans):
+        thread.get_messages(role="system")
+    role_scan_rate = scans / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(scans):
+        thread.get_conversation_history()
+    history_rate = scans / (time.perf_counter() - start)
+
+    return append_rate, role_scan_rate, history_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--scans", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'store':<22}{'MB/10k msgs':>12}{'appends/s':>14}{'role scans/s':>15}{'history/s':>12}")
+    for thread_cls in (AgentThread, CompactAgentThread):
+        memory = measure_memory(thread_cls, args.messages) * 10_000 / args.messages
+        append_rate, role_scan_rate, history_rate = measure_throughput(thread_cls, args.messages, args.scans)
+        print(
+            f"{thread_cls.__name__:<22}{memory / 1e6:>12.2f}{append_rate:>14,.0f}"
+            f"{role_scan_rate:>15,.0f}{history_rate:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -197,6 +197,27 @@ def examples():
     asyncio.run(_examples())
 
 
+@app.command()
+def partition_messages(
+    months_ahead: int = typer.Option(3, help="Months of partitions to create past the current one")
+):
+    """Range-partition the PostgreSQL messages table by month (DATABASE_URL)."""
+    
+    async def _partition_messages():
+        from src.microsoft_agent_framework.database import DatabaseManager
+        from src.microsoft_agent_framework.database.partitions import partition_messages
+        db = DatabaseManager()
+        try:
+            return await partition_messages(db, months_ahead)
+        finally:
+            await db.close()
+    
+    if asyncio.run(_partition_messages()):
+        console.print("[green]messages is now partitioned by month[/green]")
+    else:
+        console.print("[yellow]Nothing to do: messages is already partitioned, or the database is not PostgreSQL[/yellow]")
+
+
 @app.command()
 def info():
     """Show framework information."""
@@ -8,15 +8,25 @@ __author__ = "Microsoft Agent Framework Team"
 from .core.agent_builder import AgentBuilder, AgentTemplate
 from .core.base_agent import BaseAgent, ChatCompletionAgent, AgentConfig
 from .core.groq_client import GroqClient, GroqConfig
-from .core.context_provider import ContextProvider, InMemoryContextProvider, FileContextProvider
+from .core.context_provider import ContextProvider, InMemoryContextProvider, FileContextProvider, EvictionPolicy
+from .core.vector_context import VectorContextProvider, Embedder, HashingEmbedder
+from .core.sqlite_context import SQLiteContextProvider
+from .core.postgres_context import PostgresContextProvider
+from .core.cached_context import CachedContextProvider
 from .core.agent_thread import AgentThread
+from .core.compact_thread import CompactAgentThread
+from .core.token_budget import TokenBudget
+from .core.streaming import StreamFrame
+from .core.compaction import ThreadCompactor
 from .core.team_orchestrator import TeamOrchestrator, TeamMember, Task
 
 __all__ = [
     "BaseAgent", "ChatCompletionAgent", "AgentConfig", 
     "AgentBuilder", "AgentTemplate", 
     "GroqClient", "GroqConfig", 
-    "ContextProvider", "InMemoryContextProvider", "FileContextProvider", 
-    "AgentThread", 
+    "ContextProvider", "InMemoryContextProvider", "FileContextProvider", "EvictionPolicy", 
+    "VectorContextProvider", "Embedder", "HashingEmbedder", "SQLiteContextProvider", 
+    "PostgresContextProvider", "CachedContextProvider", 
+    "AgentThread", "CompactAgentThread", "TokenBudget", "ThreadCompactor", "StreamFrame", 
     "TeamOrchestrator", "TeamMember", "Task"
 ]
@@ -9,7 +9,10 @@ import logging
 
 from .base_agent import BaseAgent, ChatCompletionAgent, AgentConfig
 from .groq_client import GroqClient, GroqConfig
-from .context_provider import ContextProvider, InMemoryContextProvider, FileContextProvider
+from .context_provider import ContextProvider, InMemoryContextProvider, FileContextProvider, EvictionPolicy
+from .vector_context import VectorContextProvider
+from .sqlite_context import SQLiteContextProvider
+from .postgres_context import PostgresContextProvider
 from .agent_thread import AgentThread
 from ..mcp import (
     APISpecificationParser, APIDefinition, MCPServerGenerator, 
@@ -29,10 +32,19 @@ class AgentTemplate(BaseModel):
     temperature: float = 0.7
     max_tokens: int = 4096
     tools: List[str] = []
-    context_type: str = "memory"  # "memory", "file"
+    context_type: str = "memory"  # "memory", "file", "vector", "sqlite", "postgres"
+    eviction_policy: Optional[EvictionPolicy] = None
     metadata: Dict[str, Any] = {}
 
 
+class RegisteredTool(BaseModel):
+    """Tool function registered with the builder, with the metadata for its schema."""
+    name: str
+    func: Callable
+    description: str = ""
+    parameters: Optional[Dict[str, Any]] = None
+
+
 class AgentBlueprint(BaseModel):
     """Blueprint for a specific agent type."""
     template: AgentTemplate
@@ -49,7 +61,7 @@ class AgentBuilder:
         self.groq_client = groq_client or GroqClient()
         self.templates: Dict[str, AgentTemplate] = {}
         self.blueprints: Dict[str, AgentBlueprint] = {}
-        self.tools_registry: Dict[str, Callable] = {}
+        self.tools_registry: Dict[str, RegisteredTool] = {}
         self.middleware_registry: Dict[str, Callable] = {}
         
         # MCP components
@@ -168,10 +180,28 @@ When creating agents, consider:
             descriptions.append(f"- {name}: {template.description}")
         return "\n".join(descriptions)
     
-    def register_tool(self, name: str, func: Callable, description: str = "") -> None:
-        """Register a tool function."""
-        self.tools_registry[name] = func
-        func._tool_metadata = {"name": name, "description": description}
+    def register_tool(
+        self,
+        name: str,
+        func: Callable,
+        description: str = "",
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Register a tool function, optionally with an explicit JSON schema for its parameters.
+        
+        The metadata is kept in the registry rather than on the function, so bound
+        methods keep their descriptions too.
+        """
+        self.tools_registry[name] = RegisteredTool(
+            name=name, func=func, description=description, parameters=parameters
+        )
+    
+    def _add_registered_tools(self, agent: BaseAgent, tool_names: List[str]) -> None:
+        """Add the registered tools among `tool_names` to an agent."""
+        for tool_name in tool_names:
+            tool = self.tools_registry.get(tool_name)
+            if tool is not None:
+                agent.add_tool(tool.name, tool.func, tool.description, tool.parameters)
     
     def register_middleware(self, name: str, func: Callable) -> None:
         """Register a middleware function."""
@@ -197,7 +227,9 @@ When creating agents, consider:
         instructions = custom_instructions or template.instructions
         
         # Create context provider
-        context_provider = self._create_context_provider(template.context_type, agent_name)
+        context_provider = self._create_context_provider(
+            template.context_type, agent_name, template.eviction_policy
+        )
         
         # Create agent
         agent = ChatCompletionAgent(
@@ -211,9 +243,7 @@ When creating agents, consider:
         )
         
         # Add tools
-        for tool_name in template.tools:
-            if tool_name in self.tools_registry:
-                agent.add_tool(tool_name, self.tools_registry[tool_name])
+        self._add_registered_tools(agent, template.tools)
         
         return agent
     
@@ -225,12 +255,13 @@ When creating agents, consider:
         temperature: float = 0.7,
         max_tokens: int = 4096,
         tools: Optional[List[str]] = None,
-        context_type: str = "memory"
+        context_type: str = "memory",
+        eviction_policy: Optional[EvictionPolicy] = None
     ) -> ChatCompletionAgent:
         """Create a custom agent with specific configuration."""
         
         # Create context provider
-        context_provider = self._create_context_provider(context_type, name)
+        context_provider = self._create_context_provider(context_type, name, eviction_policy)
         
         # Create agent
         agent = ChatCompletionAgent(
@@ -245,20 +276,41 @@ When creating agents, consider:
         
         # Add tools
         if tools:
-            for tool_name in tools:
-                if tool_name in self.tools_registry:
-                    agent.add_tool(tool_name, self.tools_registry[tool_name])
+            self._add_registered_tools(agent, tools)
         
         return agent
     
-    def _create_context_provider(self, context_type: str, agent_name: str) -> ContextProvider:
+    def _create_context_provider(
+        self,
+        context_type: str,
+        agent_name: str,
+        eviction_policy: Optional[EvictionPolicy] = None
+    ) -> ContextProvider:
         """Create appropriate context provider."""
         if context_type == "file":
-            context_file = f"contexts/{agent_name.lower().replace(' ', '_')}_context.json"
+            context_file = f"contexts/{agent_name.lower().replace(' ', '_')}_context.jsonl"
             Path(context_file).parent.mkdir(parents=True, exist_ok=True)
-            return FileContextProvider(context_file)
+            return FileContextProvider(context_file, eviction_policy=eviction_policy)
+        elif context_type == "vector":
+            return VectorContextProvider(eviction_policy=eviction_policy)
+        elif context_type == "sqlite":
+            db_file = f"contexts/{agent_name.lower().replace(' ', '_')}_context.db"
+            Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+            return SQLiteContextProvider(db_file, eviction_policy=self._without_lru(eviction_policy, context_type))
+        elif context_type == "postgres":
+            return PostgresContextProvider(
+                agent_id=agent_name, eviction_policy=self._without_lru(eviction_policy, context_type)
+            )
         else:
-            return InMemoryContextProvider()
+            return InMemoryContextProvider(eviction_policy=eviction_policy)
+    
+    @staticmethod
+    def _without_lru(eviction_policy: Optional[EvictionPolicy], context_type: str) -> Optional[EvictionPolicy]:
+        """Downgrade an lru policy for stores that age entries from their creation only."""
+        if eviction_policy is None or not eviction_policy.lru:
+            return eviction_policy
+        logger.warning(f"{context_type} context stores do not support lru eviction; entries age from creation")
+        return eviction_policy.model_copy(update={"lru": False})
     
     async def build_agent_from_description(self, description: str) -> ChatCompletionAgent:
         """Use the master agent to build an agent from natural language description."""
@@ -462,11 +514,9 @@ Provide a clear, actionable recommendation."""
             
             # Register MCP tools with agent
             for tool in available_tools:
-                self.register_tool(
-                    tool.name,
-                    lambda args, t=tool: self._call_mcp_tool(t, args),
-                    tool.description
-                )
+                tool_func = self._mcp_tool_function(tool)
+                self.register_tool(tool.name, tool_func, tool.description, tool.input_schema)
+                agent.add_tool(tool.name, tool_func, tool.description, tool.input_schema)
             
             logger.info(f"Created agent {name} with {len(available_tools)} API tools")
             return agent
@@ -475,6 +525,12 @@ Provide a clear, actionable recommendation."""
             logger.error(f"Error creating agent with API integration: {e}")
             raise
     
+    def _mcp_tool_function(self, tool: MCPTool) -> Callable:
+        """Wrap an MCP tool as a keyword-argument callable for function calling."""
+        async def call(**arguments: Any) -> str:
+            return await self._call_mcp_tool(tool, arguments)
+        return call
+    
     async def _call_mcp_tool(self, tool: MCPTool, arguments: Dict[str, Any]) -> str:
         """Call an MCP tool."""
         try:
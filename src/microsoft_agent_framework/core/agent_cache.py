@@ -0,0 +1,241 @@
+"""Cache of live agent instances, one per (agent, conversation)."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from .base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+def _context_size(agent: BaseAgent) -> int:
+    """Characters of context the agent's provider holds in process (0 for external stores)."""
+    return getattr(agent.context_provider, "content_chars", 0)
+
+
+def estimate_agent_size(agent: BaseAgent) -> int:
+    """Rough memory footprint of an agent: its thread plus in-process context, in characters."""
+    return sum(len(content) for _, content in agent.thread._iter_role_content(0)) + _context_size(agent)
+
+
+@dataclass
+class CachedAgent:
+    """A cached agent plus the bookkeeping needed to evict and revalidate it."""
+    agent: BaseAgent
+    key: CacheKey
+    version: Any = None
+    size: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    validated_at: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Callers between get_or_create() and release(); pinned entries are never evicted
+    pins: int = 0
+    # The thread's size is kept up to date incrementally, from the messages added since
+    thread_size: int = 0
+    sized_messages: int = 0
+    sized_generation: int = 0
+
+    def measure(self) -> int:
+        """Re-estimate the agent's size, only walking thread messages added since the last call."""
+        thread = self.agent.thread
+        count = thread.count_messages()
+        if thread.generation != self.sized_generation or count < self.sized_messages:
+            self.thread_size, self.sized_messages, self.sized_generation = 0, 0, thread.generation
+        self.thread_size += sum(len(content) for _, content in thread._iter_role_content(self.sized_messages))
+        self.sized_messages = count
+        return self.thread_size + _context_size(self.agent)
+
+
+class AgentInstanceCache:
+    """LRU cache of live agents keyed by (agent_id, conversation_id).
+
+    Keeping the agent alive between requests preserves its thread and context
+    provider. Entries are evicted least recently used first once there are
+    more than `max_agents` or their estimated size exceeds `max_bytes`, and
+    dropped after `idle_timeout` seconds without use. Every
+    `revalidate_after` seconds a hit re-reads the agent's version (e.g. its
+    `updated_at`), and a changed version evicts every instance of that agent.
+    Evicted agents are flushed and closed in the background.
+
+    Every entry returned by `get_or_create` is pinned until the caller passes it
+    to `release`, which must happen exactly once, error or not. Pinned entries
+    are never evicted, so the agent cannot be closed between the lookup and the
+    turn; the limits are enforced again on release. Callers hold `entry.lock`
+    while running a turn, so concurrent requests on one conversation are
+    serialized instead of interleaving on its thread.
+    """
+
+    def __init__(
+        self,
+        max_agents: int = 256,
+        idle_timeout: Optional[float] = 1800.0,
+        max_bytes: Optional[int] = None,
+        revalidate_after: float = 30.0
+    ):
+        """Initialize an empty cache."""
+        self.max_agents = max_agents
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self._entries: "OrderedDict[CacheKey, CachedAgent]" = OrderedDict()
+        self._loading: Dict[CacheKey, asyncio.Future] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self._total_size = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_create(
+        self,
+        agent_id: str,
+        conversation_id: str,
+        factory: Callable[[], Awaitable[Tuple[BaseAgent, Any]]],
+        current_version: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> CachedAgent:
+        """Return the cached agent for a conversation, building it with `factory()` on a miss.
+
+        `factory` returns (agent, version). Concurrent misses for one key share a
+        single factory call. The entry is returned pinned; pass it to `release`.
+        """
+        key = (agent_id, conversation_id)
+        self._expire_idle()
+
+        entry = self._entries.get(key)
+        if entry is not None and current_version is not None:
+            now = time.monotonic()
+            if now - entry.validated_at >= self.revalidate_after:
+                if await current_version() != entry.version:
+                    self.invalidate(agent_id)
+                    entry = None
+                else:
+                    entry.validated_at = now
+        if entry is not None:
+            self._stats["hits"] += 1
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+            entry.pins += 1
+            return entry
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            entry = await asyncio.shield(loading)
+            entry.pins += 1
+            return entry
+
+        self._stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            agent, version = await factory()
+            entry = CachedAgent(agent=agent, key=key, version=version, pins=1)
+            entry.size = entry.measure()
+            self._entries[key] = entry
+            self._total_size += entry.size
+            self._enforce_limits()
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case no concurrent caller was waiting
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+
+    def release(self, entry: CachedAgent) -> None:
+        """Unpin an entry once its turn is over, refresh its size and enforce the limits."""
+        entry.pins = max(0, entry.pins - 1)
+        size = entry.measure()
+        if self._entries.get(entry.key) is entry:
+            self._total_size += size - entry.size
+            self._entries.move_to_end(entry.key)
+        entry.size = size
+        entry.last_used = time.monotonic()
+        self._enforce_limits()
+
+    def invalidate(self, agent_id: str, conversation_id: Optional[str] = None) -> int:
+        """Evict the instances of an agent, or of one of its conversations; returns the count."""
+        keys = [
+            key for key in self._entries
+            if key[0] == agent_id and (conversation_id is None or key[1] == conversation_id)
+        ]
+        for key in keys:
+            self._evict(key)
+        self._stats["invalidations"] += len(keys)
+        return len(keys)
+
+    def _evict(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._total_size -= entry.size
+        try:
+            task = asyncio.get_running_loop().create_task(self._close_agent(entry))
+        except RuntimeError:
+            # Without a running loop (e.g. invalidated from sync code) the agent cannot be flushed
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_agent(entry: CachedAgent) -> None:
+        # Wait for an in-flight turn so its context writes are not lost
+        async with entry.lock:
+            try:
+                await entry.agent.close()
+            except Exception as e:
+                logger.error(f"Failed to close evicted agent {entry.agent.config.name}: {e}")
+
+    def _expire_idle(self) -> None:
+        if self.idle_timeout is None:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        # Entries are kept in recency order, so idle ones sit at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.last_used > cutoff or entry.pins or entry.lock.locked():
+                break
+            self._evict(key)
+            self._stats["evictions"] += 1
+
+    def _enforce_limits(self) -> None:
+        # Pinned agents are skipped, so the cache may briefly exceed its limits until
+        # their release(); the most recently used entry, the one being handed out, is kept
+        count, size = len(self._entries), self._total_size
+        newest = next(reversed(self._entries), None)
+        victims = []
+        for key, entry in self._entries.items():
+            if count <= self.max_agents and (self.max_bytes is None or size <= self.max_bytes):
+                break
+            if key == newest:
+                break
+            if entry.pins or entry.lock.locked():
+                continue
+            victims.append(key)
+            count -= 1
+            size -= entry.size
+        for key in victims:
+            self._evict(key)
+            self._stats["evictions"] += 1
+
+    async def close(self) -> None:
+        """Flush and close every cached agent."""
+        for key in list(self._entries):
+            self._evict(key)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/eviction counters."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "agents": len(self._entries),
+            "estimated_bytes": self._total_size,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0
+        }
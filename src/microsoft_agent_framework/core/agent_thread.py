@@ -1,10 +1,13 @@
 """Agent thread for state management in the Microsoft Agent Framework."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Tuple
 from datetime import datetime
 from pydantic import BaseModel
 import uuid
 
+# Prefix of the synthetic system message that carries a thread's rolling summary
+SUMMARY_PREFIX = "Summary of earlier conversation:\n"
+
 
 class ThreadMessage(BaseModel):
     """Message in an agent thread."""
@@ -48,16 +51,89 @@ class ThreadMessage(BaseModel):
         )
 
 
+class _MessageList(list):
+    """List of thread messages that counts in-place changes.
+    
+    Appends are not counted: the wire buffer picks them up incrementally. Any
+    replacement, removal or reordering bumps `mutations` so the buffer is rebuilt.
+    Edits to the fields of a stored ThreadMessage are not seen; replace the message.
+    """
+    
+    __slots__ = ("mutations",)
+    
+    def __init__(self, messages: Iterable[ThreadMessage] = ()):
+        super().__init__(messages)
+        self.mutations = 0
+    
+    def _mutated(self) -> None:
+        self.mutations += 1
+    
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self._mutated()
+    
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._mutated()
+    
+    def insert(self, index, message: ThreadMessage) -> None:
+        super().insert(index, message)
+        self._mutated()
+    
+    def pop(self, index=-1) -> ThreadMessage:
+        message = super().pop(index)
+        self._mutated()
+        return message
+    
+    def remove(self, message: ThreadMessage) -> None:
+        super().remove(message)
+        self._mutated()
+    
+    def clear(self) -> None:
+        super().clear()
+        self._mutated()
+    
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._mutated()
+    
+    def reverse(self) -> None:
+        super().reverse()
+        self._mutated()
+
+
 class AgentThread:
     """Thread for managing conversation state and history."""
     
     def __init__(self, thread_id: Optional[str] = None):
         """Initialize agent thread."""
         self.id = thread_id or str(uuid.uuid4())
-        self.messages: List[ThreadMessage] = []
+        self.messages = []
         self.metadata: Dict[str, Any] = {}
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
+        
+        # Rolling summary of compacted turns; messages[:summary_until] are covered by it
+        self.summary: Optional[str] = None
+        self.summary_until = 0
+        self.generation = 0
+        
+        # Append-only wire-format ({"role", "content"}) copies of messages, synced lazily
+        self._wire: List[Dict[str, str]] = []
+        self._wire_system: List[int] = []
+        self._wire_generation = 0
+        self._wire_mutations = 0
+    
+    @property
+    def messages(self) -> List[ThreadMessage]:
+        """The thread's messages."""
+        return self._messages
+    
+    @messages.setter
+    def messages(self, messages: List[ThreadMessage]) -> None:
+        self._messages = _MessageList(messages)
+        # A new list starts its own mutation count, so force the next sync to rebuild
+        self._wire_generation = None
     
     def add_message(self, message: ThreadMessage) -> None:
         """Add a message to the thread."""
@@ -94,12 +170,23 @@ class AgentThread:
         
         return messages
     
-    def get_conversation_history(self, include_system: bool = True) -> List[Dict[str, str]]:
-        """Get conversation history in a format suitable for LLM APIs."""
+    def get_conversation_history(self, include_system: bool = True, include_compacted: bool = False) -> List[Dict[str, str]]:
+        """Get conversation history in a format suitable for LLM APIs.
+        
+        Once the thread has been compacted, turns covered by the rolling summary are
+        replaced with a single summary message unless `include_compacted` is set.
+        System messages are always kept.
+        """
         history = []
+        compacted = self.summary is not None and not include_compacted
         
-        for message in self.messages:
-            if not include_system and message.role == "system":
+        for index, message in enumerate(self.messages):
+            if message.role == "system":
+                if include_system:
+                    history.append({"role": message.role, "content": message.content})
+                continue
+            
+            if compacted and index < self.summary_until:
                 continue
             
             history.append({
@@ -107,11 +194,76 @@ class AgentThread:
                 "content": message.content
             })
         
+        if compacted:
+            insert_at = 0
+            while insert_at < len(history) and history[insert_at]["role"] == "system":
+                insert_at += 1
+            history.insert(insert_at, {"role": "system", "content": f"{SUMMARY_PREFIX}{self.summary}"})
+        
         return history
     
+    def count_messages(self, role: Optional[str] = None) -> int:
+        """Count messages, optionally filtered by role."""
+        if role:
+            return sum(1 for message in self.messages if message.role == role)
+        return len(self.messages)
+    
+    def _iter_role_content(self, start: int) -> Iterable[Tuple[str, str]]:
+        """Yield (role, content) for messages from position `start` onwards."""
+        for message in self.messages[start:]:
+            yield message.role, message.content
+    
+    def _sync_wire(self) -> None:
+        """Bring the wire buffer up to date, converting only messages added since the last sync.
+        
+        The buffer is rebuilt after clear_messages(), a new messages list, or any
+        in-place replacement, removal or reordering of messages.
+        """
+        mutations = self._messages.mutations
+        if (
+            self._wire_generation != self.generation
+            or self._wire_mutations != mutations
+            or len(self._wire) > len(self._messages)
+        ):
+            self._wire = []
+            self._wire_system = []
+            self._wire_generation = self.generation
+            self._wire_mutations = mutations
+        
+        start = len(self._wire)
+        for offset, (role, content) in enumerate(self._iter_role_content(start)):
+            if role == "system":
+                self._wire_system.append(start + offset)
+            self._wire.append({"role": role, "content": content})
+    
+    def get_wire_messages(self) -> List[Dict[str, str]]:
+        """Get the conversation history as pre-serialized Groq wire messages.
+        
+        Equivalent to get_conversation_history(), but the message dicts are shared
+        with the thread's append-only buffer and must be treated as read-only. Only
+        messages added since the previous call are converted.
+        """
+        self._sync_wire()
+        if self.summary is None:
+            return list(self._wire)
+        
+        until = self.summary_until
+        head = [self._wire[i] for i in self._wire_system if i < until]
+        head.append({"role": "system", "content": f"{SUMMARY_PREFIX}{self.summary}"})
+        return head + self._wire[until:]
+    
+    def set_summary(self, summary: str, until: int) -> None:
+        """Replace the rolling summary, covering all messages before index `until`."""
+        self.summary = summary
+        self.summary_until = until
+        self.updated_at = datetime.now()
+    
     def clear_messages(self) -> None:
         """Clear all messages from the thread."""
         self.messages.clear()
+        self.summary = None
+        self.summary_until = 0
+        self.generation += 1
         self.updated_at = datetime.now()
     
     def get_last_message(self, role: Optional[str] = None) -> Optional[ThreadMessage]:
@@ -125,6 +277,8 @@ class AgentThread:
             "id": self.id,
             "messages": [msg.model_dump() for msg in self.messages],
             "metadata": self.metadata,
+            "summary": self.summary,
+            "summary_until": self.summary_until,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
@@ -134,6 +288,8 @@ class AgentThread:
         """Create thread from dictionary."""
         thread = cls(thread_id=data["id"])
         thread.metadata = data.get("metadata", {})
+        thread.summary = data.get("summary")
+        thread.summary_until = data.get("summary_until", 0)
         thread.created_at = datetime.fromisoformat(data["created_at"])
         thread.updated_at = datetime.fromisoformat(data["updated_at"])
         
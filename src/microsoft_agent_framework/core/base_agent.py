@@ -1,6 +1,6 @@
 """Base agent implementation for the Microsoft Agent Framework."""
 
-from typing import Dict, List, Any, Optional, AsyncGenerator, Callable
+from typing import Dict, List, Any, Optional, AsyncGenerator, Callable, Union, Tuple
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
 import asyncio
@@ -10,6 +10,11 @@ from datetime import datetime
 from .groq_client import GroqClient, GroqMessage, GroqResponse
 from .agent_thread import AgentThread, ThreadMessage
 from .context_provider import ContextProvider, InMemoryContextProvider
+from .token_budget import TokenBudget
+from .compaction import ThreadCompactor
+from .streaming import StreamFrame, StreamAccumulator, coalesce_chunks
+from .tool_calling import ToolExecutor, build_tool_schema
+from .write_behind import ContextWriteBehind
 
 
 class AgentConfig(BaseModel):
@@ -21,6 +26,13 @@ class AgentConfig(BaseModel):
     max_tokens: Optional[int] = None
     tools: List[str] = []
     metadata: Dict[str, Any] = {}
+    context_strategy: str = "drop_oldest"  # "drop_oldest", "summarize_oldest"
+    max_prompt_tokens: Optional[int] = None
+    max_tool_iterations: int = 8
+    tool_timeout: Optional[float] = 30.0
+    max_parallel_tools: int = 8
+    context_write_behind: bool = True
+    context_write_buffer: int = 1000
 
 
 class AgentRunResponse(BaseModel):
@@ -65,26 +77,52 @@ class BaseAgent(ABC):
         config: AgentConfig,
         groq_client: GroqClient,
         context_provider: Optional[ContextProvider] = None,
-        thread: Optional[AgentThread] = None
+        thread: Optional[AgentThread] = None,
+        token_budget: Optional[TokenBudget] = None,
+        compactor: Optional[ThreadCompactor] = None
     ):
         """Initialize the base agent."""
         self.config = config
         self.groq_client = groq_client
         self.context_provider = context_provider or InMemoryContextProvider()
         self.thread = thread or AgentThread()
+        self.token_budget = token_budget or TokenBudget(
+            strategy=config.context_strategy,
+            max_prompt_tokens=config.max_prompt_tokens
+        )
+        self.compactor = compactor
         self.tools: Dict[str, Callable] = {}
+        self.tool_schemas: Dict[str, Dict[str, Any]] = {}
+        self.tool_executor = ToolExecutor(
+            timeout=config.tool_timeout,
+            max_concurrency=config.max_parallel_tools
+        )
         self.middleware: List[Callable] = []
+        self.context_writer = ContextWriteBehind(
+            self.context_provider, max_pending=config.context_write_buffer
+        ) if config.context_write_behind else None
         
         # Add system message with instructions
         if config.instructions:
             self.thread.add_system_message(config.instructions)
     
-    def add_tool(self, name: str, func: Callable, description: str = "") -> None:
-        """Add a tool function to the agent."""
+    def add_tool(
+        self,
+        name: str,
+        func: Callable,
+        description: str = "",
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Add a tool function to the agent and derive its function-calling schema."""
         self.tools[name] = func
-        # Store tool metadata
-        if not hasattr(func, '_tool_metadata'):
-            func._tool_metadata = {"name": name, "description": description}
+        # Functions may carry metadata of their own; explicit arguments win
+        metadata = getattr(func, '_tool_metadata', None) or {}
+        
+        schema = build_tool_schema(name, func, description or metadata.get("description", ""))
+        parameters = parameters or metadata.get("parameters")
+        if parameters:
+            schema["function"]["parameters"] = parameters
+        self.tool_schemas[name] = schema
     
     def add_middleware(self, middleware_func: Callable) -> None:
         """Add middleware function to intercept agent actions."""
@@ -96,38 +134,97 @@ class BaseAgent(ABC):
             data = await middleware(action, data)
         return data
     
+    def _schedule_compaction(self) -> None:
+        """Compact the thread in the background once it grows past the threshold."""
+        if self.compactor:
+            self.compactor.schedule(self.thread)
+    
+    async def _store_interaction(self, user_input: str, response_content: str) -> None:
+        """Store a finished turn in context, via the write-behind queue when enabled."""
+        content = f"User: {user_input}\nAssistant: {response_content}"
+        metadata = {"timestamp": datetime.now().isoformat(), "agent": self.config.name}
+        if self.context_writer is not None:
+            await self.context_writer.submit(content, metadata)
+        else:
+            await self.context_provider.add_context(content, metadata=metadata)
+    
+    async def flush(self) -> None:
+        """Wait until all queued context writes have been stored."""
+        if self.context_writer is not None:
+            await self.context_writer.flush()
+        provider_flush = getattr(self.context_provider, "flush", None)
+        if provider_flush is not None:
+            await provider_flush()
+    
+    async def close(self) -> None:
+        """Flush pending context writes and release the context provider's resources."""
+        if self.context_writer is not None:
+            await self.context_writer.close()
+        provider_close = getattr(self.context_provider, "close", None)
+        if provider_close is not None:
+            await provider_close()
+    
     async def _get_relevant_context(self, query: str) -> List[Dict[str, Any]]:
         """Get relevant context for the query."""
         return await self.context_provider.get_context(query, limit=5)
     
-    async def _prepare_messages(self, user_input: str) -> List[GroqMessage]:
-        """Prepare messages for the LLM including context and history."""
-        messages = []
-        
-        # Get conversation history
-        history = self.thread.get_conversation_history()
-        
-        # Convert to GroqMessage format
-        for msg in history:
-            messages.append(GroqMessage(role=msg["role"], content=msg["content"]))
+    async def _prepare_messages(self, user_input: str) -> List[Dict[str, str]]:
+        """Prepare wire-format messages for the LLM including context and history, within the token budget."""
+        # Get conversation history, minus the raw user message just added for this turn
+        messages = self.thread.get_wire_messages()
+        if messages and messages[-1]["role"] == "user":
+            messages.pop()
+        pinned_tail = 1
         
-        # Add user message
-        user_message = GroqMessage(role="user", content=user_input)
-        messages.append(user_message)
-        
-        # Get relevant context
+        # Get relevant context and insert it before the user message
         context_items = await self._get_relevant_context(user_input)
         if context_items:
             context_content = "Relevant context:\n"
             for item in context_items:
                 context_content += f"- {item['content']}\n"
-            
-            # Insert context before the user message
-            context_message = GroqMessage(role="system", content=context_content)
-            messages.insert(-1, context_message)
+            messages.append({"role": "system", "content": context_content})
+            pinned_tail = 2
+        
+        # Add user message
+        messages.append({"role": "user", "content": user_input})
+        
+        # Keep the prompt within the model's context window
+        messages = await self.token_budget.fit(
+            messages,
+            model=self.config.model or self.groq_client.config.model,
+            max_tokens=self.config.max_tokens or self.groq_client.config.max_tokens,
+            groq_client=self.groq_client,
+            pinned_tail=pinned_tail,
+            generation=self.thread.generation
+        )
         
         return messages
     
+    async def _complete_with_tools(self, messages: List[Dict[str, Any]]) -> Tuple[GroqResponse, List[str]]:
+        """Call the model, running requested tools concurrently until it gives a final answer."""
+        tools = list(self.tool_schemas.values()) or None
+        called: List[str] = []
+        
+        for iteration in range(self.config.max_tool_iterations + 1):
+            # Once the iteration limit is reached, insist on a final answer
+            tool_choice = "none" if tools and iteration == self.config.max_tool_iterations else None
+            response = await self.groq_client.async_chat_completion(
+                messages=messages,
+                model=self.config.model,
+                temperature=self.config.temperature,
+                max_tokens=self.config.max_tokens,
+                tools=tools,
+                tool_choice=tool_choice
+            )
+            if not response.tool_calls or tool_choice == "none":
+                break
+            
+            messages.append({"role": "assistant", "content": response.content, "tool_calls": response.tool_calls})
+            messages.extend(await self.tool_executor.run_calls(response.tool_calls, self.tools))
+            called.extend(call["function"]["name"] for call in response.tool_calls)
+        
+        return response, called
+    
     async def run_async(self, user_input: str) -> AgentRunResponse:
         """Run the agent with user input and return response."""
         # Add user message to thread
@@ -139,36 +236,41 @@ class BaseAgent(ABC):
         # Prepare messages
         messages = await self._prepare_messages(user_input)
         
-        # Get response from Groq
-        response = await self.groq_client.async_chat_completion(
-            messages=messages,
-            model=self.config.model,
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens
-        )
+        # Get response from Groq, executing any requested tool calls
+        response, tool_calls = await self._complete_with_tools(messages)
         
         # Apply middleware to response
         response = await self._apply_middleware("response", response)
         
         # Add assistant message to thread
         self.thread.add_assistant_message(response.content)
+        self._schedule_compaction()
         
         # Store interaction in context
-        await self.context_provider.add_context(
-            f"User: {user_input}\nAssistant: {response.content}",
-            metadata={"timestamp": datetime.now().isoformat(), "agent": self.config.name}
-        )
+        await self._store_interaction(user_input, response.content)
         
         return AgentRunResponse(
             content=response.content,
             model=response.model,
             usage=response.usage,
             finish_reason=response.finish_reason,
-            metadata={"agent_name": self.config.name}
+            metadata={"agent_name": self.config.name, "tool_calls": tool_calls}
         )
     
-    async def run_streaming_async(self, user_input: str) -> AsyncGenerator[AgentRunResponseUpdate, None]:
-        """Run the agent with streaming response."""
+    async def run_streaming_async(
+        self,
+        user_input: str,
+        coalesce_ms: Optional[float] = None,
+        coalesce_bytes: Optional[int] = None,
+        lightweight: bool = False
+    ) -> AsyncGenerator[Union[AgentRunResponseUpdate, StreamFrame], None]:
+        """Run the agent with streaming response.
+        
+        With `coalesce_ms` and/or `coalesce_bytes`, tokens are merged into frames
+        bounded by time and size before middleware runs and updates are yielded.
+        `lightweight=True` yields slotted StreamFrame objects instead of pydantic
+        AgentRunResponseUpdate models.
+        """
         # Add user message to thread
         self.thread.add_user_message(user_input)
         
@@ -179,39 +281,59 @@ class BaseAgent(ABC):
         messages = await self._prepare_messages(user_input)
         
         # Stream response from Groq
-        full_content = ""
-        async for chunk in self.groq_client.stream_chat_completion(
+        update_type = StreamFrame if lightweight else AgentRunResponseUpdate
+        metadata = {"agent_name": self.config.name}
+        accumulator = StreamAccumulator()
+        chunks = self.groq_client.stream_chat_completion(
             messages=messages,
             model=self.config.model,
             temperature=self.config.temperature,
             max_tokens=self.config.max_tokens
-        ):
-            full_content += chunk
-            
-            # Apply middleware to chunk
-            chunk = await self._apply_middleware("stream_chunk", chunk)
-            
-            yield AgentRunResponseUpdate(
-                content=chunk,
-                is_complete=False,
-                metadata={"agent_name": self.config.name}
+        )
+        if coalesce_ms or coalesce_bytes:
+            chunks = coalesce_chunks(
+                chunks,
+                max_latency=coalesce_ms / 1000 if coalesce_ms else None,
+                max_bytes=coalesce_bytes
             )
         
+        completed = False
+        try:
+            async for chunk in chunks:
+                accumulator.append(chunk)
+                
+                # Apply middleware to chunk
+                if self.middleware:
+                    chunk = await self._apply_middleware("stream_chunk", chunk)
+                
+                yield update_type(
+                    content=chunk,
+                    is_complete=False,
+                    metadata=metadata
+                )
+            completed = True
+        finally:
+            # Stop the upstream completion if the consumer goes away mid-stream
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            if not completed and len(accumulator):
+                # Keep the partial reply, as callers persisting the stream do
+                self.thread.add_assistant_message(accumulator.getvalue())
+        
+        full_content = accumulator.getvalue()
+        
+        # Record the turn before the final update so it is kept even if the consumer stops there
+        self.thread.add_assistant_message(full_content)
+        self._schedule_compaction()
+        await self._store_interaction(user_input, full_content)
+        
         # Final update
-        yield AgentRunResponseUpdate(
+        yield update_type(
             content="",
             is_complete=True,
             metadata={"agent_name": self.config.name, "full_content": full_content}
         )
-        
-        # Add assistant message to thread
-        self.thread.add_assistant_message(full_content)
-        
-        # Store interaction in context
-        await self.context_provider.add_context(
-            f"User: {user_input}\nAssistant: {full_content}",
-            metadata={"timestamp": datetime.now().isoformat(), "agent": self.config.name}
-        )
     
     def get_thread(self) -> AgentThread:
         """Get the agent's thread."""
@@ -246,7 +368,9 @@ class ChatCompletionAgent(BaseAgent):
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         context_provider: Optional[ContextProvider] = None,
-        thread: Optional[AgentThread] = None
+        thread: Optional[AgentThread] = None,
+        token_budget: Optional[TokenBudget] = None,
+        compactor: Optional[ThreadCompactor] = None
     ):
         """Initialize chat completion agent."""
         config = AgentConfig(
@@ -261,5 +385,7 @@ class ChatCompletionAgent(BaseAgent):
             config=config,
             groq_client=groq_client,
             context_provider=context_provider,
-            thread=thread
+            thread=thread,
+            token_budget=token_budget,
+            compactor=compactor
         )
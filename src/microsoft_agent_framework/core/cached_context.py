@@ -0,0 +1,146 @@
+"""Memoizing wrapper around any context provider's get_context."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .context_provider import ContextProvider, InMemoryContextProvider
+from .text_index import tokenize
+from .vector_context import VectorContextProvider
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache lookup: case, punctuation, whitespace and stopwords are ignored."""
+    return " ".join(tokenize(query))
+
+
+class CachedContextProvider(ContextProvider):
+    """Caches top-k `get_context` results of a wrapped provider.
+
+    Results are keyed by normalized query and limit. Every write through the
+    wrapper bumps a generation counter; entries cached under an older
+    generation are treated as misses, so a cached answer never outlives a
+    change to the store. Results computed while a write was in flight are not
+    cached. Evictions the wrapped provider makes on its own (see
+    EvictionPolicy) also count as a new generation; in-process providers with
+    a TTL expire entries before each lookup. The SQL providers expire rows in
+    the database instead, so pair them with `ttl`, the longest a cached result
+    may be served. Hits are forwarded to the wrapped provider as retrievals of
+    the returned ids, so an LRU policy still sees cached entries as recently
+    used. Other attributes such as `flush` or `list_contexts` are forwarded
+    to the wrapped provider.
+    """
+
+    def __init__(self, provider: ContextProvider, max_entries: int = 1024, ttl: Optional[float] = None):
+        """Initialize the cache in front of `provider`."""
+        self.provider = provider
+        self.max_entries = max_entries
+        self.ttl = ttl
+        policy = getattr(provider, "eviction_policy", None)
+        self._expire_before_lookup = (
+            policy is not None and policy.ttl is not None
+            and isinstance(provider, (InMemoryContextProvider, VectorContextProvider))
+        )
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[Tuple[int, int], float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "stale": 0}
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes the wrapper lacks
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    @property
+    def eviction_policy(self):
+        return getattr(self.provider, "eviction_policy", None)
+
+    def _current_generation(self) -> Tuple[int, int]:
+        stats = getattr(self.provider, "eviction_stats", None)
+        return self._generation, stats.evicted if stats is not None else 0
+
+    def _invalidate(self) -> None:
+        self._generation += 1
+
+    async def get_context(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Retrieve relevant context, served from the cache when the store has not changed."""
+        if self._expire_before_lookup:
+            await self.provider.enforce_limits()
+
+        key = (normalize_query(query), limit)
+        generation = self._current_generation()
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] == generation and (self.ttl is None or now - cached[1] < self.ttl):
+                self._stats["hits"] += 1
+                self._cache.move_to_end(key)
+                self.provider._touch([result["id"] for result in cached[2]])
+                return [dict(result) for result in cached[2]]
+            self._stats["stale"] += 1
+        self._stats["misses"] += 1
+
+        results = await self.provider.get_context(query, limit)
+        if self._current_generation() == generation:
+            self._cache[key] = (generation, now, [dict(result) for result in results])
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        elif cached is not None:
+            del self._cache[key]
+        return results
+
+    async def add_context(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Add content to the context store."""
+        self._invalidate()
+        try:
+            return await self.provider.add_context(content, metadata)
+        finally:
+            self._invalidate()
+
+    async def add_contexts(self, items: List[Dict[str, Any]]) -> List[str]:
+        """Add many {"content", "metadata"} items through the wrapped provider's batch path."""
+        self._invalidate()
+        try:
+            return await self.provider.add_contexts(items)
+        finally:
+            self._invalidate()
+
+    async def update_context(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Update existing context."""
+        self._invalidate()
+        try:
+            return await self.provider.update_context(context_id, content, metadata)
+        finally:
+            self._invalidate()
+
+    async def delete_context(self, context_id: str) -> bool:
+        """Delete context by ID."""
+        self._invalidate()
+        try:
+            return await self.provider.delete_context(context_id)
+        finally:
+            self._invalidate()
+
+    async def enforce_limits(self) -> int:
+        """Apply the wrapped provider's eviction policy."""
+        self._invalidate()
+        return await self.provider.enforce_limits()
+
+    def get_eviction_stats(self) -> Optional[Dict[str, Any]]:
+        """Get the wrapped provider's eviction statistics."""
+        return self.provider.get_eviction_stats()
+
+    def clear_cache(self) -> None:
+        """Drop every cached result."""
+        self._cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit-rate metrics."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._cache),
+            "generation": self._generation,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0
+        }
@@ -0,0 +1,238 @@
+"""Memory-compact thread store with the AgentThread API."""
+
+import time
+import uuid
+from bisect import bisect_left
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .agent_thread import AgentThread, ThreadMessage, SUMMARY_PREFIX
+
+# Interned role codes; records store a small int instead of a string per message.
+# Unknown roles are appended in place, so every importer sees the same table.
+ROLES: List[str] = ["system", "user", "assistant", "tool"]
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+
+def _role_code(role: str) -> int:
+    """Get the code for a role, registering unknown roles on first use."""
+    code = ROLE_CODES.get(role)
+    if code is None:
+        code = len(ROLES)
+        ROLES.append(role)
+        ROLE_CODES[role] = code
+    return code
+
+
+class MessageRecord:
+    """Slotted message record; ids are generated lazily and metadata is optional."""
+
+    __slots__ = ("_id", "role_code", "content", "created", "metadata")
+
+    def __init__(
+        self,
+        role_code: int,
+        content: str,
+        created: float,
+        metadata: Optional[Dict[str, Any]] = None,
+        message_id: Optional[str] = None
+    ):
+        self._id = message_id
+        self.role_code = role_code
+        self.content = content
+        self.created = created
+        self.metadata = metadata or None
+
+    @property
+    def id(self) -> str:
+        """Message id, generated on first access."""
+        if self._id is None:
+            self._id = str(uuid.uuid4())
+        return self._id
+
+    @property
+    def role(self) -> str:
+        """Role name."""
+        return ROLES[self.role_code]
+
+    def to_message(self) -> ThreadMessage:
+        """Materialize a pydantic ThreadMessage view of this record."""
+        return ThreadMessage(
+            id=self.id,
+            role=self.role,
+            content=self.content,
+            timestamp=datetime.fromtimestamp(self.created),
+            metadata=dict(self.metadata) if self.metadata else {}
+        )
+
+    @classmethod
+    def from_message(cls, message: ThreadMessage) -> "MessageRecord":
+        """Create a record from a ThreadMessage."""
+        return cls(
+            role_code=_role_code(message.role),
+            content=message.content,
+            created=message.timestamp.timestamp(),
+            metadata=message.metadata,
+            message_id=message.id
+        )
+
+
+class MessageListView(Sequence):
+    """Read-mostly list view over records that materializes ThreadMessages on access."""
+
+    def __init__(self, thread: "CompactAgentThread"):
+        self._thread = thread
+
+    def __len__(self) -> int:
+        return len(self._thread._records)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ThreadMessage, List[ThreadMessage]]:
+        if isinstance(index, slice):
+            return [record.to_message() for record in self._thread._records[index]]
+        return self._thread._records[index].to_message()
+
+    def __iter__(self) -> Iterator[ThreadMessage]:
+        for record in self._thread._records:
+            yield record.to_message()
+
+    def append(self, message: ThreadMessage) -> None:
+        """Append a message without touching the thread's updated_at."""
+        self._thread._append_record(MessageRecord.from_message(message))
+
+    def clear(self) -> None:
+        """Remove all messages."""
+        self._thread._reset_records()
+
+
+class CompactAgentThread(AgentThread):
+    """AgentThread backed by slotted records, interned role codes and a per-role index.
+
+    `messages` returns a lazy view; pydantic ThreadMessage objects are only built
+    when a caller actually reads them, and the add methods return the record
+    itself. Wire messages are built from the records on each call instead of
+    being kept in a second, per-message buffer.
+    """
+
+    def __init__(self, thread_id: Optional[str] = None):
+        """Initialize compact agent thread."""
+        self._records: List[MessageRecord] = []
+        self._role_index: Dict[int, List[int]] = {}
+        super().__init__(thread_id)
+
+    @property
+    def messages(self) -> MessageListView:
+        """Lazy view of the thread's messages."""
+        return MessageListView(self)
+
+    @messages.setter
+    def messages(self, messages: List[ThreadMessage]) -> None:
+        self._reset_records()
+        for message in messages:
+            self._append_record(MessageRecord.from_message(message))
+
+    def _reset_records(self) -> None:
+        self._records = []
+        self._role_index = {}
+
+    def _append_record(self, record: MessageRecord) -> None:
+        self._role_index.setdefault(record.role_code, []).append(len(self._records))
+        self._records.append(record)
+
+    def _iter_role_content(self, start: int) -> Iterable[Tuple[str, str]]:
+        for record in self._records[start:]:
+            yield ROLES[record.role_code], record.content
+
+    def _add(self, role: str, content: str, metadata: Optional[Dict[str, Any]]) -> MessageRecord:
+        record = MessageRecord(_role_code(role), content, time.time(), metadata)
+        self._append_record(record)
+        self.updated_at = datetime.now()
+        return record
+
+    def add_message(self, message: ThreadMessage) -> None:
+        """Add a message to the thread."""
+        self._append_record(MessageRecord.from_message(message))
+        self.updated_at = datetime.now()
+
+    def add_user_message(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> MessageRecord:
+        """Add a user message to the thread."""
+        return self._add("user", content, metadata)
+
+    def add_assistant_message(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> MessageRecord:
+        """Add an assistant message to the thread."""
+        return self._add("assistant", content, metadata)
+
+    def add_system_message(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> MessageRecord:
+        """Add a system message to the thread."""
+        return self._add("system", content, metadata)
+
+    def get_messages(self, role: Optional[str] = None, limit: Optional[int] = None) -> List[ThreadMessage]:
+        """Get messages from the thread, optionally filtered by role and limited."""
+        if role:
+            positions = self._role_index.get(ROLE_CODES.get(role, -1), [])
+            if limit:
+                positions = positions[-limit:]
+            return [self._records[i].to_message() for i in positions]
+
+        records = self._records[-limit:] if limit else self._records
+        return [record.to_message() for record in records]
+
+    def get_conversation_history(self, include_system: bool = True, include_compacted: bool = False) -> List[Dict[str, str]]:
+        """Get conversation history in a format suitable for LLM APIs."""
+        system_code = ROLE_CODES["system"]
+        compacted = self.summary is not None and not include_compacted
+        start = self.summary_until if compacted else 0
+        system_positions = self._role_index.get(system_code, [])
+        leading = not system_positions or system_positions[-1] == len(system_positions) - 1
+
+        if leading or not include_system:
+            # Fast path: system messages lead the thread (the common case) or are excluded
+            history = (
+                [{"role": "system", "content": self._records[i].content} for i in system_positions]
+                if include_system else []
+            )
+            if compacted:
+                history.append({"role": "system", "content": f"{SUMMARY_PREFIX}{self.summary}"})
+            history.extend(
+                {"role": ROLES[r.role_code], "content": r.content}
+                for r in self._records[start:] if r.role_code != system_code
+            )
+            return history
+
+        # Interleaved system messages: keep them in their original positions
+        history = []
+        for index, record in enumerate(self._records):
+            if record.role_code == system_code:
+                history.append({"role": "system", "content": record.content})
+            elif index >= start:
+                history.append({"role": ROLES[record.role_code], "content": record.content})
+        if compacted:
+            insert_at = 0
+            while insert_at < len(history) and history[insert_at]["role"] == "system":
+                insert_at += 1
+            history.insert(insert_at, {"role": "system", "content": f"{SUMMARY_PREFIX}{self.summary}"})
+        return history
+
+    def get_wire_messages(self) -> List[Dict[str, str]]:
+        """Get the conversation history as Groq wire messages, built from the records."""
+        return self.get_conversation_history()
+
+    def get_last_message(self, role: Optional[str] = None) -> Optional[ThreadMessage]:
+        """Get the last message, optionally filtered by role."""
+        if role:
+            positions = self._role_index.get(ROLE_CODES.get(role, -1))
+            return self._records[positions[-1]].to_message() if positions else None
+        return self._records[-1].to_message() if self._records else None
+
+    def count_messages(self, role: Optional[str] = None) -> int:
+        """Count messages, optionally filtered by role, without materializing them."""
+        if role:
+            return len(self._role_index.get(ROLE_CODES.get(role, -1), []))
+        return len(self._records)
+
+    def messages_since(self, index: int, role: Optional[str] = None) -> List[ThreadMessage]:
+        """Get messages at or after position `index`, optionally filtered by role."""
+        if role:
+            positions = self._role_index.get(ROLE_CODES.get(role, -1), [])
+            return [self._records[i].to_message() for i in positions[bisect_left(positions, index):]]
+        return [record.to_message() for record in self._records[index:]]
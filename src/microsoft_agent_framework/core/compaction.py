@@ -0,0 +1,114 @@
+"""Rolling summarization (compaction) of long agent threads."""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from .agent_thread import AgentThread
+from .token_budget import summarize_messages
+from .tokens import estimate_messages_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadCompactor:
+    """Folds older turns of a thread into a running summary off the request path.
+
+    Compaction triggers once the uncompacted part of a thread exceeds
+    `max_messages` messages or `max_tokens` estimated tokens. The most recent
+    `keep_recent` messages are always left verbatim, and raw messages stay in
+    the thread for audit.
+    """
+
+    def __init__(
+        self,
+        groq_client: Any,
+        model: Optional[str] = "llama-3.1-8b-instant",
+        max_messages: int = 40,
+        max_tokens: Optional[int] = None,
+        keep_recent: int = 10,
+        summary_max_tokens: int = 512
+    ):
+        """Initialize the compactor."""
+        self.groq_client = groq_client
+        self.model = model
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.summary_max_tokens = summary_max_tokens
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _pending_messages(self, thread: AgentThread) -> List[Dict[str, Any]]:
+        """Non-system messages not yet covered by the summary."""
+        return [
+            {"role": role, "content": content}
+            for role, content in thread._iter_role_content(thread.summary_until)
+            if role != "system"
+        ]
+
+    def needs_compaction(self, thread: AgentThread) -> bool:
+        """Check whether a thread has grown past the compaction threshold."""
+        pending = self._pending_messages(thread)
+        if len(pending) <= self.keep_recent:
+            return False
+        if len(pending) > self.max_messages:
+            return True
+        return self.max_tokens is not None and estimate_messages_tokens(pending) > self.max_tokens
+
+    async def compact(self, thread: AgentThread) -> bool:
+        """Fold everything but the most recent messages into the thread's summary."""
+        generation = thread.generation
+        start = thread.summary_until
+        entries = list(thread._iter_role_content(start))
+        keep = 0
+        recent = 0
+        while keep < len(entries) and recent < self.keep_recent:
+            keep += 1
+            if entries[-keep][0] != "system":
+                recent += 1
+        until = start + len(entries) - keep
+
+        to_fold = [
+            {"role": role, "content": content}
+            for role, content in entries[:len(entries) - keep]
+            if role != "system"
+        ]
+        if not to_fold:
+            return False
+
+        summary = await summarize_messages(
+            self.groq_client,
+            to_fold,
+            model=self.model,
+            previous_summary=thread.summary,
+            max_tokens=self.summary_max_tokens
+        )
+
+        # The thread may have been cleared while the summary was being generated
+        if thread.generation != generation:
+            return False
+
+        thread.set_summary(summary, until)
+        logger.debug(f"Compacted {len(to_fold)} messages of thread {thread.id}")
+        return True
+
+    def schedule(self, thread: AgentThread) -> Optional[asyncio.Task]:
+        """Start a background compaction for the thread if it needs one and none is running."""
+        if thread.id in self._tasks or not self.needs_compaction(thread):
+            return None
+
+        task = asyncio.create_task(self.compact(thread))
+        self._tasks[thread.id] = task
+
+        def _done(t: asyncio.Task, thread_id: str = thread.id) -> None:
+            self._tasks.pop(thread_id, None)
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"Compaction of thread {thread_id} failed: {t.exception()}")
+
+        task.add_done_callback(_done)
+        return task
+
+    async def wait(self) -> None:
+        """Wait for all in-flight compactions to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
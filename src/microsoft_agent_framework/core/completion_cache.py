@@ -0,0 +1,306 @@
+"""Exact-match response cache for deterministic Groq completions."""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+
+def make_cache_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    tools: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    """Build a stable cache key from everything that determines a completion."""
+    request = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+    if tools:
+        request["tools"] = tools
+    payload = json.dumps(
+        request,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache(ABC):
+    """Abstract base class for completion cache backends."""
+
+    def __init__(self, ttl: Optional[float] = 3600.0):
+        """Initialize cache counters; `ttl` is in seconds (None disables expiry)."""
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached completion, counting hits and misses."""
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a completion."""
+        await self._set(key, value)
+
+    def _expired(self, stored_at: float) -> bool:
+        """Check whether an entry stored at `stored_at` has outlived the TTL."""
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Backend lookup returning None on miss or expiry."""
+        pass
+
+    @abstractmethod
+    async def _set(self, key: str, value: Dict[str, Any]) -> None:
+        """Backend store."""
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove all entries."""
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class InMemoryCompletionCache(CompletionCache):
+    """In-process LRU cache with TTL expiry."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 3600.0):
+        """Initialize in-memory cache."""
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    async def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self._expired(stored_at):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _set(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["entries"] = len(self._entries)
+        return stats
+
+
+class FileCompletionCache(CompletionCache):
+    """On-disk cache storing one JSON file per key.
+
+    Reads refresh a file's mtime, so once there are more than `max_entries`
+    files the least recently used are deleted, down to 90% of the cap so the
+    directory is not rescanned on every write. The count is kept per process;
+    other processes sharing the directory are only seen at the next scan.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 10_000, ttl: Optional[float] = 3600.0):
+        """Initialize file cache in `directory`."""
+        super().__init__(ttl)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._count_lock = threading.Lock()
+        self._count = sum(1 for _ in self.directory.glob("*.json"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _unlink(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._count_lock:
+            self._count -= 1
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if self._expired(entry["stored_at"]):
+            self._unlink(path)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry["value"]
+
+    def _write(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        # A unique temporary file per writer, so concurrent writes of one key never share it
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False
+        ) as f:
+            json.dump({"stored_at": time.time(), "value": value}, f, ensure_ascii=False)
+        existed = path.exists()
+        os.replace(f.name, path)
+        if existed:
+            return
+        with self._count_lock:
+            self._count += 1
+            over = self._count > self.max_entries
+        if over:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        with self._count_lock:
+            self._count = len(entries)
+        entries.sort()
+        for _, path in entries[:max(len(entries) - int(self.max_entries * 0.9), 0)]:
+            self._unlink(path)
+
+    async def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def _set(self, key: str, value: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._write, key, value)
+
+    async def clear(self) -> None:
+        def _clear():
+            for path in self.directory.glob("*.json"):
+                self._unlink(path)
+        await asyncio.to_thread(_clear)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["entries"] = self._count
+        return stats
+
+
+class SQLiteCompletionCache(CompletionCache):
+    """SQLite-backed cache with TTL expiry and a size cap."""
+
+    def __init__(self, db_path: str, max_entries: int = 100_000, ttl: Optional[float] = 3600.0):
+        """Initialize SQLite cache at `db_path`."""
+        super().__init__(ttl)
+        self.db_path = db_path
+        self.max_entries = max_entries
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # asyncio locks belong to one event loop, so each loop queues on its own;
+        # the thread lock serializes use of the shared connection across loops
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        self._conn_lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_stored_at ON completions(stored_at)")
+        self._conn.commit()
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._conn_lock:
+            row = self._conn.execute("SELECT value, stored_at FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[0])
+
+    def _write(self, key: str, value: Dict[str, Any]) -> None:
+        with self._conn_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM completions WHERE key IN ("
+                "SELECT key FROM completions ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def _clear(self) -> None:
+        with self._conn_lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+
+    async def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        async with self._lock():
+            return await asyncio.to_thread(self._read, key)
+
+    async def _set(self, key: str, value: Dict[str, Any]) -> None:
+        async with self._lock():
+            await asyncio.to_thread(self._write, key, value)
+
+    async def clear(self) -> None:
+        async with self._lock():
+            await asyncio.to_thread(self._clear)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+def create_completion_cache(
+    backend: str = "memory",
+    path: Optional[str] = None,
+    max_entries: int = 1024,
+    ttl: Optional[float] = 3600.0
+) -> CompletionCache:
+    """Create a completion cache for the named backend ("memory", "file" or "sqlite")."""
+    if backend == "memory":
+        return InMemoryCompletionCache(max_entries=max_entries, ttl=ttl)
+    if backend == "file":
+        return FileCompletionCache(path or ".cache/completions", max_entries=max_entries, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteCompletionCache(path or ".cache/completions.db", max_entries=max_entries, ttl=ttl)
+    raise ValueError(f"Unsupported completion cache backend: {backend}")
@@ -1,13 +1,141 @@
 """Context provider for agent memory and context management."""
 
-from typing import Dict, List, Any, Optional, Protocol
+from typing import Dict, List, Any, Optional, Protocol, Tuple, BinaryIO
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from pydantic import BaseModel
+import asyncio
 import json
+import logging
+import os
+import time
 from datetime import datetime
 
+from .text_index import BM25Index
+
+logger = logging.getLogger(__name__)
+
+
+class EvictionPolicy(BaseModel):
+    """Limits on a context store; a limit of None is disabled."""
+    max_entries: Optional[int] = None
+    max_bytes: Optional[int] = None
+    ttl: Optional[float] = None  # seconds since an entry was last written (or retrieved, with lru)
+    lru: bool = True  # retrievals refresh recency; otherwise entries age from their last write
+
+
+@dataclass
+class EvictionStats:
+    """Eviction counters for monitoring."""
+    evicted: int = 0
+    evicted_bytes: int = 0
+    by_reason: Dict[str, int] = field(default_factory=lambda: {"ttl": 0, "max_entries": 0, "max_bytes": 0})
+
 
 class ContextProvider(ABC):
-    """Abstract base class for context providers."""
+    """Abstract base class for context providers.
+    
+    Providers given an EvictionPolicy track entries in recency order (an
+    OrderedDict of id -> (bytes, last use)), so finding and removing the least
+    recently used or expired entry is O(1).
+    """
+    
+    eviction_policy: Optional[EvictionPolicy] = None
+    # Characters of content held in memory, for providers that keep it there
+    content_chars = 0
+    
+    def _resize_content(self, old: str = "", new: str = "") -> None:
+        """Keep `content_chars` current as an entry's content is added, replaced or removed."""
+        self.content_chars += len(new) - len(old)
+    
+    def _init_eviction(self, policy: Optional[EvictionPolicy]) -> None:
+        """Set up recency tracking for `policy`."""
+        self.eviction_policy = policy
+        self.eviction_stats = EvictionStats()
+        self._recency: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._tracked_bytes = 0
+    
+    def _track(self, context_id: str, content: str) -> None:
+        """Record a write of `context_id`, making it the most recently used entry."""
+        if self.eviction_policy is None:
+            return
+        self._untrack(context_id)
+        size = len(content.encode("utf-8"))
+        self._recency[context_id] = (size, time.monotonic())
+        self._tracked_bytes += size
+    
+    def _touch(self, context_ids: List[str]) -> None:
+        """Mark retrieved entries as recently used (LRU policies only)."""
+        if self.eviction_policy is None or not self.eviction_policy.lru:
+            return
+        now = time.monotonic()
+        for context_id in context_ids:
+            entry = self._recency.get(context_id)
+            if entry is not None:
+                self._recency[context_id] = (entry[0], now)
+                self._recency.move_to_end(context_id)
+    
+    def _untrack(self, context_id: str) -> None:
+        """Stop tracking a removed entry."""
+        if self.eviction_policy is None:
+            return
+        entry = self._recency.pop(context_id, None)
+        if entry is not None:
+            self._tracked_bytes -= entry[0]
+    
+    def _pop_evictions(self) -> List[Tuple[str, str, int]]:
+        """Untrack and return (id, reason, bytes) for every entry over a limit, oldest first."""
+        policy = self.eviction_policy
+        if policy is None:
+            return []
+        
+        now = time.monotonic()
+        victims = []
+        while self._recency:
+            context_id, (size, last_used) = next(iter(self._recency.items()))
+            if policy.ttl is not None and now - last_used > policy.ttl:
+                reason = "ttl"
+            elif policy.max_entries is not None and len(self._recency) > policy.max_entries:
+                reason = "max_entries"
+            elif policy.max_bytes is not None and self._tracked_bytes > policy.max_bytes:
+                reason = "max_bytes"
+            else:
+                break
+            self._untrack(context_id)
+            victims.append((context_id, reason, size))
+        return victims
+    
+    def _record_eviction(self, reason: str, size: int, count: int = 1) -> None:
+        self.eviction_stats.evicted += count
+        self.eviction_stats.evicted_bytes += size
+        self.eviction_stats.by_reason[reason] = self.eviction_stats.by_reason.get(reason, 0) + count
+    
+    async def enforce_limits(self) -> int:
+        """Evict entries that exceed the eviction policy; returns the number evicted."""
+        victims = self._pop_evictions()
+        for context_id, reason, size in victims:
+            await self.delete_context(context_id)
+            self._record_eviction(reason, size)
+        if victims:
+            logger.debug(f"Evicted {len(victims)} contexts from {type(self).__name__}")
+        return len(victims)
+    
+    def _tracked_usage(self) -> Dict[str, Any]:
+        return {"entries": len(self._recency), "bytes": self._tracked_bytes}
+    
+    def get_eviction_stats(self) -> Optional[Dict[str, Any]]:
+        """Get eviction counters and current usage (None without an eviction policy)."""
+        if self.eviction_policy is None:
+            return None
+        return {
+            "policy": self.eviction_policy.model_dump(),
+            **self._tracked_usage(),
+            "evicted": self.eviction_stats.evicted,
+            "evicted_bytes": self.eviction_stats.evicted_bytes,
+            "evicted_by_reason": dict(self.eviction_stats.by_reason)
+        }
     
     @abstractmethod
     async def get_context(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
@@ -18,7 +146,11 @@ class ContextProvider(ABC):
     async def add_context(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
         """Add content to the context store."""
         pass
-    
+
+    async def add_contexts(self, items: List[Dict[str, Any]]) -> List[str]:
+        """Add many {"content", "metadata"} items; providers override this to batch the writes."""
+        return [await self.add_context(item["content"], item.get("metadata")) for item in items]
+
     @abstractmethod
     async def update_context(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Update existing context."""
@@ -31,34 +163,40 @@ class ContextProvider(ABC):
 
 
 class InMemoryContextProvider(ContextProvider):
-    """In-memory implementation of context provider."""
+    """In-memory implementation of context provider, ranked with a BM25 inverted index."""
     
-    def __init__(self):
-        """Initialize in-memory context provider."""
+    def __init__(self, eviction_policy: Optional[EvictionPolicy] = None, champion_size: Optional[int] = None):
+        """Initialize in-memory context provider.
+        
+        Retrieval is exact unless `champion_size` is set, which bounds the work per
+        query at some cost in recall (see BM25Index).
+        """
         self.contexts: Dict[str, Dict[str, Any]] = {}
         self._counter = 0
+        self._index = BM25Index(champion_size=champion_size)
+        self._init_eviction(eviction_policy)
     
     async def get_context(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Retrieve relevant context based on query (simple text matching)."""
+        """Retrieve the contexts most relevant to the query, ranked by BM25 score."""
+        # Drop expired entries before they can be returned
+        if self.eviction_policy is not None and self.eviction_policy.ttl is not None:
+            await self.enforce_limits()
+        
         results = []
-        query_lower = query.lower()
-        
-        for context_id, context_data in self.contexts.items():
-            content = context_data.get("content", "").lower()
-            if query_lower in content:
-                results.append({
-                    "id": context_id,
-                    "content": context_data.get("content", ""),
-                    "metadata": context_data.get("metadata", {}),
-                    "timestamp": context_data.get("timestamp")
-                })
-        
-        # Sort by timestamp (most recent first) and limit results
-        results.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        return results[:limit]
+        for context_id, score in self._index.search(query, limit):
+            context_data = self.contexts[context_id]
+            results.append({
+                "id": context_id,
+                "content": context_data.get("content", ""),
+                "metadata": context_data.get("metadata", {}),
+                "timestamp": context_data.get("timestamp"),
+                "score": score
+            })
+        self._touch([result["id"] for result in results])
+        return results
     
-    async def add_context(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Add content to the context store."""
+    def _insert(self, content: str, metadata: Optional[Dict[str, Any]]) -> str:
+        """Store and index a new entry."""
         self._counter += 1
         context_id = f"ctx_{self._counter}"
         
@@ -67,109 +205,344 @@ class InMemoryContextProvider(ContextProvider):
             "metadata": metadata or {},
             "timestamp": datetime.now().isoformat()
         }
+        self._resize_content(new=content)
+        self._index.add(context_id, content)
+        self._track(context_id, content)
         
         return context_id
     
-    async def update_context(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
-        """Update existing context."""
+    def _replace(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]]) -> bool:
+        """Replace an existing entry's content and reindex it."""
         if context_id not in self.contexts:
             return False
         
+        self._resize_content(self.contexts[context_id]["content"], content)
         self.contexts[context_id]["content"] = content
         if metadata is not None:
             self.contexts[context_id]["metadata"] = metadata
         self.contexts[context_id]["timestamp"] = datetime.now().isoformat()
+        self._index.add(context_id, content)
+        self._track(context_id, content)
         
         return True
     
+    async def add_context(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Add content to the context store."""
+        context_id = self._insert(content, metadata)
+        await self.enforce_limits()
+        return context_id
+    
+    async def update_context(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Update existing context."""
+        if not self._replace(context_id, content, metadata):
+            return False
+        await self.enforce_limits()
+        return True
+    
     async def delete_context(self, context_id: str) -> bool:
         """Delete context by ID."""
         if context_id in self.contexts:
-            del self.contexts[context_id]
+            self._resize_content(old=self.contexts.pop(context_id)["content"])
+            self._index.remove(context_id)
+            self._untrack(context_id)
             return True
         return False
 
 
-class FileContextProvider(ContextProvider):
-    """File-based context provider."""
+class FileContextProvider(InMemoryContextProvider):
+    """File-based context provider backed by an append-only JSON Lines log.
     
-    def __init__(self, file_path: str):
+    Every change appends one record ("put" or "del" tombstone) instead of
+    rewriting the file. Concurrent writes share a single fsync (group commit),
+    the log is compacted in the background once most of it is garbage, and a
+    torn final line left by a crash is truncated on load. Legacy JSON files
+    are migrated on first use.
+    """
+    
+    def __init__(
+        self,
+        file_path: str,
+        fsync: bool = True,
+        compact_min_bytes: int = 1024 * 1024,
+        compact_garbage_ratio: float = 0.5,
+        eviction_policy: Optional[EvictionPolicy] = None,
+        champion_size: Optional[int] = None
+    ):
         """Initialize file-based context provider."""
-        self.file_path = file_path
-        self.contexts: Dict[str, Dict[str, Any]] = {}
-        self._counter = 0
+        super().__init__(eviction_policy, champion_size)
+        path = Path(file_path)
+        self.file_path = str(path.with_suffix(".jsonl") if path.suffix == ".json" else path)
+        self.legacy_path = str(path.with_suffix(".json"))
+        self.fsync = fsync
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_garbage_ratio = compact_garbage_ratio
+        
+        # Offset index: context id -> (offset, length) of its live record in the log
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._log_size = 0
+        self._live_bytes = 0
+        self._file: Optional[BinaryIO] = None
+        self._pending: List[Tuple[str, bool, bytes, asyncio.Future]] = []
+        self._compact_waiters: List[asyncio.Future] = []
+        self._writer: Optional[asyncio.Task] = None
+        
         self._load_contexts()
     
     def _load_contexts(self):
-        """Load contexts from file."""
+        """Replay the log into memory, migrating a legacy JSON file if there is no log yet."""
+        if not os.path.exists(self.file_path) and os.path.exists(self.legacy_path):
+            self._migrate_legacy()
+        
+        try:
+            with open(self.file_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        
+        offset = 0
+        while offset < len(data):
+            end = data.find(b"\n", offset)
+            if end == -1:
+                # Torn write from a crash: drop the partial record
+                logger.warning(f"Truncating incomplete record at offset {offset} in {self.file_path}")
+                with open(self.file_path, 'r+b') as f:
+                    f.truncate(offset)
+                break
+            line = data[offset:end + 1]
+            try:
+                self._apply_record(json.loads(line), offset, len(line))
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping corrupt record at offset {offset} in {self.file_path}: {e}")
+            offset = end + 1
+        self._log_size = offset
+    
+    def _apply_record(self, record: Dict[str, Any], offset: int, length: int) -> None:
+        """Apply one replayed log record to the in-memory state."""
+        op = record["op"]
+        if op == "meta":
+            self._counter = max(self._counter, record["counter"])
+            return
+        
+        context_id = record["id"]
+        self._drop_offset(context_id)
+        if op == "put":
+            previous = self.contexts.get(context_id)
+            self._resize_content(previous["content"] if previous else "", record["content"])
+            self.contexts[context_id] = {
+                "content": record["content"],
+                "metadata": record.get("metadata") or {},
+                "timestamp": record.get("timestamp")
+            }
+            self._index.add(context_id, record["content"])
+            self._track(context_id, record["content"])
+            self._offsets[context_id] = (offset, length)
+            self._live_bytes += length
+            if context_id.startswith("ctx_") and context_id[4:].isdigit():
+                self._counter = max(self._counter, int(context_id[4:]))
+        elif op == "del":
+            previous = self.contexts.pop(context_id, None)
+            if previous is not None:
+                self._resize_content(old=previous["content"])
+            self._index.remove(context_id)
+            self._untrack(context_id)
+    
+    def _drop_offset(self, context_id: str) -> None:
+        previous = self._offsets.pop(context_id, None)
+        if previous:
+            self._live_bytes -= previous[1]
+    
+    def _migrate_legacy(self) -> None:
+        """Convert a legacy single-document JSON file into a log."""
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                self.contexts = data.get("contexts", {})
-                self._counter = data.get("counter", 0)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.contexts = {}
-            self._counter = 0
-    
-    def _save_contexts(self):
-        """Save contexts to file."""
-        data = {
-            "contexts": self.contexts,
-            "counter": self._counter
+        except json.JSONDecodeError as e:
+            logger.warning(f"Cannot migrate unreadable context file {self.legacy_path}: {e}")
+            return
+        
+        lines = [self._encode({"op": "meta", "counter": data.get("counter", 0)})]
+        for context_id, context_data in data.get("contexts", {}).items():
+            lines.append(self._encode_put(context_id, context_data))
+        self._write_snapshot(lines)
+        os.replace(self.legacy_path, f"{self.legacy_path}.migrated")
+        logger.info(f"Migrated {len(lines) - 1} contexts from {self.legacy_path} to {self.file_path}")
+    
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+    
+    def _encode_put(self, context_id: str, context_data: Dict[str, Any]) -> bytes:
+        return self._encode({
+            "op": "put",
+            "id": context_id,
+            "content": context_data.get("content", ""),
+            "metadata": context_data.get("metadata", {}),
+            "timestamp": context_data.get("timestamp")
+        })
+    
+    def _write_snapshot(self, lines: List[bytes]) -> List[int]:
+        """Atomically replace the log with `lines`; returns their offsets. Runs in a worker thread."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        
+        tmp_path = f"{self.file_path}.tmp"
+        offsets = []
+        position = 0
+        with open(tmp_path, 'wb') as f:
+            for line in lines:
+                offsets.append(position)
+                position += len(line)
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+        
+        # Make the rename itself durable
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.file_path)), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        return offsets
+    
+    def _write_batch(self, lines: List[bytes]) -> int:
+        """Append lines with one write and one fsync; returns the starting offset. Runs in a worker thread."""
+        if self._file is None:
+            self._file = open(self.file_path, 'ab')
+        start = self._file.tell()
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        return start
+    
+    def _ensure_writer(self) -> None:
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+    
+    async def _append(self, context_id: str, line: bytes, live: bool) -> None:
+        """Queue a record and wait until it has been committed to disk.
+        
+        `live` marks a "put" that becomes the context's current record; tombstones are never live.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((context_id, live, line, future))
+        self._ensure_writer()
+        await future
+    
+    async def _write_pending(self) -> None:
+        """Commit queued records in batches and compact the log between batches.
+        
+        Records queued during an fsync join the next batch. Compaction only runs
+        here, so a snapshot never races an append to the file it replaces.
+        """
+        while self._pending or self._compact_waiters:
+            if self._pending:
+                batch, self._pending = self._pending, []
+                await self._commit_batch(batch)
+            
+            if self._compact_waiters or self._needs_compaction():
+                waiters, self._compact_waiters = self._compact_waiters, []
+                await self._compact()
+                for future in waiters:
+                    if not future.done():
+                        future.set_result(None)
+    
+    async def _commit_batch(self, batch: List[Tuple[str, bool, bytes, asyncio.Future]]) -> None:
+        """Append one batch of records and update the offset index."""
+        try:
+            start = await asyncio.to_thread(self._write_batch, [line for _, _, line, _ in batch])
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        offset = start
+        for context_id, live, line, future in batch:
+            self._drop_offset(context_id)
+            if live:
+                self._offsets[context_id] = (offset, len(line))
+                self._live_bytes += len(line)
+            offset += len(line)
+            if not future.done():
+                future.set_result(None)
+        self._log_size = offset
+    
+    def _needs_compaction(self) -> bool:
+        """Check whether enough of the log is superseded records to be worth rewriting."""
+        if self._log_size < self.compact_min_bytes:
+            return False
+        return (self._log_size - self._live_bytes) / self._log_size >= self.compact_garbage_ratio
+    
+    async def _compact(self) -> None:
+        """Rewrite the log with only live records. Only called by the writer task."""
+        ids = list(self.contexts.keys())
+        lines = [self._encode({"op": "meta", "counter": self._counter})]
+        lines.extend(self._encode_put(context_id, self.contexts[context_id]) for context_id in ids)
+        
+        try:
+            offsets = await asyncio.to_thread(self._write_snapshot, lines)
+        except Exception as e:
+            logger.warning(f"Compaction of {self.file_path} failed: {e}")
+            return
+        
+        self._offsets = {
+            context_id: (offset, len(line))
+            for context_id, offset, line in zip(ids, offsets[1:], lines[1:])
         }
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._live_bytes = sum(len(line) for line in lines[1:])
+        self._log_size = self._live_bytes + len(lines[0])
+        logger.debug(f"Compacted {self.file_path} to {len(ids)} contexts")
     
-    async def get_context(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Retrieve relevant context based on query."""
-        results = []
-        query_lower = query.lower()
-        
-        for context_id, context_data in self.contexts.items():
-            content = context_data.get("content", "").lower()
-            if query_lower in content:
-                results.append({
-                    "id": context_id,
-                    "content": context_data.get("content", ""),
-                    "metadata": context_data.get("metadata", {}),
-                    "timestamp": context_data.get("timestamp")
-                })
-        
-        # Sort by timestamp (most recent first) and limit results
-        results.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        return results[:limit]
+    async def flush(self) -> None:
+        """Wait until all queued writes are on disk."""
+        while self._writer is not None and not self._writer.done():
+            await self._writer
+    
+    async def compact(self) -> None:
+        """Compact the log now, after the writes queued so far are on disk."""
+        future = asyncio.get_running_loop().create_future()
+        self._compact_waiters.append(future)
+        self._ensure_writer()
+        await future
+    
+    async def close(self) -> None:
+        """Flush pending writes and close the log file."""
+        await self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def get_log_stats(self) -> Dict[str, Any]:
+        """Get log size and garbage statistics."""
+        return {
+            "contexts": len(self.contexts),
+            "log_bytes": self._log_size,
+            "live_bytes": self._live_bytes,
+            "garbage_ratio": (self._log_size - self._live_bytes) / self._log_size if self._log_size else 0.0
+        }
     
     async def add_context(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
         """Add content to the context store."""
-        self._counter += 1
-        context_id = f"ctx_{self._counter}"
-        
-        self.contexts[context_id] = {
-            "content": content,
-            "metadata": metadata or {},
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        self._save_contexts()
+        context_id = self._insert(content, metadata)
+        await self._append(context_id, self._encode_put(context_id, self.contexts[context_id]), live=True)
+        await self.enforce_limits()
         return context_id
     
     async def update_context(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Update existing context."""
-        if context_id not in self.contexts:
+        if not self._replace(context_id, content, metadata):
             return False
-        
-        self.contexts[context_id]["content"] = content
-        if metadata is not None:
-            self.contexts[context_id]["metadata"] = metadata
-        self.contexts[context_id]["timestamp"] = datetime.now().isoformat()
-        
-        self._save_contexts()
+        await self._append(context_id, self._encode_put(context_id, self.contexts[context_id]), live=True)
+        await self.enforce_limits()
         return True
     
     async def delete_context(self, context_id: str) -> bool:
         """Delete context by ID."""
-        if context_id in self.contexts:
-            del self.contexts[context_id]
-            self._save_contexts()
-            return True
-        return False
+        if not await super().delete_context(context_id):
+            return False
+        await self._append(context_id, self._encode({"op": "del", "id": context_id}), live=False)
+        return True
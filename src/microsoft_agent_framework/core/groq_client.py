@@ -1,11 +1,26 @@
 """Groq client implementation for the Microsoft Agent Framework."""
 
 import os
-from typing import Dict, List, Optional, Any, AsyncGenerator
-from groq import Groq, AsyncGroq
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Any, AsyncGenerator, Tuple, Union
 from pydantic import BaseModel
 import json
 
+from groq import RateLimitError
+
+from .transport import TransportSettings, get_transport_registry
+from .rate_limiter import RateLimiter, ModelRateLimit, parse_retry_after
+from .tokens import estimate_messages_tokens, CHARS_PER_TOKEN
+from .completion_cache import CompletionCache, create_completion_cache, make_cache_key
+from .resilience import (
+    RetryPolicy, LatencyTracker, CircuitBreaker,
+    is_retryable, should_fall_back, hedged_call, build_model_chain
+)
+
+logger = logging.getLogger(__name__)
+
 
 class GroqConfig(BaseModel):
     """Configuration for Groq client."""
@@ -15,6 +30,38 @@ class GroqConfig(BaseModel):
     max_tokens: int = 4096
     top_p: float = 1.0
     stream: bool = False
+    base_url: Optional[str] = None
+    timeout: float = 60.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    max_concurrent_requests: Optional[int] = 32
+    model_rate_limits: Dict[str, Dict[str, int]] = {}
+    default_retry_after: float = 1.0
+    cache_enabled: bool = False
+    cache_backend: str = "memory"  # "memory", "file", "sqlite"
+    cache_path: Optional[str] = None
+    cache_max_entries: int = 1024
+    cache_ttl: Optional[float] = 3600.0
+    cache_max_temperature: float = 0.3
+    retry_attempts: int = 3
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 8.0
+    hedge_requests: bool = False
+    hedge_percentile: float = 0.95
+    hedge_min_delay: float = 0.5
+    fallback_models: Dict[str, List[str]] = {}
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_cooldown: float = 30.0
+
+
+def _optional_int_env(name: str, default: Optional[int] = None) -> Optional[int]:
+    """Read an optional integer setting from the environment."""
+    value = os.getenv(name)
+    return int(value) if value else default
 
 
 class GroqMessage(BaseModel):
@@ -30,12 +77,30 @@ class GroqResponse(BaseModel):
     model: str
     usage: Dict[str, Any]
     finish_reason: str
+    tool_calls: Optional[List[Dict[str, Any]]] = None
+
+
+# Messages may be GroqMessage models or pre-serialized {"role", "content"} dicts
+MessageInput = Union[GroqMessage, Dict[str, Any]]
+
+
+def to_wire_messages(messages: List[MessageInput]) -> List[Dict[str, Any]]:
+    """Convert messages to Groq wire format, passing pre-serialized dicts through untouched."""
+    return [
+        msg if isinstance(msg, dict) else {"role": msg.role, "content": msg.content}
+        for msg in messages
+    ]
 
 
 class GroqClient:
     """Client for interacting with Groq API."""
     
-    def __init__(self, config: Optional[GroqConfig] = None):
+    def __init__(
+        self,
+        config: Optional[GroqConfig] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[CompletionCache] = None
+    ):
         """Initialize Groq client with configuration."""
         if config is None:
             api_key = os.getenv("GROQ_API_KEY")
@@ -46,31 +111,233 @@ class GroqClient:
                 api_key=api_key,
                 model=os.getenv("DEFAULT_GROQ_MODEL", "llama3-70b-8192"),
                 temperature=float(os.getenv("DEFAULT_TEMPERATURE", "0.7")),
-                max_tokens=int(os.getenv("DEFAULT_MAX_TOKENS", "4096"))
+                max_tokens=int(os.getenv("DEFAULT_MAX_TOKENS", "4096")),
+                base_url=os.getenv("GROQ_BASE_URL") or None,
+                timeout=float(os.getenv("GROQ_TIMEOUT", "60")),
+                max_connections=int(os.getenv("GROQ_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "20")),
+                keepalive_expiry=float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30")),
+                http2=os.getenv("GROQ_HTTP2", "false").lower() in ("1", "true", "yes"),
+                requests_per_minute=_optional_int_env("GROQ_REQUESTS_PER_MINUTE"),
+                tokens_per_minute=_optional_int_env("GROQ_TOKENS_PER_MINUTE"),
+                max_concurrent_requests=_optional_int_env("GROQ_MAX_CONCURRENT_REQUESTS", 32),
+                cache_enabled=os.getenv("GROQ_CACHE_ENABLED", "false").lower() in ("1", "true", "yes"),
+                cache_backend=os.getenv("GROQ_CACHE_BACKEND", "memory"),
+                cache_path=os.getenv("GROQ_CACHE_PATH") or None,
+                cache_ttl=float(os.getenv("GROQ_CACHE_TTL", "3600")),
+                retry_attempts=int(os.getenv("GROQ_RETRY_ATTEMPTS", "3")),
+                hedge_requests=os.getenv("GROQ_HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes"),
+                fallback_models=json.loads(os.getenv("GROQ_FALLBACK_MODELS", "{}"))
             )
         
         self.config = config
-        self.client = Groq(api_key=config.api_key)
-        self.async_client = AsyncGroq(api_key=config.api_key)
+        
+        # Share one pooled transport per API key/base URL across all clients
+        self.transport = get_transport_registry().get_transport(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            settings=TransportSettings(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+                timeout=config.timeout,
+                http2=config.http2
+            )
+        )
+        self.client = self.transport.client
+        self._async_client = None
+        self._closed = False
+        
+        # Groq limits are enforced per API key, so clients sharing a transport share a limiter
+        if rate_limiter is None:
+            if self.transport.rate_limiter is None:
+                self.transport.rate_limiter = self._create_rate_limiter(config)
+            rate_limiter = self.transport.rate_limiter
+        self.rate_limiter = rate_limiter
+        
+        # Opt-in exact-match response cache for low-temperature calls
+        if cache is None and config.cache_enabled:
+            cache = create_completion_cache(
+                backend=config.cache_backend,
+                path=config.cache_path,
+                max_entries=config.cache_max_entries,
+                ttl=config.cache_ttl
+            )
+        self.cache = cache
+        
+        # Resilience: retries, hedged requests and model fallback
+        self.retry_policy = RetryPolicy(
+            max_attempts=max(1, config.retry_attempts),
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay
+        )
+        self.latency_tracker = LatencyTracker()
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=config.circuit_breaker_threshold,
+            cooldown=config.circuit_breaker_cooldown
+        )
+    
+    @property
+    def async_client(self) -> Any:
+        """Async SDK client for the running event loop (pooled per loop by the shared transport)."""
+        return self._async_client or self.transport.async_client
+    
+    @async_client.setter
+    def async_client(self, client: Any) -> None:
+        """Use a specific async client instead of the shared transport's."""
+        self._async_client = client
+    
+    def close(self) -> None:
+        """Detach from the shared transport; its pools stay open for other clients."""
+        if not self._closed:
+            self._closed = True
+            self.transport.detach()
+    
+    async def aclose(self) -> None:
+        """Async alias of close."""
+        self.close()
+    
+    @staticmethod
+    def _create_rate_limiter(config: GroqConfig) -> RateLimiter:
+        """Create a rate limiter from configuration."""
+        return RateLimiter(
+            default_limits=ModelRateLimit(
+                requests_per_minute=config.requests_per_minute,
+                tokens_per_minute=config.tokens_per_minute
+            ),
+            model_limits={
+                model: ModelRateLimit(**limits)
+                for model, limits in config.model_rate_limits.items()
+            },
+            max_concurrent_requests=config.max_concurrent_requests
+        )
+    
+    def _handle_rate_limit_error(self, model: str, error: RateLimitError) -> None:
+        """Pause admissions for a model according to the server's back-off headers."""
+        retry_after = parse_retry_after(getattr(error, "response", None) and error.response.headers)
+        self.rate_limiter.penalize(model, retry_after if retry_after is not None else self.config.default_retry_after)
+    
+    def _hedge_delay(self, model: str) -> Optional[float]:
+        """Delay after which a duplicate request is started, or None to disable hedging."""
+        if not self.config.hedge_requests:
+            return None
+        p95 = self.latency_tracker.percentile(model, self.config.hedge_percentile)
+        return None if p95 is None else max(p95, self.config.hedge_min_delay)
+    
+    async def _send_once(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        **options: Any
+    ) -> Any:
+        """Send a single rate-limited, non-streaming request."""
+        async with self.rate_limiter.acquire(model, estimate_messages_tokens(messages)) as permit:
+            try:
+                response = await self.async_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **options
+                )
+            except RateLimitError as e:
+                self._handle_rate_limit_error(model, e)
+                raise
+            
+            if response.usage is not None:
+                permit.record_usage(response.usage.total_tokens)
+            return response
+    
+    async def _send_with_resilience(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        **options: Any
+    ) -> Tuple[str, Any]:
+        """Send a request with classified retries, optional hedging and model fallback.
+        
+        Returns the model that answered, which is a fallback if `model` failed,
+        and its response.
+        """
+        last_error: Optional[BaseException] = None
+        
+        for candidate in build_model_chain(model, self.config.fallback_models, self.circuit_breaker):
+            for attempt in range(self.retry_policy.max_attempts):
+                start = time.monotonic()
+                try:
+                    response = await hedged_call(
+                        lambda: self._send_once(candidate, messages, temperature, max_tokens, **options),
+                        self._hedge_delay(candidate)
+                    )
+                except Exception as e:
+                    if not should_fall_back(e):
+                        raise
+                    last_error = e
+                    self.circuit_breaker.record_failure(candidate)
+                    if not is_retryable(e):
+                        break
+                    if attempt + 1 < self.retry_policy.max_attempts:
+                        delay = self.retry_policy.backoff_delay(attempt)
+                        logger.info(f"Retrying {candidate} in {delay:.2f}s after {type(e).__name__}")
+                        await asyncio.sleep(delay)
+                    continue
+                
+                self.latency_tracker.record(candidate, time.monotonic() - start)
+                self.circuit_breaker.record_success(candidate)
+                return candidate, response
+            
+            logger.warning(f"Model {candidate} failed after retries: {last_error}")
+        
+        raise last_error
+    
+    def _cache_key(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> Optional[str]:
+        """Get the cache key for a request, or None if it should not be cached."""
+        if self.cache is None or temperature > self.config.cache_max_temperature:
+            return None
+        return make_cache_key(model, messages, temperature, max_tokens, tools)
+    
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get completion cache hit/miss statistics (None if caching is disabled)."""
+        return self.cache.get_stats() if self.cache else None
+    
+    def get_rate_limit_metrics(self) -> Dict[str, Any]:
+        """Get queue depth and wait-time metrics from the rate limiter."""
+        return self.rate_limiter.get_metrics()
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics for this client's shared transport."""
+        return self.transport.pool_stats()
     
     def chat_completion(
         self,
-        messages: List[GroqMessage],
+        messages: List[MessageInput],
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         stream: bool = False
     ) -> GroqResponse:
-        """Send chat completion request to Groq."""
+        """Send a synchronous chat completion request to Groq.
+        
+        Unprotected: this bypasses the completion cache, the rate limiter, retries
+        and model fallback. Use async_chat_completion in services.
+        """
         model = model or self.config.model
         temperature = temperature or self.config.temperature
         max_tokens = max_tokens or self.config.max_tokens
         
         # Convert messages to Groq format
-        groq_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        groq_messages = to_wire_messages(messages)
         
         response = self.client.chat.completions.create(
             model=model,
@@ -92,67 +359,161 @@ class GroqClient:
     
     async def async_chat_completion(
         self,
-        messages: List[GroqMessage],
+        messages: List[MessageInput],
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        stream: bool = False
+        stream: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None
     ) -> GroqResponse:
-        """Send async chat completion request to Groq."""
+        """Send async chat completion request to Groq.
+        
+        When `tools` are given, the response's `tool_calls` holds any function
+        calls the model requested. With `stream=True` the raw SDK stream is
+        returned; it counts against the RPM/TPM buckets, but its concurrency slot
+        is released once the stream is opened, not when it is consumed. Use
+        stream_chat_completion to hold the slot for the whole stream.
+        """
         model = model or self.config.model
-        temperature = temperature or self.config.temperature
+        temperature = self.config.temperature if temperature is None else temperature
         max_tokens = max_tokens or self.config.max_tokens
         
         # Convert messages to Groq format
-        groq_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        groq_messages = to_wire_messages(messages)
         
-        response = await self.async_client.chat.completions.create(
-            model=model,
-            messages=groq_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=stream
-        )
+        cache_key = None if stream else self._cache_key(model, groq_messages, temperature, max_tokens, tools)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return GroqResponse(**cached)
         
         if stream:
-            return response  # Return async generator for streaming
+            # The permit covers opening the stream only; see the docstring
+            async with self.rate_limiter.acquire(model, estimate_messages_tokens(groq_messages)):
+                return await self.async_client.chat.completions.create(
+                    model=model,
+                    messages=groq_messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True
+                )  # Return async generator for streaming
         
-        return GroqResponse(
-            content=response.choices[0].message.content,
+        options: Dict[str, Any] = {}
+        if tools:
+            options["tools"] = tools
+            options["tool_choice"] = tool_choice or "auto"
+        
+        answered_by, response = await self._send_with_resilience(model, groq_messages, temperature, max_tokens, **options)
+        
+        message = response.choices[0].message
+        result = GroqResponse(
+            content=message.content or "",
             model=response.model,
             usage=response.usage.model_dump(),
-            finish_reason=response.choices[0].finish_reason
+            finish_reason=response.choices[0].finish_reason,
+            tool_calls=[
+                {
+                    "id": call.id,
+                    "type": "function",
+                    "function": {"name": call.function.name, "arguments": call.function.arguments}
+                }
+                for call in message.tool_calls
+            ] if getattr(message, "tool_calls", None) else None
         )
+        
+        if cache_key:
+            if answered_by != model:
+                # Never serve a fallback's answer to later requests for the primary model
+                cache_key = self._cache_key(answered_by, groq_messages, temperature, max_tokens, tools)
+            await self.cache.set(cache_key, result.model_dump())
+        
+        return result
     
     async def stream_chat_completion(
         self,
-        messages: List[GroqMessage],
+        messages: List[MessageInput],
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None
     ) -> AsyncGenerator[str, None]:
         """Stream chat completion response from Groq."""
         model = model or self.config.model
-        temperature = temperature or self.config.temperature
+        temperature = self.config.temperature if temperature is None else temperature
         max_tokens = max_tokens or self.config.max_tokens
         
         # Convert messages to Groq format
-        groq_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        groq_messages = to_wire_messages(messages)
         
-        stream = await self.async_client.chat.completions.create(
-            model=model,
-            messages=groq_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=True
-        )
+        cache_key = self._cache_key(model, groq_messages, temperature, max_tokens)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                # Replay the cached completion as a single chunk
+                if cached["content"]:
+                    yield cached["content"]
+                return
+        
+        prompt_tokens = estimate_messages_tokens(groq_messages)
+        parts: List[str] = []
+        last_error: Optional[BaseException] = None
+        answered_by: Optional[str] = None
+        
+        for candidate in build_model_chain(model, self.config.fallback_models, self.circuit_breaker):
+            for attempt in range(self.retry_policy.max_attempts):
+                completion_chars = 0
+                try:
+                    async with self.rate_limiter.acquire(candidate, prompt_tokens) as permit:
+                        try:
+                            stream = await self.async_client.chat.completions.create(
+                                model=candidate,
+                                messages=groq_messages,
+                                temperature=temperature,
+                                max_tokens=max_tokens,
+                                stream=True
+                            )
+                            async for chunk in stream:
+                                if chunk.choices[0].delta.content is not None:
+                                    completion_chars += len(chunk.choices[0].delta.content)
+                                    if cache_key:
+                                        parts.append(chunk.choices[0].delta.content)
+                                    yield chunk.choices[0].delta.content
+                        except RateLimitError as e:
+                            self._handle_rate_limit_error(candidate, e)
+                            raise
+                        finally:
+                            # Streams carry no usage block, so charge an estimate of the completion
+                            permit.record_usage(prompt_tokens + int(completion_chars / CHARS_PER_TOKEN))
+                except Exception as e:
+                    # Once content has been yielded the stream cannot be transparently restarted
+                    if completion_chars or not should_fall_back(e):
+                        raise
+                    last_error = e
+                    self.circuit_breaker.record_failure(candidate)
+                    if not is_retryable(e):
+                        break
+                    if attempt + 1 < self.retry_policy.max_attempts:
+                        await asyncio.sleep(self.retry_policy.backoff_delay(attempt))
+                    continue
+                
+                self.circuit_breaker.record_success(candidate)
+                answered_by = candidate
+                break
+            
+            if answered_by is not None:
+                break
+            logger.warning(f"Model {candidate} failed after retries: {last_error}")
+        
+        if answered_by is None:
+            raise last_error
         
-        async for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                yield chunk.choices[0].delta.content
+        if cache_key:
+            if answered_by != model:
+                # Never serve a fallback's answer to later requests for the primary model
+                cache_key = self._cache_key(answered_by, groq_messages, temperature, max_tokens)
+            await self.cache.set(cache_key, GroqResponse(
+                content="".join(parts),
+                model=answered_by,
+                usage={},
+                finish_reason="stop"
+            ).model_dump())
@@ -0,0 +1,230 @@
+"""PostgreSQL full-text context provider sharing the application's database engine."""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+
+from .context_provider import ContextProvider, EvictionPolicy
+from .text_index import tokenize
+from ..database.models import CONTEXT_SEARCH_CONFIG, AgentContext
+
+logger = logging.getLogger(__name__)
+
+
+def _to_id(context_id: str) -> Optional[int]:
+    """Parse a "ctx_<id>" context id."""
+    if context_id.startswith("ctx_") and context_id[4:].isdigit():
+        return int(context_id[4:])
+    return None
+
+
+class PostgresContextProvider(ContextProvider):
+    """Context provider storing agent memory in the `agent_contexts` table.
+
+    Memory is shared by every app replica and survives restarts. Matching uses
+    the generated tsvector column and its GIN index, and results are ranked by
+    ts_rank. Queries are parsed with the column's text search configuration
+    (CONTEXT_SEARCH_CONFIG). Entries are scoped to `agent_id` when one is given.
+
+    With an eviction policy, limits are enforced in SQL every `eviction_interval`
+    writes, oldest entries first; TTL counts from creation. Policies with `lru`
+    set are rejected, since tracking retrievals would turn every read into a write.
+    """
+
+    def __init__(
+        self,
+        agent_id: Optional[str] = None,
+        db: Optional[Any] = None,
+        eviction_policy: Optional[EvictionPolicy] = None,
+        eviction_interval: int = 100
+    ):
+        """Initialize the provider; `db` defaults to the global DatabaseManager."""
+        if eviction_policy is not None and eviction_policy.lru:
+            raise ValueError("PostgresContextProvider does not support lru eviction; pass a policy with lru=False")
+        if db is None:
+            from ..database.connection import get_database
+            db = get_database()
+        self.db = db
+        self.agent_id = agent_id
+        self.eviction_interval = eviction_interval
+        self._writes_since_eviction = 0
+        self._init_eviction(eviction_policy)
+
+    def _scoped(self, statement):
+        if self.agent_id is not None:
+            statement = statement.where(AgentContext.agent_id == self.agent_id)
+        return statement
+
+    @staticmethod
+    def _row_to_context(row: Any, score: Optional[float] = None) -> Dict[str, Any]:
+        context = {
+            "id": f"ctx_{row.id}",
+            "content": row.content,
+            "metadata": row.agent_metadata or {},
+            "timestamp": (row.updated_at or row.created_at).isoformat() if row.created_at else None
+        }
+        if score is not None:
+            context["score"] = score
+        return context
+
+    def _values(self, content: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        metadata = metadata or {}
+        now = datetime.utcnow()
+        return {
+            "agent_id": self.agent_id or metadata.get("agent"),
+            "content": content,
+            "agent_metadata": metadata,
+            "created_at": now,
+            "updated_at": now
+        }
+
+    async def get_context(
+        self,
+        query: str,
+        limit: int = 10,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the contexts best matching any of the query's terms, ranked by ts_rank."""
+        terms = dict.fromkeys(tokenize(query))
+        if not terms or limit <= 0:
+            return []
+
+        ts_query = func.to_tsquery(CONTEXT_SEARCH_CONFIG, " | ".join(terms))
+        rank = func.ts_rank(AgentContext.search_vector, ts_query).label("score")
+        statement = (
+            select(
+                AgentContext.id,
+                AgentContext.content,
+                AgentContext.agent_metadata,
+                AgentContext.created_at,
+                AgentContext.updated_at,
+                rank
+            )
+            .where(AgentContext.search_vector.op("@@")(ts_query))
+            .order_by(rank.desc(), AgentContext.id.desc())
+            .limit(limit)
+        )
+        statement = self._scoped(statement)
+        if since is not None:
+            statement = statement.where(AgentContext.created_at >= since)
+        if until is not None:
+            statement = statement.where(AgentContext.created_at < until)
+        if self.eviction_policy is not None and self.eviction_policy.ttl is not None:
+            # Hide expired rows until the next eviction pass deletes them
+            statement = statement.where(AgentContext.created_at >= self._ttl_cutoff())
+
+        async with self.db.get_session() as session:
+            rows = (await session.execute(statement)).all()
+        return [self._row_to_context(row, float(row.score)) for row in rows]
+
+    async def add_context(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Add content to the context store."""
+        statement = insert(AgentContext).values(**self._values(content, metadata)).returning(AgentContext.id)
+        async with self.db.get_session() as session:
+            context_id = (await session.execute(statement)).scalar_one()
+        await self._after_writes(1)
+        return f"ctx_{context_id}"
+
+    async def add_contexts(self, items: List[Dict[str, Any]]) -> List[str]:
+        """Add many {"content", "metadata"} items with one batched (executemany) insert."""
+        if not items:
+            return []
+        rows = [self._values(item["content"], item.get("metadata")) for item in items]
+        statement = insert(AgentContext).returning(AgentContext.id, sort_by_parameter_order=True)
+        async with self.db.get_session() as session:
+            ids = (await session.execute(statement, rows)).scalars().all()
+        await self._after_writes(len(ids))
+        return [f"ctx_{context_id}" for context_id in ids]
+
+    async def update_context(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Update existing context."""
+        row_id = _to_id(context_id)
+        if row_id is None:
+            return False
+
+        values: Dict[str, Any] = {"content": content, "updated_at": datetime.utcnow()}
+        if metadata is not None:
+            values["agent_metadata"] = metadata
+        statement = self._scoped(update(AgentContext).where(AgentContext.id == row_id)).values(**values)
+        async with self.db.get_session() as session:
+            result = await session.execute(statement)
+        return result.rowcount > 0
+
+    async def delete_context(self, context_id: str) -> bool:
+        """Delete context by ID."""
+        row_id = _to_id(context_id)
+        if row_id is None:
+            return False
+
+        statement = self._scoped(delete(AgentContext).where(AgentContext.id == row_id))
+        async with self.db.get_session() as session:
+            result = await session.execute(statement)
+        return result.rowcount > 0
+
+    def _ttl_cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.eviction_policy.ttl)
+
+    async def _after_writes(self, count: int) -> None:
+        """Run an eviction pass once every `eviction_interval` writes."""
+        if self.eviction_policy is None:
+            return
+        self._writes_since_eviction += count
+        if self._writes_since_eviction >= self.eviction_interval:
+            self._writes_since_eviction = 0
+            await self.enforce_limits()
+
+    async def enforce_limits(self) -> int:
+        """Delete rows beyond the eviction policy's limits; returns the number evicted."""
+        policy = self.eviction_policy
+        if policy is None:
+            return 0
+
+        rules = []
+        if policy.ttl is not None:
+            rules.append(("ttl", AgentContext.created_at < self._ttl_cutoff()))
+        if policy.max_entries is not None:
+            cutoff = (
+                self._scoped(select(AgentContext.id))
+                .order_by(AgentContext.id.desc())
+                .offset(policy.max_entries)
+                .limit(1)
+                .scalar_subquery()
+            )
+            rules.append(("max_entries", AgentContext.id <= cutoff))
+        if policy.max_bytes is not None:
+            running = self._scoped(
+                select(
+                    AgentContext.id,
+                    func.sum(func.octet_length(AgentContext.content))
+                    .over(order_by=AgentContext.id.desc())
+                    .label("total")
+                )
+            ).subquery()
+            cutoff = (
+                select(running.c.id)
+                .where(running.c.total > policy.max_bytes)
+                .order_by(running.c.id.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+            rules.append(("max_bytes", AgentContext.id <= cutoff))
+
+        total = 0
+        async with self.db.get_session() as session:
+            for reason, predicate in rules:
+                statement = self._scoped(delete(AgentContext).where(predicate)).returning(
+                    func.octet_length(AgentContext.content)
+                )
+                sizes = (await session.execute(statement)).scalars().all()
+                if sizes:
+                    self._record_eviction(reason, sum(sizes), len(sizes))
+                    total += len(sizes)
+        if total:
+            logger.debug(f"Evicted {total} contexts for agent {self.agent_id}")
+        return total
+
+    def _tracked_usage(self) -> Dict[str, Any]:
+        return {}
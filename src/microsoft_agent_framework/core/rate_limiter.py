@@ -0,0 +1,268 @@
+"""Admission control for Groq requests: token buckets and a concurrency governor."""
+
+import asyncio
+import logging
+import re
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Continuously refilling token bucket."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        """Initialize a full bucket."""
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add tokens accrued since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def time_until_available(self, amount: float) -> float:
+        """Seconds until `amount` tokens can be taken (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def consume(self, amount: float) -> None:
+        """Take tokens from the bucket; the balance may go negative to record debt."""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens to the bucket."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass
+class ModelRateLimit:
+    """Requests-per-minute and tokens-per-minute limits for one model."""
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+
+
+@dataclass
+class RateLimiterMetrics:
+    """Counters describing limiter behaviour."""
+    requests_admitted: int = 0
+    requests_throttled: int = 0
+    rate_limit_responses: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+@dataclass
+class RateLimitPermit:
+    """Admission ticket for one request, used to reconcile actual token usage."""
+    model: str
+    estimated_tokens: int
+    wait_seconds: float
+    actual_tokens: Optional[int] = None
+
+    def record_usage(self, total_tokens: int) -> None:
+        """Record the tokens the request actually consumed."""
+        self.actual_tokens = total_tokens
+
+
+class _ModelLimiter:
+    """Buckets and FIFO admission queue for a single model."""
+
+    def __init__(self, limits: ModelRateLimit):
+        self.limits = limits
+        self.request_bucket = (
+            TokenBucket(limits.requests_per_minute, limits.requests_per_minute / 60.0)
+            if limits.requests_per_minute else None
+        )
+        self.token_bucket = (
+            TokenBucket(limits.tokens_per_minute, limits.tokens_per_minute / 60.0)
+            if limits.tokens_per_minute else None
+        )
+        self.blocked_until = 0.0
+        self.waiting = 0
+
+    def delay_for(self, tokens: int) -> float:
+        """Seconds to wait before a request of `tokens` may be sent."""
+        delay = max(0.0, self.blocked_until - time.monotonic())
+        if self.request_bucket:
+            delay = max(delay, self.request_bucket.time_until_available(1))
+        if self.token_bucket:
+            delay = max(delay, self.token_bucket.time_until_available(tokens))
+        return delay
+
+    def consume(self, tokens: int) -> None:
+        """Charge one request and its estimated tokens."""
+        if self.request_bucket:
+            self.request_bucket.consume(1)
+        if self.token_bucket:
+            self.token_bucket.consume(tokens)
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once actual usage is known."""
+        if not self.token_bucket:
+            return
+        if actual > estimated:
+            self.token_bucket.consume(actual - estimated)
+        elif actual < estimated:
+            self.token_bucket.refund(estimated - actual)
+
+
+@dataclass
+class _LoopState:
+    """The asyncio primitives of one event loop; they cannot be shared across loops."""
+    semaphore: Optional[asyncio.Semaphore]
+    # asyncio.Lock wakes waiters in FIFO order, which keeps admission fair
+    queue_locks: Dict[str, asyncio.Lock] = field(default_factory=dict)
+
+
+class RateLimiter:
+    """Per-model RPM/TPM token buckets with a global concurrency cap.
+
+    Callers queue in arrival order rather than failing, so bursts degrade into
+    latency instead of 429 errors. Buckets are shared by every event loop in
+    the process; the admission queue and the concurrency cap apply per loop.
+    """
+
+    def __init__(
+        self,
+        default_limits: Optional[ModelRateLimit] = None,
+        model_limits: Optional[Dict[str, ModelRateLimit]] = None,
+        max_concurrent_requests: Optional[int] = None
+    ):
+        """Initialize the rate limiter."""
+        self.default_limits = default_limits or ModelRateLimit()
+        self.model_limits = model_limits or {}
+        self.max_concurrent_requests = max_concurrent_requests
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._models: Dict[str, _ModelLimiter] = {}
+        self.metrics = RateLimiterMetrics()
+        self.in_flight = 0
+
+    def _limiter_for(self, model: str) -> _ModelLimiter:
+        """Get or create the limiter state for a model."""
+        limiter = self._models.get(model)
+        if limiter is None:
+            limiter = _ModelLimiter(self.model_limits.get(model, self.default_limits))
+            self._models[model] = limiter
+        return limiter
+
+    def _loop_state(self) -> _LoopState:
+        """Get the semaphore and queue locks for the running event loop."""
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = _LoopState(
+                semaphore=asyncio.Semaphore(self.max_concurrent_requests) if self.max_concurrent_requests else None
+            )
+            self._loops[loop] = state
+        return state
+
+    async def _admit(self, state: _LoopState, model: str, limiter: _ModelLimiter, tokens: int) -> None:
+        """Wait in FIFO order until the buckets allow the request."""
+        queue_lock = state.queue_locks.get(model)
+        if queue_lock is None:
+            queue_lock = state.queue_locks[model] = asyncio.Lock()
+        limiter.waiting += 1
+        try:
+            async with queue_lock:
+                delay = limiter.delay_for(tokens)
+                if delay > 0:
+                    self.metrics.requests_throttled += 1
+                while delay > 0:
+                    await asyncio.sleep(delay)
+                    delay = limiter.delay_for(tokens)
+                limiter.consume(tokens)
+        finally:
+            limiter.waiting -= 1
+
+    @asynccontextmanager
+    async def acquire(self, model: str, estimated_tokens: int) -> AsyncIterator[RateLimitPermit]:
+        """Wait for admission for one request and hold a concurrency slot while it runs."""
+        limiter = self._limiter_for(model)
+        state = self._loop_state()
+        start = time.monotonic()
+        await self._admit(state, model, limiter, estimated_tokens)
+
+        if state.semaphore:
+            await state.semaphore.acquire()
+        waited = time.monotonic() - start
+
+        self.metrics.requests_admitted += 1
+        self.metrics.total_wait_seconds += waited
+        self.metrics.max_wait_seconds = max(self.metrics.max_wait_seconds, waited)
+
+        permit = RateLimitPermit(model=model, estimated_tokens=estimated_tokens, wait_seconds=waited)
+        self.in_flight += 1
+        try:
+            yield permit
+        finally:
+            self.in_flight -= 1
+            if state.semaphore:
+                state.semaphore.release()
+            if permit.actual_tokens is not None:
+                limiter.reconcile(estimated_tokens, permit.actual_tokens)
+
+    def penalize(self, model: str, retry_after: float) -> None:
+        """Block admissions for a model after the server asked us to back off."""
+        limiter = self._limiter_for(model)
+        limiter.blocked_until = max(limiter.blocked_until, time.monotonic() + retry_after)
+        self.metrics.rate_limit_responses += 1
+        logger.warning(f"Groq rate limit hit for {model}; pausing admissions for {retry_after:.2f}s")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth and wait-time metrics."""
+        admitted = self.metrics.requests_admitted
+        return {
+            "queue_depth": sum(limiter.waiting for limiter in self._models.values()),
+            "queue_depth_by_model": {model: limiter.waiting for model, limiter in self._models.items()},
+            "in_flight": self.in_flight,
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "requests_admitted": admitted,
+            "requests_throttled": self.metrics.requests_throttled,
+            "rate_limit_responses": self.metrics.rate_limit_responses,
+            "avg_wait_seconds": self.metrics.total_wait_seconds / admitted if admitted else 0.0,
+            "max_wait_seconds": self.metrics.max_wait_seconds,
+        }
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Parse a back-off delay in seconds from Groq rate-limit response headers.
+
+    Understands `retry-after` (seconds) as well as the `x-ratelimit-reset-*`
+    durations Groq sends, such as "2m59.56s" or "120ms".
+    """
+    if headers is None:
+        return None
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+    delays = []
+    for header in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        value = headers.get(header)
+        if not value:
+            continue
+        seconds = 0.0
+        for amount, unit in _DURATION_PART.findall(value):
+            seconds += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+        delays.append(seconds)
+    return max(delays) if delays else None
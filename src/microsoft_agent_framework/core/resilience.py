@@ -0,0 +1,134 @@
+"""Retry, hedging and model fallback helpers for Groq requests."""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+import groq
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings for a single model."""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (0-based) using full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Classify whether a failed request is worth retrying."""
+    if isinstance(error, (groq.RateLimitError, groq.APITimeoutError, groq.APIConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, groq.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def should_fall_back(error: BaseException) -> bool:
+    """Classify whether a failure should move on to the next model in the chain."""
+    # A 404 usually means the model was decommissioned or is unavailable to this key
+    return is_retryable(error) or isinstance(error, groq.NotFoundError)
+
+
+class LatencyTracker:
+    """Rolling window of request latencies per model."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """Initialize the tracker."""
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, model: str, seconds: float) -> None:
+        """Record the latency of a successful request."""
+        samples = self._samples.get(model)
+        if samples is None:
+            samples = deque(maxlen=self.window)
+            self._samples[model] = samples
+        samples.append(seconds)
+
+    def percentile(self, model: str, pct: float = 0.95) -> Optional[float]:
+        """Get a latency percentile, or None until enough samples are collected."""
+        samples = self._samples.get(model)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+class CircuitBreaker:
+    """Skips a model after repeated failures until a cooldown elapses."""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+
+    def is_open(self, model: str) -> bool:
+        """Check whether calls to the model should be skipped."""
+        return self._open_until.get(model, 0.0) > time.monotonic()
+
+    def record_success(self, model: str) -> None:
+        """Reset the failure count for a model."""
+        self._failures[model] = 0
+
+    def record_failure(self, model: str) -> None:
+        """Count a failure, opening the breaker once the threshold is reached."""
+        failures = self._failures.get(model, 0) + 1
+        self._failures[model] = failures
+        if failures >= self.failure_threshold:
+            self._open_until[model] = time.monotonic() + self.cooldown
+            self._failures[model] = 0
+            logger.warning(f"Model {model} failing repeatedly; routing to fallbacks for {self.cooldown:.0f}s")
+
+
+async def hedged_call(call: Callable[[], Awaitable[T]], hedge_delay: Optional[float]) -> T:
+    """Run `call`, starting a duplicate after `hedge_delay` seconds and returning the first to finish.
+
+    If the first attempt fails before the hedge fires, its error is raised
+    directly so the caller's retry policy can handle it.
+    """
+    if hedge_delay is None:
+        return await call()
+
+    primary = asyncio.ensure_future(call())
+    pending = {primary}
+    error: Optional[BaseException] = None
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        pending.add(asyncio.ensure_future(call()))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def build_model_chain(model: str, fallback_models: Dict[str, List[str]], breaker: CircuitBreaker) -> List[str]:
+    """Order the primary model and its fallbacks, moving tripped models to the end."""
+    chain = [model] + [m for m in fallback_models.get(model, []) if m != model]
+    healthy = [m for m in chain if not breaker.is_open(m)]
+    tripped = [m for m in chain if breaker.is_open(m)]
+    return healthy + tripped
@@ -0,0 +1,352 @@
+"""SQLite FTS5-backed persistent context provider."""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .context_provider import ContextProvider, EvictionPolicy
+from .text_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contexts (
+    rowid INTEGER PRIMARY KEY AUTOINCREMENT,
+    content TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    agent TEXT,
+    created_at REAL NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_contexts_agent_created ON contexts (agent, created_at);
+CREATE INDEX IF NOT EXISTS ix_contexts_created ON contexts (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS contexts_fts USING fts5(
+    content, content='contexts', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS contexts_ai AFTER INSERT ON contexts BEGIN
+    INSERT INTO contexts_fts (rowid, content) VALUES (new.rowid, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS contexts_ad AFTER DELETE ON contexts BEGIN
+    INSERT INTO contexts_fts (contexts_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS contexts_au AFTER UPDATE OF content ON contexts BEGIN
+    INSERT INTO contexts_fts (contexts_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    INSERT INTO contexts_fts (rowid, content) VALUES (new.rowid, new.content);
+END;
+"""
+
+
+def _to_rowid(context_id: str) -> Optional[int]:
+    """Parse a "ctx_<rowid>" context id."""
+    if context_id.startswith("ctx_") and context_id[4:].isdigit():
+        return int(context_id[4:])
+    return None
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """Build an FTS5 query matching any of the query's terms, with each term quoted."""
+    terms = dict.fromkeys(tokenize(query))
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class SQLiteContextProvider(ContextProvider):
+    """Durable context provider using an SQLite database with an FTS5 index.
+
+    Queries run on a small thread pool with one connection per worker thread,
+    so the event loop is never blocked. The database uses WAL mode, which lets
+    readers proceed while a write is in progress. Context ids are "ctx_<rowid>"
+    and are never reused.
+
+    With an eviction policy, limits are enforced in SQL every `eviction_interval`
+    writes, oldest entries first; TTL counts from creation. Policies with `lru`
+    set are rejected, since tracking retrievals would turn every read into a write.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "contexts.db",
+        max_workers: int = 4,
+        busy_timeout: float = 5.0,
+        eviction_policy: Optional[EvictionPolicy] = None,
+        eviction_interval: int = 100
+    ):
+        """Initialize the SQLite context provider and create the schema if needed."""
+        if eviction_policy is not None and eviction_policy.lru:
+            raise ValueError("SQLiteContextProvider does not support lru eviction; pass a policy with lru=False")
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.eviction_interval = eviction_interval
+        self._writes_since_eviction = 0
+        self._init_eviction(eviction_policy)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqlite-context")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the calling worker thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _run(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run `func(connection)` on the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(self._connection()))
+
+    @staticmethod
+    def _row_to_context(row: sqlite3.Row) -> Dict[str, Any]:
+        context = {
+            "id": f"ctx_{row['rowid']}",
+            "content": row["content"],
+            "metadata": json.loads(row["metadata"]),
+            "timestamp": row["timestamp"]
+        }
+        if "score" in row.keys():
+            context["score"] = row["score"]
+        return context
+
+    @staticmethod
+    def _row_values(content: str, metadata: Optional[Dict[str, Any]]) -> Tuple[str, str, Optional[str], float, str]:
+        metadata = metadata or {}
+        now = time.time()
+        return (
+            content,
+            json.dumps(metadata, ensure_ascii=False, default=str),
+            metadata.get("agent"),
+            now,
+            datetime.fromtimestamp(now).isoformat()
+        )
+
+    async def get_context(
+        self,
+        query: str,
+        limit: int = 10,
+        agent: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the contexts best matching the query (FTS5 BM25 rank), optionally filtered."""
+        match = _match_expression(query)
+        if match is None or limit <= 0:
+            return []
+
+        sql = (
+            "SELECT c.rowid, c.content, c.metadata, c.timestamp, -bm25(contexts_fts) AS score "
+            "FROM contexts_fts JOIN contexts c ON c.rowid = contexts_fts.rowid "
+            "WHERE contexts_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if agent is not None:
+            sql += " AND c.agent = ?"
+            params.append(agent)
+        if since is not None:
+            sql += " AND c.created_at >= ?"
+            params.append(since.timestamp())
+        if until is not None:
+            sql += " AND c.created_at < ?"
+            params.append(until.timestamp())
+        if self.eviction_policy is not None and self.eviction_policy.ttl is not None:
+            # Hide expired rows until the next eviction pass deletes them
+            sql += " AND c.created_at >= ?"
+            params.append(time.time() - self.eviction_policy.ttl)
+        sql += " ORDER BY bm25(contexts_fts), c.rowid DESC LIMIT ?"
+        params.append(limit)
+
+        rows = await self._run(lambda conn: conn.execute(sql, params).fetchall())
+        return [self._row_to_context(row) for row in rows]
+
+    async def add_context(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Add content to the context store."""
+        values = self._row_values(content, metadata)
+
+        def insert(conn: sqlite3.Connection) -> int:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO contexts (content, metadata, agent, created_at, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    values
+                )
+            return cursor.lastrowid
+
+        context_id = f"ctx_{await self._run(insert)}"
+        await self._after_writes(1)
+        return context_id
+
+    async def add_contexts(self, items: List[Dict[str, Any]]) -> List[str]:
+        """Add many {"content", "metadata"} items in one transaction."""
+        if not items:
+            return []
+        rows = [self._row_values(item["content"], item.get("metadata")) for item in items]
+
+        def insert_many(conn: sqlite3.Connection) -> List[int]:
+            with conn:
+                # Holding the write lock for the whole batch keeps its rowids consecutive
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO contexts (content, metadata, agent, created_at, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                last = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            return list(range(last - len(rows) + 1, last + 1))
+
+        context_ids = [f"ctx_{rowid}" for rowid in await self._run(insert_many)]
+        await self._after_writes(len(context_ids))
+        return context_ids
+
+    async def update_context(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Update existing context."""
+        rowid = _to_rowid(context_id)
+        if rowid is None:
+            return False
+        now = time.time()
+
+        def update(conn: sqlite3.Connection) -> int:
+            with conn:
+                if metadata is None:
+                    cursor = conn.execute(
+                        "UPDATE contexts SET content = ?, timestamp = ? WHERE rowid = ?",
+                        (content, datetime.fromtimestamp(now).isoformat(), rowid)
+                    )
+                else:
+                    cursor = conn.execute(
+                        "UPDATE contexts SET content = ?, metadata = ?, agent = ?, timestamp = ? WHERE rowid = ?",
+                        (content, json.dumps(metadata, ensure_ascii=False, default=str), metadata.get("agent"),
+                         datetime.fromtimestamp(now).isoformat(), rowid)
+                    )
+            return cursor.rowcount
+
+        return await self._run(update) > 0
+
+    async def delete_context(self, context_id: str) -> bool:
+        """Delete context by ID."""
+        rowid = _to_rowid(context_id)
+        if rowid is None:
+            return False
+
+        def delete(conn: sqlite3.Connection) -> int:
+            with conn:
+                return conn.execute("DELETE FROM contexts WHERE rowid = ?", (rowid,)).rowcount
+
+        return await self._run(delete) > 0
+
+    async def list_contexts(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+        agent: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List contexts oldest first using keyset pagination.
+
+        Returns a page and the cursor (the last id) to pass as `after` for the
+        next page, or None when there are no more rows.
+        """
+        sql = "SELECT rowid, content, metadata, timestamp FROM contexts WHERE rowid > ?"
+        params: List[Any] = [(_to_rowid(after) or 0) if after else 0]
+        if agent is not None:
+            sql += " AND agent = ?"
+            params.append(agent)
+        sql += " ORDER BY rowid LIMIT ?"
+        params.append(limit)
+
+        rows = await self._run(lambda conn: conn.execute(sql, params).fetchall())
+        contexts = [self._row_to_context(row) for row in rows]
+        next_cursor = contexts[-1]["id"] if len(contexts) == limit else None
+        return contexts, next_cursor
+
+    async def count_contexts(self, agent: Optional[str] = None) -> int:
+        """Count stored contexts, optionally for one agent."""
+        if agent is None:
+            return await self._run(lambda conn: conn.execute("SELECT COUNT(*) FROM contexts").fetchone()[0])
+        return await self._run(
+            lambda conn: conn.execute("SELECT COUNT(*) FROM contexts WHERE agent = ?", (agent,)).fetchone()[0]
+        )
+
+    async def _after_writes(self, count: int) -> None:
+        """Run an eviction pass once every `eviction_interval` writes."""
+        if self.eviction_policy is None:
+            return
+        self._writes_since_eviction += count
+        if self._writes_since_eviction >= self.eviction_interval:
+            self._writes_since_eviction = 0
+            await self.enforce_limits()
+
+    async def enforce_limits(self) -> int:
+        """Delete rows beyond the eviction policy's limits; returns the number evicted."""
+        policy = self.eviction_policy
+        if policy is None:
+            return 0
+
+        # (reason, predicate, params), applied in order inside one write transaction
+        rules: List[Tuple[str, str, Callable[[], List[Any]]]] = []
+        if policy.ttl is not None:
+            rules.append(("ttl", "created_at < ?", lambda: [time.time() - policy.ttl]))
+        if policy.max_entries is not None:
+            rules.append((
+                "max_entries",
+                "rowid <= (SELECT rowid FROM contexts ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                lambda: [policy.max_entries]
+            ))
+        if policy.max_bytes is not None:
+            rules.append((
+                "max_bytes",
+                "rowid <= (SELECT rowid FROM (SELECT rowid, SUM(length(CAST(content AS BLOB))) "
+                "OVER (ORDER BY rowid DESC) AS total FROM contexts) WHERE total > ? ORDER BY rowid DESC LIMIT 1)",
+                lambda: [policy.max_bytes]
+            ))
+
+        def evict(conn: sqlite3.Connection) -> List[Tuple[str, int, int]]:
+            evicted = []
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for reason, predicate, params in rules:
+                    values = params()
+                    count, size = conn.execute(
+                        f"SELECT COUNT(*), COALESCE(SUM(length(CAST(content AS BLOB))), 0) FROM contexts WHERE {predicate}",
+                        values
+                    ).fetchone()
+                    if count:
+                        conn.execute(f"DELETE FROM contexts WHERE {predicate}", values)
+                        evicted.append((reason, count, size))
+            return evicted
+
+        total = 0
+        for reason, count, size in await self._run(evict):
+            self._record_eviction(reason, size, count)
+            total += count
+        if total:
+            logger.debug(f"Evicted {total} contexts from {self.db_path}")
+        return total
+
+    def _tracked_usage(self) -> Dict[str, Any]:
+        return {}
+
+    async def close(self) -> None:
+        """Shut down the thread pool and close all connections."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
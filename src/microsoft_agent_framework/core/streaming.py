@@ -0,0 +1,123 @@
+"""Streaming helpers: token coalescing and a lightweight update type."""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+class StreamFrame:
+    """Lightweight streaming update with the same surface as AgentRunResponseUpdate."""
+
+    __slots__ = ("content", "is_complete", "metadata")
+
+    def __init__(self, content: str, is_complete: bool = False, metadata: Optional[Dict[str, Any]] = None):
+        self.content = content
+        self.is_complete = is_complete
+        self.metadata = metadata if metadata is not None else {}
+
+    def __str__(self) -> str:
+        """Return the content as string representation."""
+        return self.content
+
+    def __repr__(self) -> str:
+        return f"StreamFrame(content={self.content!r}, is_complete={self.is_complete})"
+
+    @property
+    def text(self) -> str:
+        """Get the text content."""
+        return self.content
+
+
+class StreamAccumulator:
+    """Collects streamed chunks in a list and joins them once (O(n) overall)."""
+
+    __slots__ = ("_parts", "_length")
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+
+    def append(self, chunk: str) -> None:
+        """Add a chunk."""
+        self._parts.append(chunk)
+        self._length += len(chunk)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def getvalue(self) -> str:
+        """Join the accumulated chunks, caching the result."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterator[str],
+    max_latency: Optional[float] = 0.02,
+    max_bytes: Optional[int] = 64
+) -> AsyncIterator[str]:
+    """Merge small chunks into frames bounded by time and size.
+
+    A frame is emitted once it holds at least `max_bytes` bytes of UTF-8 text, or
+    `max_latency` seconds after its first chunk arrived, whichever comes first.
+    The time bound is honoured even while waiting for the next upstream chunk.
+    The upstream iterator is closed when the frames are, even if it is unfinished.
+    """
+    if not max_latency and not max_bytes:
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        return
+
+    iterator = chunks.__aiter__()
+    buffer: List[str] = []
+    size = 0
+    deadline: Optional[float] = None
+    pending: Optional[asyncio.Future] = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            timeout = None
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+            if not done:
+                # Time bound reached while upstream is quiet
+                yield "".join(buffer)
+                buffer, size, deadline = [], 0, None
+                continue
+
+            task, pending = pending, None
+            try:
+                chunk = task.result()
+            except StopAsyncIteration:
+                break
+
+            if not buffer and max_latency:
+                deadline = time.monotonic() + max_latency
+            buffer.append(chunk)
+            size += len(chunk.encode("utf-8")) if max_bytes else 0
+
+            if max_bytes and size >= max_bytes:
+                yield "".join(buffer)
+                buffer, size, deadline = [], 0, None
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        # Release the upstream stream (and its connection) as soon as the consumer stops
+        if pending is not None and not pending.done():
+            pending.cancel()
+            await asyncio.wait({pending})
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -47,7 +47,7 @@ class TeamOrchestrator:
     def __init__(self, groq_client: Optional[GroqClient] = None):
         """Initialize the team orchestrator."""
         self.groq_client = groq_client or GroqClient()
-        self.agent_builder = AgentBuilder(groq_client)
+        self.agent_builder = AgentBuilder(self.groq_client)
         
         # Team management
         self.team_members: Dict[str, TeamMember] = {}
@@ -0,0 +1,234 @@
+"""Incremental inverted index with BM25 ranking for context retrieval."""
+
+import bisect
+import heapq
+import math
+import re
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+_DOC_ID = itemgetter(2)
+
+# Common English words that carry no retrieval signal but have huge posting lists
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from had has have he her his how i if in into is
+it its me my no not of on or our she so that the their them then there they this to us was we
+were what when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, dropping stopwords."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Inverted index scored with Okapi BM25.
+
+    Documents are added, replaced and removed incrementally; a query only
+    touches the posting lists of its own terms, never the whole corpus.
+    Per-document length normalization is cached against the average document
+    length and refreshed once that average drifts by more than `norm_tolerance`.
+
+    By default every posting list of the query's terms is scored, so results
+    are exact. Setting `champion_size` trades recall for bounded work per
+    query: a term whose posting list is longer keeps a champion list of its
+    highest-impact postings (tf / (tf + norm)), maintained on add/remove.
+    Candidates are then the postings of rare terms and the champions of common
+    ones, and each candidate gets its exact score over all query terms. A
+    document that matches no rare term and is not a champion of any of its
+    common terms is missed.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        norm_tolerance: float = 0.05,
+        champion_size: Optional[int] = None
+    ):
+        """Initialize an empty index."""
+        self.k1 = k1
+        self.b = b
+        self.norm_tolerance = norm_tolerance
+        self.champion_size = champion_size
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_norms: Dict[str, float] = {}
+        self._doc_order: Dict[str, int] = {}
+        # term -> [(-impact, -order, doc_id)], best first; impact is tf / (tf + norm)
+        self._champions: Dict[str, List[Tuple[float, int, str]]] = {}
+        self._total_length = 0
+        self._sequence = 0
+        self._norm_avg_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any previous version with the same id."""
+        if doc_id in self._doc_lengths:
+            self.remove(doc_id)
+
+        tokens = tokenize(text)
+        term_counts: Dict[str, int] = {}
+        for token in tokens:
+            term_counts[token] = term_counts.get(token, 0) + 1
+
+        self._sequence += 1
+        self._doc_terms[doc_id] = term_counts
+        self._doc_lengths[doc_id] = len(tokens)
+        self._doc_order[doc_id] = self._sequence
+        self._total_length += len(tokens)
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+
+        if self._refresh_norms():
+            return
+        norm = self._doc_norms[doc_id] = self._norm(len(tokens))
+        if self.champion_size is None:
+            return
+        for term, count in term_counts.items():
+            postings = self._postings[term]
+            champions = self._champions.get(term)
+            if champions is not None:
+                self._add_champion(champions, len(postings), (-count / (count + norm), -self._sequence, doc_id))
+            elif len(postings) > self.champion_size:
+                self._build_champions(term, postings)
+
+    def _add_champion(self, champions: List[Tuple[float, int, str]], df: int, entry: Tuple[float, int, str]) -> None:
+        """Insert a new posting into a champion list if it ranks among the best."""
+        # Postings left out of the list must never outrank its last entry
+        if champions and entry > champions[-1] and df - 1 > len(champions):
+            return
+        bisect.insort(champions, entry)
+        if len(champions) > self.champion_size:
+            champions.pop()
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove a document from the index."""
+        term_counts = self._doc_terms.pop(doc_id, None)
+        if term_counts is None:
+            return False
+
+        norm = self._doc_norms.pop(doc_id)
+        order = self._doc_order.pop(doc_id)
+        for term, count in term_counts.items():
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+            champions = self._champions.get(term)
+            if champions is None:
+                continue
+            if len(postings) <= self.champion_size:
+                del self._champions[term]
+                continue
+            entry = (-count / (count + norm), -order, doc_id)
+            position = bisect.bisect_left(champions, entry)
+            if position < len(champions) and champions[position] == entry:
+                del champions[position]
+
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        if self._doc_lengths:
+            self._refresh_norms()
+        return True
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self.__init__(self.k1, self.b, self.norm_tolerance, self.champion_size)
+
+    def _norm(self, length: int) -> float:
+        return self.k1 * (1.0 - self.b + self.b * length / self._norm_avg_length)
+
+    def _refresh_norms(self) -> bool:
+        """Recompute length normalization and champion lists if the average length has drifted."""
+        avg_length = self._total_length / len(self._doc_lengths) or 1.0
+        if self._norm_avg_length and abs(avg_length / self._norm_avg_length - 1.0) <= self.norm_tolerance:
+            return False
+        self._norm_avg_length = avg_length
+        self._doc_norms = {doc_id: self._norm(length) for doc_id, length in self._doc_lengths.items()}
+        # Impacts depend on the norms, so every champion list is rebuilt
+        self._champions = {}
+        if self.champion_size is not None:
+            for term, postings in self._postings.items():
+                if len(postings) > self.champion_size:
+                    self._build_champions(term, postings)
+        return True
+
+    def _build_champions(self, term: str, postings: Dict[str, int]) -> List[Tuple[float, int, str]]:
+        """Build the champion list of a term from its full posting list."""
+        norms = self._doc_norms
+        order = self._doc_order
+        champions = heapq.nsmallest(
+            self.champion_size,
+            ((-tf / (tf + norms[doc_id]), -order[doc_id], doc_id) for doc_id, tf in postings.items())
+        )
+        self._champions[term] = champions
+        return champions
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to `limit` (doc_id, score) pairs, best first; ties favour newer documents."""
+        return self.search_terms(tokenize(query), limit)
+
+    def search_terms(self, terms: Iterable[str], limit: int = 10) -> List[Tuple[str, float]]:
+        """Score pre-tokenized query terms."""
+        doc_count = len(self._doc_lengths)
+        if not doc_count or limit <= 0:
+            return []
+
+        champion_size = self.champion_size
+        weighted: List[Tuple[float, Dict[str, int], Optional[List[Tuple[float, int, str]]]]] = []
+        candidates: Set[str] = set()
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            weight = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5)) * (self.k1 + 1.0)
+            if champion_size is None or df <= champion_size:
+                weighted.append((weight, postings, None))
+                candidates.update(postings)
+                continue
+            champions = self._champions.get(term)
+            if champions is None or len(champions) < champion_size // 2:
+                # Depleted by removals
+                champions = self._build_champions(term, postings)
+            weighted.append((weight, postings, champions))
+            candidates.update(map(_DOC_ID, champions))
+
+        # Exact scores for every candidate. Champions carry their impact; other postings
+        # are only looked up for candidates, with the set operations running in C
+        norms = self._doc_norms
+        scores = dict.fromkeys(candidates, 0.0)
+        for weight, postings, champions in weighted:
+            if champions is None:
+                for doc_id, tf in postings.items():
+                    scores[doc_id] += weight * tf / (tf + norms[doc_id])
+                continue
+            for neg_impact, _, doc_id in champions:
+                scores[doc_id] -= weight * neg_impact
+            for doc_id in (candidates & postings.keys()).difference(map(_DOC_ID, champions)):
+                tf = postings[doc_id]
+                scores[doc_id] += weight * tf / (tf + norms[doc_id])
+
+        if len(scores) > limit:
+            # Select on bare floats first; only ties at the cut-off need the recency key
+            cutoff = heapq.nlargest(limit, scores.values())[-1]
+            scores = {doc_id: score for doc_id, score in scores.items() if score >= cutoff}
+        order = self._doc_order
+        return sorted(scores.items(), key=lambda item: (item[1], order[item[0]]), reverse=True)[:limit]
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        """Get index size statistics."""
+        doc_count = len(self._doc_lengths)
+        return {
+            "documents": doc_count,
+            "terms": len(self._postings),
+            "avg_document_length": self._total_length / doc_count if doc_count else None
+        }
@@ -0,0 +1,215 @@
+"""Context-window-aware prompt budgeting for agents."""
+
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agent_thread import SUMMARY_PREFIX
+from .tokens import estimate_tokens, estimate_message_tokens, estimate_messages_tokens, REPLY_OVERHEAD_TOKENS, MESSAGE_OVERHEAD_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# Context window sizes (in tokens) of Groq-hosted models
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "llama-3.3-70b-versatile": 131072,
+    "llama-3.1-70b-versatile": 131072,
+    "llama-3.1-8b-instant": 131072,
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "mixtral-8x7b-32768": 32768,
+    "gemma2-9b-it": 8192,
+}
+
+DEFAULT_CONTEXT_WINDOW = 8192
+
+SUMMARIZE_INSTRUCTIONS = (
+    "Summarize the conversation below for use as memory by an AI assistant. "
+    "Keep facts, decisions, user preferences, open questions and any names, numbers or "
+    "identifiers that later turns may rely on. Be concise and write in the third person."
+)
+
+
+def get_context_window(model: Optional[str]) -> int:
+    """Get the context window of a model, falling back to a conservative default."""
+    return MODEL_CONTEXT_WINDOWS.get(model or "", DEFAULT_CONTEXT_WINDOW)
+
+
+def prefix_digest(messages: List[Dict[str, Any]]) -> str:
+    """Fingerprint the roles and contents of a run of messages."""
+    digest = hashlib.sha1()
+    for msg in messages:
+        digest.update(f"{msg['role']}\0{msg.get('content') or ''}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def format_transcript(messages: List[Dict[str, Any]]) -> str:
+    """Render messages as a plain-text transcript for summarization."""
+    return "\n".join(f"{msg['role'].capitalize()}: {msg['content']}" for msg in messages)
+
+
+async def summarize_messages(
+    groq_client: Any,
+    messages: List[Dict[str, Any]],
+    model: Optional[str] = None,
+    previous_summary: Optional[str] = None,
+    max_tokens: int = 512
+) -> str:
+    """Fold `messages` (and an optional earlier summary) into a new running summary."""
+    from .groq_client import GroqMessage
+
+    transcript = format_transcript(messages)
+    if previous_summary:
+        transcript = f"Earlier summary:\n{previous_summary}\n\nNew messages:\n{transcript}"
+
+    response = await groq_client.async_chat_completion(
+        messages=[
+            GroqMessage(role="system", content=SUMMARIZE_INSTRUCTIONS),
+            GroqMessage(role="user", content=transcript)
+        ],
+        model=model,
+        temperature=0.0,
+        max_tokens=max_tokens
+    )
+    return response.content.strip()
+
+
+class TokenBudget:
+    """Keeps prompts within a model's context window.
+
+    Leading system messages (agent instructions) and the trailing messages of
+    the current turn are pinned. Older history is kept newest-first until the
+    prompt budget is spent; the rest is dropped ("drop_oldest") or replaced by a
+    running summary ("summarize_oldest").
+    """
+
+    STRATEGIES = ("drop_oldest", "summarize_oldest")
+
+    def __init__(
+        self,
+        strategy: str = "drop_oldest",
+        max_prompt_tokens: Optional[int] = None,
+        reserved_completion_tokens: Optional[int] = None,
+        safety_margin: float = 0.9,
+        summary_model: Optional[str] = "llama-3.1-8b-instant",
+        summary_max_tokens: int = 512
+    ):
+        """Initialize the token budget."""
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unsupported context strategy '{strategy}'. Available: {list(self.STRATEGIES)}")
+        self.strategy = strategy
+        self.max_prompt_tokens = max_prompt_tokens
+        self.reserved_completion_tokens = reserved_completion_tokens
+        self.safety_margin = safety_margin
+        self.summary_model = summary_model
+        self.summary_max_tokens = summary_max_tokens
+
+        # Running summary of dropped history: (thread generation, digest of the
+        # summarized messages, number of messages summarized, summary)
+        self._summary: Tuple[Optional[int], str, int, Optional[str]] = (None, prefix_digest([]), 0, None)
+
+    def prompt_budget(self, model: Optional[str], max_tokens: Optional[int]) -> int:
+        """Tokens available for the prompt after reserving room for the completion."""
+        reserved = self.reserved_completion_tokens or max_tokens or 0
+        budget = int(get_context_window(model) * self.safety_margin) - reserved
+        if self.max_prompt_tokens:
+            budget = min(budget, self.max_prompt_tokens)
+        return max(budget, 0)
+
+    def split(
+        self,
+        messages: List[Dict[str, Any]],
+        pinned_tail: int,
+        budget: int
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split messages into (pinned head, dropped, kept history, pinned tail)."""
+        head_end = 0
+        while head_end < len(messages) - pinned_tail and messages[head_end]["role"] == "system":
+            head_end += 1
+        tail_start = max(head_end, len(messages) - pinned_tail)
+
+        head = messages[:head_end]
+        tail = messages[tail_start:]
+        history = messages[head_end:tail_start]
+
+        used = estimate_messages_tokens(head) + estimate_messages_tokens(tail) - REPLY_OVERHEAD_TOKENS
+        keep_from = len(history)
+        while keep_from > 0:
+            cost = estimate_message_tokens(history[keep_from - 1])
+            if used + cost > budget:
+                break
+            used += cost
+            keep_from -= 1
+
+        return head, history[:keep_from], history[keep_from:], tail
+
+    async def fit(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str],
+        max_tokens: Optional[int],
+        groq_client: Any = None,
+        pinned_tail: int = 1,
+        generation: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Return a copy of `messages` trimmed to fit the prompt budget.
+
+        `generation` identifies the thread the messages come from (see
+        AgentThread.generation); the running summary is discarded when it changes.
+        """
+        budget = self.prompt_budget(model, max_tokens)
+        if estimate_messages_tokens(messages) <= budget:
+            return messages
+
+        summarize = self.strategy == "summarize_oldest" and groq_client is not None
+        # Reserve room for the summary up front; its length is capped by summary_max_tokens
+        summary_cost = self.summary_max_tokens + estimate_tokens(SUMMARY_PREFIX) + MESSAGE_OVERHEAD_TOKENS
+        history_budget = budget - summary_cost if summarize else budget
+
+        head, dropped, kept, tail = self.split(messages, pinned_tail, history_budget)
+        if not dropped:
+            logger.warning(f"Pinned messages alone exceed the prompt budget of {budget} tokens for {model}")
+            return messages
+
+        if summarize:
+            summary = await self._summarize(groq_client, dropped, generation)
+            if summary:
+                return head + [{"role": "system", "content": f"{SUMMARY_PREFIX}{summary}"}] + kept + tail
+
+        return head + kept + tail
+
+    async def _summarize(
+        self,
+        groq_client: Any,
+        dropped: List[Dict[str, Any]],
+        generation: Optional[int] = None
+    ) -> Optional[str]:
+        """Incrementally extend the running summary with newly dropped messages.
+
+        The running summary is only reused when the thread generation matches and
+        the messages it covers are still the leading messages of `dropped`, so a
+        cleared, compacted or swapped-out conversation never leaks into the prompt.
+        """
+        summary_generation, digest, summarized_count, summary = self._summary
+        if (
+            summary_generation != generation
+            or summarized_count > len(dropped)
+            or prefix_digest(dropped[:summarized_count]) != digest
+        ):
+            summarized_count, summary = 0, None
+        if summary is not None and summarized_count == len(dropped):
+            return summary
+
+        try:
+            summary = await summarize_messages(
+                groq_client,
+                dropped[summarized_count:],
+                model=self.summary_model,
+                previous_summary=summary,
+                max_tokens=self.summary_max_tokens
+            )
+        except Exception as e:
+            logger.warning(f"History summarization failed, dropping oldest messages instead: {e}")
+            return None
+
+        self._summary = (generation, prefix_digest(dropped), len(dropped), summary)
+        return summary
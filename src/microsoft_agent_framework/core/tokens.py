@@ -0,0 +1,36 @@
+"""Fast local token estimation for Groq-hosted models."""
+
+from typing import Any, Dict, Iterable, Union
+
+# Average characters per token for Llama/Mixtral style BPE vocabularies on English text
+CHARS_PER_TOKEN = 4.0
+
+# Per-message framing overhead (role header, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Overhead for priming the assistant reply
+REPLY_OVERHEAD_TOKENS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text without a tokenizer."""
+    if not text:
+        return 0
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def _message_content(message: Union[Dict[str, Any], Any]) -> str:
+    """Get the text content of a dict or pydantic message."""
+    if isinstance(message, dict):
+        return message.get("content") or ""
+    return getattr(message, "content", "") or ""
+
+
+def estimate_message_tokens(message: Union[Dict[str, Any], Any]) -> int:
+    """Estimate the tokens used by a single chat message."""
+    return estimate_tokens(_message_content(message)) + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_messages_tokens(messages: Iterable[Union[Dict[str, Any], Any]]) -> int:
+    """Estimate the prompt tokens used by a list of chat messages."""
+    return sum(estimate_message_tokens(msg) for msg in messages) + REPLY_OVERHEAD_TOKENS
@@ -0,0 +1,142 @@
+"""Function-calling support: JSON schemas for tool callables and parallel tool execution."""
+
+import asyncio
+import inspect
+import json
+import logging
+import types
+import typing
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    dict: "object",
+    list: "array",
+}
+
+
+def _json_type(annotation: Any) -> Dict[str, Any]:
+    """Map a Python type annotation to a JSON schema fragment."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union or origin is types.UnionType:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _json_type(args[0]) if len(args) == 1 else {}
+    if origin in (list, List):
+        args = typing.get_args(annotation)
+        return {"type": "array", "items": _json_type(args[0])} if args else {"type": "array"}
+    if origin in (dict, Dict):
+        return {"type": "object"}
+    if annotation in _JSON_TYPES:
+        return {"type": _JSON_TYPES[annotation]}
+    return {}
+
+
+def build_tool_schema(name: str, func: Callable, description: str = "") -> Dict[str, Any]:
+    """Derive an OpenAI-style function schema from a callable's signature."""
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:
+        hints = {}
+
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    for param in inspect.signature(func).parameters.values():
+        if param.name == "self" or param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        properties[param.name] = _json_type(hints.get(param.name, param.annotation))
+        if param.default is param.empty:
+            required.append(param.name)
+
+    if not description:
+        doc = inspect.getdoc(func) or ""
+        description = doc.splitlines()[0].removeprefix("Tool:").strip() if doc else name
+
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {"type": "object", "properties": properties, "required": required}
+        }
+    }
+
+
+def _format_result(result: Any) -> str:
+    """Render a tool result as message content."""
+    if isinstance(result, str):
+        return result
+    try:
+        return json.dumps(result, default=str)
+    except (TypeError, ValueError):
+        return str(result)
+
+
+class ToolExecutor:
+    """Runs the tool calls of one assistant turn concurrently.
+
+    Each call gets its own timeout, and at most `max_concurrency` calls run at
+    once per event loop. Failures are returned to the model as error messages
+    rather than raised.
+    """
+
+    def __init__(self, timeout: Optional[float] = 30.0, max_concurrency: int = 8):
+        """Initialize the executor."""
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _invoke(self, func: Callable, arguments: Dict[str, Any]) -> Any:
+        if inspect.iscoroutinefunction(func):
+            return await func(**arguments)
+        # Sync tools run in a worker thread so they do not block the event loop
+        result = await asyncio.to_thread(func, **arguments)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def run_call(self, tool_call: Dict[str, Any], tools: Dict[str, Callable]) -> Dict[str, Any]:
+        """Run a single tool call and return the `tool` role message for it."""
+        name = tool_call["function"]["name"]
+        message = {"role": "tool", "tool_call_id": tool_call["id"], "name": name}
+
+        func = tools.get(name)
+        if func is None:
+            message["content"] = f"Error: unknown tool '{name}'"
+            return message
+
+        try:
+            arguments = json.loads(tool_call["function"].get("arguments") or "{}")
+        except json.JSONDecodeError as e:
+            message["content"] = f"Error: invalid arguments for '{name}': {e}"
+            return message
+
+        async with self._semaphore():
+            try:
+                result = await asyncio.wait_for(self._invoke(func, arguments), self.timeout)
+                message["content"] = _format_result(result)
+            except asyncio.TimeoutError:
+                logger.warning(f"Tool {name} timed out after {self.timeout}s")
+                message["content"] = f"Error: tool '{name}' timed out after {self.timeout}s"
+            except Exception as e:
+                logger.warning(f"Tool {name} failed: {e}")
+                message["content"] = f"Error: tool '{name}' failed: {e}"
+        return message
+
+    async def run_calls(self, tool_calls: List[Dict[str, Any]], tools: Dict[str, Callable]) -> List[Dict[str, Any]]:
+        """Run all tool calls concurrently, returning tool messages in call order."""
+        return list(await asyncio.gather(*(self.run_call(call, tools) for call in tool_calls)))
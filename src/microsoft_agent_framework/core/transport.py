@@ -0,0 +1,288 @@
+"""Shared HTTP transport registry for Groq clients."""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+from groq import Groq, AsyncGroq
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TransportSettings:
+    """Connection pool settings for a shared transport."""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    http2: bool = False
+
+
+@dataclass
+class TransportStats:
+    """Request counters for a shared transport."""
+    requests_started: int = 0
+    requests_completed: int = 0
+    clients_attached: int = 0
+    orphaned_pools: int = 0  # async pools dropped because their event loop had stopped
+
+
+@dataclass
+class _AsyncClients:
+    """Async pool and SDK client owned by one event loop."""
+    http_client: httpx.AsyncClient
+    client: AsyncGroq
+    # Counts the pool as orphaned if its loop is garbage collected while still registered
+    finalizer: Optional[weakref.finalize] = None
+
+
+@dataclass
+class SharedTransport:
+    """Pooled Groq SDK clients bound to one API key and base URL.
+
+    The sync client is shared process-wide. Async connections belong to the
+    event loop that opened them, so each running loop gets its own async pool
+    (created on first use). A pool can only be closed on its own loop, so pools
+    of loops that closed first are dropped, logged and counted in
+    `stats.orphaned_pools`; their sockets are left to the garbage collector.
+    """
+    api_key: str
+    base_url: Optional[str]
+    settings: TransportSettings
+    http_client: httpx.Client
+    client: Groq
+    stats: TransportStats = field(default_factory=TransportStats)
+    rate_limiter: Optional[Any] = None
+    _async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncClients]" = field(
+        default_factory=weakref.WeakKeyDictionary, repr=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _orphan(self, count: int = 1) -> None:
+        self.stats.orphaned_pools += count
+        logger.info(f"Dropped {count} async Groq connection pool(s) of stopped event loops")
+
+    def _clients_for_running_loop(self) -> _AsyncClients:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            closed = [other for other in self._async_clients if other.is_closed()]
+            for other in closed:
+                self._async_clients.pop(other).finalizer.detach()
+            if closed:
+                self._orphan(len(closed))
+            clients = self._async_clients.get(loop)
+            if clients is None:
+                http_client = _create_async_http_client(self.settings, self.stats)
+                clients = _AsyncClients(
+                    http_client=http_client,
+                    # GroqClient applies its own retry/fallback policy to async calls
+                    client=AsyncGroq(api_key=self.api_key, base_url=self.base_url, http_client=http_client, max_retries=0),
+                    finalizer=weakref.finalize(loop, self._orphan)
+                )
+                self._async_clients[loop] = clients
+            return clients
+
+    @property
+    def async_client(self) -> AsyncGroq:
+        """The async SDK client for the running event loop."""
+        return self._clients_for_running_loop().client
+
+    @property
+    def async_http_client(self) -> httpx.AsyncClient:
+        """The async connection pool for the running event loop."""
+        return self._clients_for_running_loop().http_client
+
+    def detach(self) -> None:
+        """Record that a client using this transport was closed."""
+        with self._lock:
+            self.stats.clients_attached = max(self.stats.clients_attached - 1, 0)
+
+    async def aclose(self) -> None:
+        """Close the sync pool and every async pool whose event loop is still running."""
+        self.http_client.close()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pools = list(self._async_clients.items())
+            self._async_clients.clear()
+        orphaned = 0
+        for other, clients in pools:
+            clients.finalizer.detach()
+            if other is loop:
+                await clients.http_client.aclose()
+            elif other.is_running():
+                # Another thread's loop: close its pool there
+                asyncio.run_coroutine_threadsafe(clients.http_client.aclose(), other)
+            else:
+                orphaned += 1
+        if orphaned:
+            self._orphan(orphaned)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool statistics for this transport."""
+        return {
+            "base_url": self.base_url,
+            "http2": self.settings.http2,
+            "max_connections": self.settings.max_connections,
+            "max_keepalive_connections": self.settings.max_keepalive_connections,
+            "keepalive_expiry": self.settings.keepalive_expiry,
+            "requests_started": self.stats.requests_started,
+            "requests_completed": self.stats.requests_completed,
+            "in_flight": self.stats.requests_started - self.stats.requests_completed,
+            "clients_attached": self.stats.clients_attached,
+            "orphaned_pools": self.stats.orphaned_pools,
+            "sync_pool": _connection_counts(self.http_client),
+            "async_pool": self._async_pool_counts(),
+            "event_loops": sum(1 for loop in list(self._async_clients) if not loop.is_closed()),
+        }
+
+    def _async_pool_counts(self) -> Dict[str, int]:
+        with self._lock:
+            pools = [clients.http_client for loop, clients in self._async_clients.items() if not loop.is_closed()]
+        totals = {"open": 0, "idle": 0, "active": 0}
+        for pool in pools:
+            for key, value in _connection_counts(pool).items():
+                totals[key] += value
+        return totals
+
+
+def _connection_counts(http_client: Any) -> Dict[str, int]:
+    """Inspect the httpcore pool behind an httpx client (best effort)."""
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for conn in connections if conn.is_idle())
+    return {"open": len(connections), "idle": idle, "active": len(connections) - idle}
+
+
+def _http2_available() -> bool:
+    """Check whether the optional h2 package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _limits(settings: TransportSettings) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry
+    )
+
+
+def _timeout(settings: TransportSettings) -> httpx.Timeout:
+    return httpx.Timeout(settings.timeout, connect=min(settings.timeout, 10.0))
+
+
+def _create_async_http_client(settings: TransportSettings, stats: TransportStats) -> httpx.AsyncClient:
+    """Build an async pool that counts requests into the transport's shared stats."""
+
+    async def on_request(request: httpx.Request) -> None:
+        stats.requests_started += 1
+
+    async def on_response(response: httpx.Response) -> None:
+        stats.requests_completed += 1
+
+    return httpx.AsyncClient(
+        limits=_limits(settings),
+        timeout=_timeout(settings),
+        http2=settings.http2,
+        event_hooks={"request": [on_request], "response": [on_response]}
+    )
+
+
+class TransportRegistry:
+    """Process-wide registry of pooled Groq transports keyed by API key and base URL."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._transports: Dict[Tuple[str, Optional[str]], SharedTransport] = {}
+        self._lock = threading.Lock()
+
+    def get_transport(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        settings: Optional[TransportSettings] = None
+    ) -> SharedTransport:
+        """Get the shared transport for an API key/base URL, creating it on first use.
+
+        Pool settings are fixed by the first caller for a given key; later callers
+        with different settings reuse the existing pool.
+        """
+        key = (api_key, base_url)
+        with self._lock:
+            transport = self._transports.get(key)
+            if transport is None:
+                transport = self._create_transport(api_key, base_url, settings or TransportSettings())
+                self._transports[key] = transport
+            elif settings is not None and settings != transport.settings:
+                logger.debug("Reusing existing Groq transport for %s with its original pool settings", base_url or "default")
+            transport.stats.clients_attached += 1
+            return transport
+
+    def _create_transport(self, api_key: str, base_url: Optional[str], settings: TransportSettings) -> SharedTransport:
+        """Build the tuned sync pool; async pools are created per event loop on first use."""
+        if settings.http2 and not _http2_available():
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+            settings = TransportSettings(**{**settings.__dict__, "http2": False})
+
+        stats = TransportStats()
+
+        def on_request(request: httpx.Request) -> None:
+            stats.requests_started += 1
+
+        def on_response(response: httpx.Response) -> None:
+            stats.requests_completed += 1
+
+        http_client = httpx.Client(
+            limits=_limits(settings),
+            timeout=_timeout(settings),
+            http2=settings.http2,
+            event_hooks={"request": [on_request], "response": [on_response]}
+        )
+
+        return SharedTransport(
+            api_key=api_key,
+            base_url=base_url,
+            settings=settings,
+            http_client=http_client,
+            client=Groq(api_key=api_key, base_url=base_url, http_client=http_client),
+            stats=stats
+        )
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return pool statistics for every registered transport."""
+        with self._lock:
+            transports = list(self._transports.values())
+        return {f"{t.base_url or 'default'} (key ...{t.api_key[-4:]})": t.pool_stats() for t in transports}
+
+    async def close(self) -> None:
+        """Close all pooled connections and forget every transport."""
+        with self._lock:
+            transports = list(self._transports.values())
+            self._transports.clear()
+        for transport in transports:
+            await transport.aclose()
+
+
+# Global transport registry instance
+_global_transport_registry: Optional[TransportRegistry] = None
+
+
+def get_transport_registry() -> TransportRegistry:
+    """Get the global transport registry instance."""
+    global _global_transport_registry
+    if _global_transport_registry is None:
+        _global_transport_registry = TransportRegistry()
+    return _global_transport_registry
+
+
+async def close_transports() -> None:
+    """Close the global transport registry."""
+    global _global_transport_registry
+    if _global_transport_registry:
+        await _global_transport_registry.close()
+        _global_transport_registry = None
@@ -0,0 +1,237 @@
+"""Embedding-based context provider with offline hashing embeddings."""
+
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only VectorContextProvider needs it
+    np = None
+
+from .context_provider import ContextProvider, EvictionPolicy
+from .text_index import tokenize
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("VectorContextProvider requires numpy. Install it with: pip install numpy")
+
+
+class Embedder(ABC):
+    """Interface for text embedding functions.
+
+    Implementations return one L2-normalized float32 row per input text, so
+    cosine similarity reduces to a dot product.
+    """
+
+    dimension: int
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> "np.ndarray":
+        """Embed texts into an array of shape (len(texts), dimension)."""
+        pass
+
+
+class HashingEmbedder(Embedder):
+    """Dependency-free embedder using signed feature hashing of words and word bigrams.
+
+    It runs offline and is stable across processes (crc32, not Python's salted
+    hash), but only captures lexical overlap; plug in a model-backed Embedder
+    for true semantic similarity.
+    """
+
+    def __init__(self, dimension: int = 512, use_bigrams: bool = True):
+        """Initialize the hashing embedder."""
+        _require_numpy()
+        self.dimension = dimension
+        self.use_bigrams = use_bigrams
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        if self.use_bigrams:
+            tokens = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens
+
+    def embed_one(self, text: str, out: "np.ndarray") -> None:
+        """Write the embedding of `text` into the 1-d array `out`."""
+        counts: Dict[int, float] = {}
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            index = h % self.dimension
+            # The top hash bit picks the sign so collisions cancel out on average
+            counts[index] = counts.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+
+        out[:] = 0.0
+        if not counts:
+            return
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        # Sublinear term frequency damps repeated words
+        out[indices] = np.sign(values) * np.log1p(np.abs(values))
+        norm = np.linalg.norm(out)
+        if norm:
+            out /= norm
+
+    async def embed(self, texts: List[str]) -> "np.ndarray":
+        """Embed texts into an array of shape (len(texts), dimension)."""
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            self.embed_one(text, vectors[row])
+        return vectors
+
+
+class VectorContextProvider(ContextProvider):
+    """Context provider ranking entries by cosine similarity of their embeddings.
+
+    Vectors live in one contiguous float32 matrix that grows geometrically;
+    deletes move the last row into the freed slot, so the live rows stay dense
+    and a query is a single matrix-vector product plus `argpartition`.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        initial_capacity: int = 1024,
+        min_score: float = 0.05,
+        eviction_policy: Optional[EvictionPolicy] = None
+    ):
+        """Initialize the vector context provider."""
+        _require_numpy()
+        self._init_eviction(eviction_policy)
+        self.embedder = embedder or HashingEmbedder()
+        self.min_score = min_score
+        self.contexts: Dict[str, Dict[str, Any]] = {}
+        self._counter = 0
+        self._vectors = np.zeros((max(initial_capacity, 1), self.embedder.dimension), dtype=np.float32)
+        self._row_ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_ids)
+
+    def _ensure_capacity(self, size: int) -> None:
+        """Grow the vector matrix geometrically so appends are amortized O(1)."""
+        capacity = self._vectors.shape[0]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        grown = np.zeros((capacity, self.embedder.dimension), dtype=np.float32)
+        grown[:len(self._row_ids)] = self._vectors[:len(self._row_ids)]
+        self._vectors = grown
+
+    def _store_vectors(self, context_ids: List[str], vectors: "np.ndarray") -> None:
+        start = len(self._row_ids)
+        self._ensure_capacity(start + len(context_ids))
+        self._vectors[start:start + len(context_ids)] = vectors
+        for offset, context_id in enumerate(context_ids):
+            self._rows[context_id] = start + offset
+            self._row_ids.append(context_id)
+
+    def _new_entry(self, content: str, metadata: Optional[Dict[str, Any]]) -> str:
+        self._counter += 1
+        context_id = f"ctx_{self._counter}"
+        self.contexts[context_id] = {
+            "content": content,
+            "metadata": metadata or {},
+            "timestamp": datetime.now().isoformat()
+        }
+        self._resize_content(new=content)
+        self._track(context_id, content)
+        return context_id
+
+    async def get_context(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Retrieve the contexts most similar to the query."""
+        # Drop expired entries before they can be returned
+        if self.eviction_policy is not None and self.eviction_policy.ttl is not None:
+            await self.enforce_limits()
+
+        if not self._row_ids or limit <= 0:
+            return []
+
+        query_vector = (await self.embedder.embed([query]))[0]
+        # Entries may have been added or deleted while the embedder ran
+        size = len(self._row_ids)
+        if not size:
+            return []
+        scores = self._vectors[:size] @ query_vector
+
+        k = min(limit, size)
+        top = np.argpartition(scores, size - k)[size - k:] if k < size else np.arange(size)
+        top = top[np.argsort(scores[top])[::-1]]
+
+        results = []
+        for row in top:
+            score = float(scores[row])
+            if score < self.min_score:
+                break
+            context_id = self._row_ids[row]
+            context_data = self.contexts[context_id]
+            results.append({
+                "id": context_id,
+                "content": context_data.get("content", ""),
+                "metadata": context_data.get("metadata", {}),
+                "timestamp": context_data.get("timestamp"),
+                "score": score
+            })
+        self._touch([result["id"] for result in results])
+        return results
+
+    async def add_context(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Add content to the context store."""
+        vectors = await self.embedder.embed([content])
+        context_id = self._new_entry(content, metadata)
+        self._store_vectors([context_id], vectors)
+        await self.enforce_limits()
+        return context_id
+
+    async def add_contexts(self, items: List[Dict[str, Any]]) -> List[str]:
+        """Add many {"content", "metadata"} items with a single embedding call."""
+        if not items:
+            return []
+        vectors = await self.embedder.embed([item["content"] for item in items])
+        context_ids = [self._new_entry(item["content"], item.get("metadata")) for item in items]
+        self._store_vectors(context_ids, vectors)
+        await self.enforce_limits()
+        return context_ids
+
+    async def update_context(self, context_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Update existing context."""
+        if context_id not in self.contexts:
+            return False
+
+        vectors = await self.embedder.embed([content])
+        # The entry may have been deleted while the embedder ran
+        row = self._rows.get(context_id)
+        if row is None:
+            return False
+        self._vectors[row] = vectors[0]
+
+        self._resize_content(self.contexts[context_id]["content"], content)
+        self.contexts[context_id]["content"] = content
+        if metadata is not None:
+            self.contexts[context_id]["metadata"] = metadata
+        self.contexts[context_id]["timestamp"] = datetime.now().isoformat()
+        self._track(context_id, content)
+        await self.enforce_limits()
+
+        return True
+
+    async def delete_context(self, context_id: str) -> bool:
+        """Delete context by ID."""
+        if context_id not in self.contexts:
+            return False
+
+        self._resize_content(old=self.contexts.pop(context_id)["content"])
+        self._untrack(context_id)
+        row = self._rows.pop(context_id)
+        last_row = len(self._row_ids) - 1
+        last_id = self._row_ids.pop()
+        if row != last_row:
+            # Keep rows dense: move the last vector into the freed slot
+            self._vectors[row] = self._vectors[last_row]
+            self._row_ids[row] = last_id
+            self._rows[last_id] = row
+        return True
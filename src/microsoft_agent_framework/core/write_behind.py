@@ -0,0 +1,168 @@
+"""Write-behind queues that persist data off the response path."""
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .context_provider import ContextProvider
+
+logger = logging.getLogger(__name__)
+
+# Every live queue, so application shutdown can drain them all
+_queues: "weakref.WeakSet[WriteBehindQueue]" = weakref.WeakSet()
+
+
+class WriteBehindQueue:
+    """Bounded queue of pending writes drained in batches by a background task.
+
+    `submit` only enqueues; a worker task groups queued items into batches of
+    up to `batch_size` (waiting at most `max_delay` seconds for a batch to fill)
+    and stores each batch with one `write_batch(items)` call. Once
+    `max_pending` items are queued, `submit` waits for room, so a slow store
+    applies backpressure instead of growing memory without bound. A failed
+    batch is retried up to `max_retries` times with exponential backoff, then
+    logged and dropped.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Any]], Awaitable[Any]],
+        max_pending: int = 1000,
+        batch_size: int = 64,
+        max_delay: float = 0.05,
+        max_retries: int = 0,
+        name: str = "write-behind"
+    ):
+        """Initialize the queue."""
+        self.write_batch = write_batch
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {"submitted": 0, "written": 0, "failed": 0, "batches": 0, "retries": 0}
+        _queues.add(self)
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues are bound to one event loop; anything left on a closed loop is lost
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._loop = loop
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, item: Any) -> None:
+        """Queue a write, waiting only if the buffer is full."""
+        queue = self._ensure_worker()
+        self._stats["submitted"] += 1
+        await queue.put(item)
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[Any]:
+        batch = [await queue.get()]
+        deadline = self._loop.time() + self.max_delay
+        while len(batch) < self.batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: List[Any]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.write_batch(batch)
+                self._stats["written"] += len(batch)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self._stats["failed"] += len(batch)
+                    logger.warning(f"{self.name}: dropped {len(batch)} writes: {e}")
+                    return
+                self._stats["retries"] += 1
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+    def _record_dropped(self, count: int, error: Exception) -> None:
+        """Record writes that `write_batch` dropped while storing the rest of its batch."""
+        # _write counts the whole batch as written once write_batch returns
+        self._stats["written"] -= count
+        self._stats["failed"] += count
+        logger.warning(f"{self.name}: dropped {count} writes: {error}")
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = await self._next_batch(queue)
+            try:
+                await self._write(batch)
+            finally:
+                self._stats["batches"] += 1
+                for _ in batch:
+                    queue.task_done()
+
+    async def flush(self) -> None:
+        """Wait until every queued write has been stored."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the worker."""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    @property
+    def pending(self) -> int:
+        """Number of writes queued but not yet stored."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get queue counters."""
+        return {**self._stats, "pending": self.pending}
+
+
+class ContextWriteBehind(WriteBehindQueue):
+    """Write-behind queue storing agent context through a provider's `add_contexts`."""
+
+    def __init__(
+        self,
+        provider: ContextProvider,
+        max_pending: int = 1000,
+        batch_size: int = 64,
+        max_delay: float = 0.05
+    ):
+        """Initialize the write-behind queue for `provider`."""
+        super().__init__(
+            provider.add_contexts,
+            max_pending=max_pending,
+            batch_size=batch_size,
+            max_delay=max_delay,
+            name="context writes"
+        )
+        self.provider = provider
+
+    async def submit(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Queue a context write, waiting only if the buffer is full."""
+        await super().submit({"content": content, "metadata": metadata})
+
+
+async def flush_write_queues() -> None:
+    """Flush every write-behind queue; call on application shutdown."""
+    for queue in list(_queues):
+        try:
+            await queue.close()
+        except Exception as e:
+            logger.error(f"Failed to flush {queue.name}: {e}")
@@ -1,6 +1,6 @@
 """Database integration for the Microsoft Agent Framework."""
 
-from .models import Base, Agent, Conversation, Message
-from .connection import DatabaseManager, get_database, init_database
+from .models import Base, Agent, Conversation, Message, AgentContext
+from .connection import DatabaseManager, DatabaseConfig, get_database, init_database
 
-__all__ = ["Base", "Agent", "Conversation", "Message", "DatabaseManager", "get_database", "init_database"]
+__all__ = ["Base", "Agent", "Conversation", "Message", "AgentContext", "DatabaseManager", "DatabaseConfig", "get_database", "init_database"]
@@ -1,7 +1,11 @@
 """Database connection and management."""
 
 import os
-from typing import Optional, AsyncGenerator
+import time
+from collections import deque
+from typing import Any, Dict, Optional, AsyncGenerator
+from pydantic import BaseModel
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 import asyncpg
@@ -10,10 +14,83 @@ from contextlib import asynccontextmanager
 Base = declarative_base()
 
 
+class DatabaseConfig(BaseModel):
+    """Connection pool settings for DatabaseManager."""
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pre_ping: str = "idle"  # "always", "idle", "never"
+    pre_ping_idle_seconds: float = 60.0
+    statement_cache_size: int = 100
+    echo: bool = False
+    
+    @classmethod
+    def from_env(cls) -> "DatabaseConfig":
+        """Read settings from DB_* environment variables."""
+        return cls(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            pre_ping=os.getenv("DB_PRE_PING", "idle"),
+            pre_ping_idle_seconds=float(os.getenv("DB_PRE_PING_IDLE_SECONDS", "60")),
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")),
+            echo=os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+        )
+
+
+class PoolTelemetry:
+    """Counters and checkout wait times for one engine's connection pool."""
+    
+    def __init__(self, window: int = 1024):
+        """Initialize empty counters; wait percentiles cover the last `window` checkouts."""
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits: deque = deque(maxlen=window)
+    
+    def record_wait(self, seconds: float) -> None:
+        """Record how long a session waited for a pooled connection."""
+        self.wait_count += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self._waits.append(seconds)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the counters and wait-time summary (seconds)."""
+        waits = sorted(self._waits)
+        return {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "timeouts": self.timeouts,
+            "peak_checked_out": self.peak_checked_out,
+            "wait": {
+                "count": self.wait_count,
+                "avg": self.wait_total / self.wait_count if self.wait_count else 0.0,
+                "p50": waits[len(waits) // 2] if waits else 0.0,
+                "p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                "max": self.wait_max
+            }
+        }
+
+
 class DatabaseManager:
     """Database connection manager."""
     
-    def __init__(self, database_url: Optional[str] = None):
+    def __init__(self, database_url: Optional[str] = None, config: Optional[DatabaseConfig] = None):
         """Initialize database manager."""
         self.database_url = database_url or os.getenv("DATABASE_URL")
         if not self.database_url:
@@ -25,11 +102,24 @@ class DatabaseManager:
         elif not self.database_url.startswith("postgresql+asyncpg://"):
             self.database_url = f"postgresql+asyncpg://{self.database_url}"
         
+        self.config = config or DatabaseConfig.from_env()
+        if self.config.pre_ping not in ("always", "idle", "never"):
+            raise ValueError(f"Invalid pre_ping policy: {self.config.pre_ping}")
+        
+        connect_args: Dict[str, Any] = {"prepared_statement_cache_size": self.config.statement_cache_size}
+        if self.config.statement_cache_size == 0:
+            # Also disable asyncpg's own cache, e.g. behind pgbouncer in transaction mode
+            connect_args["statement_cache_size"] = 0
+        
         self.engine = create_async_engine(
             self.database_url,
-            echo=False,
-            pool_pre_ping=True,
-            pool_recycle=300
+            echo=self.config.echo,
+            pool_size=self.config.pool_size,
+            max_overflow=self.config.max_overflow,
+            pool_timeout=self.config.pool_timeout,
+            pool_recycle=self.config.pool_recycle,
+            pool_pre_ping=self.config.pre_ping == "always",
+            connect_args=connect_args
         )
         
         self.async_session = async_sessionmaker(
@@ -37,6 +127,68 @@ class DatabaseManager:
             class_=AsyncSession,
             expire_on_commit=False
         )
+        
+        self.telemetry = PoolTelemetry()
+        self._install_pool_events()
+    
+    def _install_pool_events(self) -> None:
+        """Track pool activity and ping connections that sat idle (pre_ping="idle")."""
+        telemetry = self.telemetry
+        pool = self.engine.pool
+        dialect = self.engine.dialect
+        ping_idle = self.config.pre_ping == "idle"
+        idle_seconds = self.config.pre_ping_idle_seconds
+        
+        @event.listens_for(pool, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            telemetry.connects += 1
+            connection_record.info["checked_in_at"] = time.monotonic()
+        
+        @event.listens_for(pool, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            checked_in_at = connection_record.info.get("checked_in_at")
+            if ping_idle and checked_in_at is not None and time.monotonic() - checked_in_at > idle_seconds:
+                # Only connections idle long enough to have been dropped pay for a round-trip
+                telemetry.pings += 1
+                try:
+                    alive = dialect.do_ping(dbapi_connection)
+                except Exception:
+                    alive = False
+                if not alive:
+                    telemetry.ping_failures += 1
+                    # Makes the pool discard this connection and retry with a fresh one
+                    raise exc.DisconnectionError("Connection failed idle pre-ping")
+            telemetry.checkouts += 1
+            telemetry.peak_checked_out = max(telemetry.peak_checked_out, pool.checkedout())
+        
+        @event.listens_for(pool, "checkin")
+        def _on_checkin(dbapi_connection, connection_record):
+            telemetry.checkins += 1
+            connection_record.info["checked_in_at"] = time.monotonic()
+        
+        @event.listens_for(pool, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            telemetry.invalidations += 1
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Snapshot of pool occupancy, counters and checkout wait times."""
+        pool = self.engine.pool
+        occupancy = {}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            occupancy[name] = method() if method else None
+        return {
+            "pool_class": type(pool).__name__,
+            "pool_size": self.config.pool_size,
+            "max_overflow": self.config.max_overflow,
+            "pool_timeout": self.config.pool_timeout,
+            "pre_ping": self.config.pre_ping,
+            "statement_cache_size": self.config.statement_cache_size,
+            "checked_in": occupancy["checkedin"],
+            "checked_out": occupancy["checkedout"],
+            "overflow": occupancy["overflow"],
+            **self.telemetry.snapshot()
+        }
     
     async def create_tables(self):
         """Create all database tables."""
@@ -55,6 +207,14 @@ class DatabaseManager:
         """Get database session context manager."""
         async with self.async_session() as session:
             try:
+                # Check out the connection up front so the wait for it is measured
+                started = time.monotonic()
+                try:
+                    await session.connection()
+                except exc.TimeoutError:
+                    self.telemetry.timeouts += 1
+                    raise
+                self.telemetry.record_wait(time.monotonic() - started)
                 yield session
                 await session.commit()
             except Exception:
@@ -82,6 +242,8 @@ def get_database() -> DatabaseManager:
 
 async def init_database():
     """Initialize database and create tables."""
+    from .partitions import ensure_message_partitions
     db = get_database()
     await db.create_tables()
+    await ensure_message_partitions(db)
     return db
@@ -0,0 +1,170 @@
+"""Keyset-paginated conversation history and thread rehydration."""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, tuple_
+
+from .models import Conversation, Message
+from ..core.agent_thread import AgentThread
+from ..core.tokens import estimate_tokens
+
+# Keys in Conversation.agent_metadata holding the stored rolling summary
+SUMMARY_KEY = "summary"
+SUMMARY_COUNT_KEY = "summary_count"
+
+# Thread metadata keys: number of stored messages older than the rehydrated ones,
+# and the summary last written to the conversation
+HISTORY_OFFSET_KEY = "history_offset"
+SAVED_SUMMARY_KEY = "saved_summary"
+
+
+def encode_cursor(message: Any) -> str:
+    """Encode a row's (created_at, id) keyset position as an opaque cursor."""
+    raw = json.dumps([message.created_at.isoformat(), message.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed."""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        uuid.UUID(row_id)
+        return datetime.fromisoformat(created_at), row_id
+    except (TypeError, ValueError, UnicodeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def page_messages(
+    session,
+    conversation_id: str,
+    limit: int = 100,
+    before: Optional[str] = None
+) -> Tuple[List[Message], Optional[str]]:
+    """Get up to `limit` messages older than the `before` cursor (newest page by default).
+
+    Messages are returned oldest first, with a cursor for the next (older) page,
+    or None once the start of the conversation is reached. The query is served
+    by the (conversation_id, created_at, id) index.
+    """
+    statement = (
+        select(Message)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(limit + 1)
+    )
+    if before is not None:
+        statement = statement.where(tuple_(Message.created_at, Message.id) < decode_cursor(before))
+
+    rows = list((await session.execute(statement)).scalars().all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return rows, encode_cursor(rows[0]) if has_more and rows else None
+
+
+async def count_messages(session, conversation_id: str) -> int:
+    """Count a conversation's messages."""
+    result = await session.execute(
+        select(func.count()).select_from(Message).where(Message.conversation_id == conversation_id)
+    )
+    return result.scalar_one()
+
+
+async def load_recent_messages(
+    session,
+    conversation_id: str,
+    max_messages: int = 50,
+    max_tokens: Optional[int] = None
+) -> List[Tuple[str, str]]:
+    """Load the (role, content) of the latest messages, oldest first.
+
+    At most `max_messages` rows are read, and older ones are dropped until the
+    estimated size fits `max_tokens`.
+    """
+    result = await session.execute(
+        select(Message.role, Message.content)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(max_messages)
+    )
+    messages = []
+    budget = max_tokens
+    for role, content in result.all():
+        if budget is not None:
+            budget -= estimate_tokens(content)
+            if budget < 0 and messages:
+                break
+        messages.append((role, content))
+    messages.reverse()
+    return messages
+
+
+async def rehydrate_thread(
+    session,
+    thread: AgentThread,
+    conversation: Conversation,
+    max_messages: int = 50,
+    max_tokens: Optional[int] = None
+) -> int:
+    """Replay a conversation's recent messages into `thread`; returns how many were loaded.
+
+    History older than the loaded window is represented by the conversation's
+    stored rolling summary, if one has been saved with save_thread_summary.
+    """
+    messages = await load_recent_messages(session, conversation.id, max_messages, max_tokens)
+    first = len(thread.messages)
+    for role, content in messages:
+        if role == "user":
+            thread.add_user_message(content)
+        elif role == "assistant":
+            thread.add_assistant_message(content)
+
+    metadata = conversation.agent_metadata or {}
+    summary = metadata.get(SUMMARY_KEY)
+    offset = 0
+    if len(messages) == max_messages or max_tokens is not None:
+        # The window may not start at the beginning of the conversation
+        offset = max(await count_messages(session, conversation.id) - len(messages), 0)
+    thread.metadata[HISTORY_OFFSET_KEY] = offset
+    thread.metadata[SAVED_SUMMARY_KEY] = summary
+    if summary:
+        # Loaded messages the summary already covers stay in the thread but are folded
+        covered = min(max(metadata.get(SUMMARY_COUNT_KEY, 0) - offset, 0), len(thread.messages) - first)
+        thread.set_summary(summary, first + covered)
+    return len(messages)
+
+
+def thread_summary_state(thread: AgentThread) -> Optional[Dict[str, Any]]:
+    """Get the conversation metadata that persists a thread's rolling summary."""
+    if thread.summary is None:
+        return None
+    covered = sum(1 for role, _ in islice(thread._iter_role_content(0), thread.summary_until) if role != "system")
+    return {
+        SUMMARY_KEY: thread.summary,
+        SUMMARY_COUNT_KEY: thread.metadata.get(HISTORY_OFFSET_KEY, 0) + covered
+    }
+
+
+def summary_needs_saving(thread: AgentThread) -> bool:
+    """Check, without touching the database, whether the thread's summary changed since it was saved."""
+    return thread.summary is not None and thread.summary != thread.metadata.get(SAVED_SUMMARY_KEY)
+
+
+async def save_thread_summary(session, conversation_id: str, thread: AgentThread) -> bool:
+    """Store the thread's rolling summary on its conversation if it changed."""
+    if not summary_needs_saving(thread):
+        return False
+    state = thread_summary_state(thread)
+    conversation = await session.get(Conversation, conversation_id)
+    if conversation is None:
+        return False
+    metadata = dict(conversation.agent_metadata or {})
+    metadata.update(state)
+    conversation.agent_metadata = metadata
+    thread.metadata[SAVED_SUMMARY_KEY] = thread.summary
+    return True
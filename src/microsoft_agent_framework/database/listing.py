@@ -0,0 +1,89 @@
+"""Keyset-paginated listings of agents and conversations."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+
+from .history import decode_cursor, encode_cursor
+from .models import Agent, Conversation
+
+# Columns returned by listings; instructions, tools and metadata are left to the detail endpoints
+AGENT_SUMMARY_COLUMNS = (
+    Agent.id,
+    Agent.name,
+    Agent.template_name,
+    Agent.model,
+    Agent.created_at,
+    Agent.updated_at,
+    Agent.is_active
+)
+CONVERSATION_SUMMARY_COLUMNS = (
+    Conversation.id,
+    Conversation.agent_id,
+    Conversation.title,
+    Conversation.message_count,
+    Conversation.created_at,
+    Conversation.updated_at,
+    Conversation.is_active
+)
+
+
+def _summary(row: Any) -> Dict[str, Any]:
+    summary = dict(row._mapping)
+    for key in ("created_at", "updated_at"):
+        summary[key] = summary[key].isoformat() if summary[key] else None
+    return summary
+
+
+async def page_agents(
+    session,
+    limit: int = 50,
+    after: Optional[str] = None,
+    include_inactive: bool = False
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get up to `limit` agent summaries created after the `after` cursor, oldest first.
+
+    Returns the page and a cursor for the next one, or None on the last page.
+    The query is served by the (is_active, created_at, id) index.
+    """
+    statement = (
+        select(*AGENT_SUMMARY_COLUMNS)
+        .order_by(Agent.created_at, Agent.id)
+        .limit(limit + 1)
+    )
+    if not include_inactive:
+        statement = statement.where(Agent.is_active == True)
+    if after is not None:
+        statement = statement.where(tuple_(Agent.created_at, Agent.id) > decode_cursor(after))
+
+    rows = (await session.execute(statement)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return [_summary(row) for row in rows], encode_cursor(rows[-1]) if has_more else None
+
+
+async def page_conversations(
+    session,
+    agent_id: Optional[str] = None,
+    limit: int = 50,
+    before: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get up to `limit` conversation summaries created before the `before` cursor, newest first.
+
+    Pass `agent_id` to list one agent's conversations. Message counts come from
+    the denormalized `message_count` column, so no messages are read.
+    """
+    statement = (
+        select(*CONVERSATION_SUMMARY_COLUMNS)
+        .order_by(Conversation.created_at.desc(), Conversation.id.desc())
+        .limit(limit + 1)
+    )
+    if agent_id is not None:
+        statement = statement.where(Conversation.agent_id == agent_id)
+    if before is not None:
+        statement = statement.where(tuple_(Conversation.created_at, Conversation.id) < decode_cursor(before))
+
+    rows = (await session.execute(statement)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return [_summary(row) for row in rows], encode_cursor(rows[-1]) if has_more else None
@@ -0,0 +1,106 @@
+"""Batching writer for conversation messages."""
+
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import DataError, IntegrityError
+
+from .models import Conversation, Message
+from ..core.write_behind import WriteBehindQueue
+
+
+class MessageWriter(WriteBehindQueue):
+    """Persists `Message` rows in the background with multi-row INSERTs.
+
+    Each batch of up to `batch_size` messages collected within `max_delay`
+    seconds takes one pooled connection for one INSERT, so request handlers
+    never hold a connection while they wait on the LLM. Ids and `created_at`
+    are assigned at submit time, keeping history order independent of when
+    a batch lands. The same transaction adds each conversation's new rows to
+    its denormalized `message_count`.
+
+    A batch rejected for its data (e.g. a message for a conversation deleted
+    meanwhile) is split, first by conversation and then into single rows, so
+    only the offending rows are dropped. Other errors fail the whole batch and
+    are retried.
+    """
+
+    def __init__(
+        self,
+        db: Optional[Any] = None,
+        max_pending: int = 10000,
+        batch_size: int = 200,
+        max_delay: float = 0.05,
+        max_retries: int = 3
+    ):
+        """Initialize the writer; `db` defaults to the global DatabaseManager."""
+        super().__init__(
+            self._insert,
+            max_pending=max_pending,
+            batch_size=batch_size,
+            max_delay=max_delay,
+            max_retries=max_retries,
+            name="message writes"
+        )
+        self.db = db
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            await self._insert_rows(rows)
+        except (IntegrityError, DataError) as e:
+            await self._insert_split(rows, e)
+
+    async def _insert_split(self, rows: List[Dict[str, Any]], error: Exception) -> None:
+        by_conversation: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_conversation.setdefault(row["conversation_id"], []).append(row)
+        if len(by_conversation) > 1:
+            parts = list(by_conversation.values())
+        elif len(rows) > 1:
+            parts = [[row] for row in rows]
+        else:
+            self._record_dropped(1, error)
+            return
+        for part in parts:
+            try:
+                await self._insert_rows(part)
+            except (IntegrityError, DataError) as e:
+                await self._insert_split(part, e)
+
+    async def _insert_rows(self, rows: List[Dict[str, Any]]) -> None:
+        if self.db is None:
+            from .connection import get_database
+            self.db = get_database()
+        counts = Counter(row["conversation_id"] for row in rows)
+        conversations = Conversation.__table__
+        async with self.db.get_session() as session:
+            await session.execute(insert(Message), rows)
+            # Sorted so concurrent batches lock conversations in the same order
+            await session.execute(
+                update(conversations)
+                .where(conversations.c.id == bindparam("conversation_id"))
+                .values(message_count=conversations.c.message_count + bindparam("added")),
+                [{"conversation_id": cid, "added": counts[cid]} for cid in sorted(counts)]
+            )
+
+    async def submit(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Queue a message for insertion and return its id."""
+        message_id = str(uuid.uuid4())
+        await super().submit({
+            "id": message_id,
+            "conversation_id": conversation_id,
+            "role": role,
+            "content": content,
+            "agent_metadata": metadata or {},
+            "created_at": datetime.utcnow()
+        })
+        return message_id
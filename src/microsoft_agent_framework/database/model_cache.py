@@ -0,0 +1,124 @@
+"""Read-through caches for rarely changing rows such as agents and templates."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+
+from sqlalchemy import select
+
+T = TypeVar("T")
+
+# Cached marker for keys known not to exist
+_MISSING = object()
+
+
+class ModelCache(Generic[T]):
+    """Read-through cache of one model's rows, keyed by a unique column.
+
+    Rows are cached detached from any session for `ttl` seconds; lookups of
+    keys with no row are remembered for `negative_ttl` seconds so repeated
+    404s skip the database too. Concurrent misses for one key share a single
+    query. Writers call `invalidate(key)` after changing a row; other replicas
+    see the change once their entry's TTL runs out.
+    """
+
+    def __init__(
+        self,
+        model: Type[T],
+        key_column: Optional[Any] = None,
+        ttl: float = 60.0,
+        negative_ttl: float = 5.0,
+        max_entries: int = 10000,
+        db: Optional[Any] = None
+    ):
+        """Initialize the cache; `key_column` defaults to the model's `id`."""
+        self.model = model
+        self.key_column = key_column if key_column is not None else model.id
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.db = db
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Any, asyncio.Future] = {}
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "invalidations": 0}
+
+    def _get_db(self):
+        if self.db is None:
+            from .connection import get_database
+            self.db = get_database()
+        return self.db
+
+    async def _query(self, statement, session=None) -> List[T]:
+        """Run a query, detaching the returned rows so they can outlive the session."""
+        if session is not None:
+            rows = list((await session.execute(statement)).scalars().all())
+            for row in rows:
+                session.expunge(row)
+            return rows
+        async with self._get_db().get_session() as own_session:
+            return await self._query(statement, own_session)
+
+    async def get(self, key: Any, session=None) -> Optional[T]:
+        """Get the row for `key`, or None if it does not exist.
+
+        Pass the caller's `session` to load through its connection on a miss.
+        """
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            if cached[1] is _MISSING:
+                self._stats["negative_hits"] += 1
+                return None
+            self._stats["hits"] += 1
+            return cached[1]
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        self._stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            rows = await self._query(select(self.model).where(self.key_column == key), session)
+            row = rows[0] if rows else None
+            # An invalidation during the query may have made this result stale
+            if self._loading.get(key) is future:
+                self._store(key, row)
+            future.set_result(row)
+            return row
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case no concurrent caller was waiting
+            future.exception()
+            raise
+        finally:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+
+    def _store(self, key: Any, row: Optional[T]) -> None:
+        ttl = self.ttl if row is not None else self.negative_ttl
+        self._entries[key] = (time.monotonic() + ttl, row if row is not None else _MISSING)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Any = None) -> None:
+        """Forget the row for `key`, or every row if None."""
+        if key is None:
+            self._entries.clear()
+            self._loading.clear()
+        else:
+            self._entries.pop(key, None)
+            self._loading.pop(key, None)
+        self._stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters."""
+        lookups = self._stats["hits"] + self._stats["negative_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": (self._stats["hits"] + self._stats["negative_hits"]) / lookups if lookups else 0.0
+        }
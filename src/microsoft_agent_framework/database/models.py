@@ -1,25 +1,43 @@
 """Database models for the Microsoft Agent Framework."""
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, DateTime, JSON, ForeignKey, Boolean, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
+from typing import Optional
 import uuid
 
 Base = declarative_base()
 
+# Native 16-byte uuid on PostgreSQL; other databases keep the canonical string.
+# Values are str either way.
+UUIDString = String().with_variant(UUID(as_uuid=False), "postgresql")
+
+# Text search configuration of agent_contexts.search_vector; queries must use the same one
+CONTEXT_SEARCH_CONFIG = "english"
+
+
+def is_uuid(value: str) -> bool:
+    """Check that a client-supplied id can be compared with a uuid column."""
+    try:
+        uuid.UUID(value)
+        return True
+    except (TypeError, ValueError, AttributeError):
+        return False
+
 
 class Agent(Base):
     """Agent model for storing agent configurations."""
     
     __tablename__ = "agents"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False)
     template_name = Column(String(100), nullable=True)
     instructions = Column(Text, nullable=False)
     model = Column(String(100), default="llama-3.1-70b-versatile")
-    temperature = Column(String(10), default="0.7")
+    temperature = Column(Float, default=0.7)
     max_tokens = Column(Integer, default=4096)
     tools = Column(JSON, default=list)
     agent_metadata = Column(JSON, default=dict)
@@ -30,6 +48,15 @@ class Agent(Base):
     # Relationships
     conversations = relationship("Conversation", back_populates="agent", cascade="all, delete-orphan")
     
+    # Keyset pagination of the agent listing, oldest first; on PostgreSQL the
+    # listed columns are included so pages are served by index-only scans
+    __table_args__ = (
+        Index(
+            "ix_agents_listing", "is_active", "created_at", "id",
+            postgresql_include=["name", "template_name", "model", "updated_at"]
+        ),
+    )
+    
     def to_dict(self):
         """Convert agent to dictionary."""
         return {
@@ -38,7 +65,7 @@ class Agent(Base):
             "template_name": self.template_name,
             "instructions": self.instructions,
             "model": self.model,
-            "temperature": float(self.temperature),
+            "temperature": self.temperature,
             "max_tokens": self.max_tokens,
             "tools": self.tools,
             "metadata": self.agent_metadata,
@@ -53,10 +80,12 @@ class Conversation(Base):
     
     __tablename__ = "conversations"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    agent_id = Column(String, ForeignKey("agents.id"), nullable=False)
+    id = Column(UUIDString, primary_key=True, default=lambda: str(uuid.uuid4()))
+    agent_id = Column(UUIDString, ForeignKey("agents.id"), nullable=False)
     title = Column(String(255), nullable=True)
     agent_metadata = Column(JSON, default=dict)
+    # Maintained by MessageWriter so listings need not count messages
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
@@ -65,8 +94,14 @@ class Conversation(Base):
     agent = relationship("Agent", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
     
-    def to_dict(self):
-        """Convert conversation to dictionary."""
+    # Keyset pagination of conversation listings, newest first, overall and per agent
+    __table_args__ = (
+        Index("ix_conversations_created_at", "created_at", "id"),
+        Index("ix_conversations_agent_id_created_at", "agent_id", "created_at", "id"),
+    )
+    
+    def to_dict(self, message_count: Optional[int] = None):
+        """Convert conversation to dictionary; `message_count` overrides the stored count."""
         return {
             "id": self.id,
             "agent_id": self.agent_id,
@@ -75,7 +110,7 @@ class Conversation(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "is_active": self.is_active,
-            "message_count": len(self.messages) if self.messages else 0
+            "message_count": message_count if message_count is not None else self.message_count
         }
 
 
@@ -84,8 +119,8 @@ class Message(Base):
     
     __tablename__ = "messages"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    conversation_id = Column(String, ForeignKey("conversations.id"), nullable=False)
+    id = Column(UUIDString, primary_key=True, default=lambda: str(uuid.uuid4()))
+    conversation_id = Column(UUIDString, ForeignKey("conversations.id"), nullable=False)
     role = Column(String(20), nullable=False)  # user, assistant, system, tool
     content = Column(Text, nullable=False)
     agent_metadata = Column(JSON, default=dict)
@@ -94,6 +129,13 @@ class Message(Base):
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
     
+    # Keyset pagination of a conversation's history, newest first, and a
+    # compact BRIN index for time-range scans of the append-ordered table
+    __table_args__ = (
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at", "id"),
+        Index("ix_messages_created_at", "created_at", postgresql_using="brin"),
+    )
+    
     def to_dict(self):
         """Convert message to dictionary."""
         return {
@@ -111,12 +153,12 @@ class AgentTemplate(Base):
     
     __tablename__ = "agent_templates"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDString, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(100), unique=True, nullable=False)
     description = Column(Text, nullable=True)
     instructions = Column(Text, nullable=False)
     model = Column(String(100), default="llama-3.1-70b-versatile")
-    temperature = Column(String(10), default="0.7")
+    temperature = Column(Float, default=0.7)
     max_tokens = Column(Integer, default=4096)
     tools = Column(JSON, default=list)
     agent_metadata = Column(JSON, default=dict)
@@ -132,7 +174,7 @@ class AgentTemplate(Base):
             "description": self.description,
             "instructions": self.instructions,
             "model": self.model,
-            "temperature": float(self.temperature),
+            "temperature": self.temperature,
             "max_tokens": self.max_tokens,
             "tools": self.tools,
             "metadata": self.agent_metadata,
@@ -140,3 +182,33 @@ class AgentTemplate(Base):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "is_active": self.is_active
         }
+
+
+class AgentContext(Base):
+    """Agent memory entry with a full-text search vector."""
+    
+    __tablename__ = "agent_contexts"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    agent_id = Column(String(255), nullable=True)
+    content = Column(Text, nullable=False)
+    agent_metadata = Column(JSON, default=dict)
+    search_vector = Column(TSVECTOR, Computed(f"to_tsvector('{CONTEXT_SEARCH_CONFIG}', content)", persisted=True))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_agent_contexts_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_agent_contexts_agent_id_created_at", "agent_id", "created_at"),
+    )
+    
+    def to_dict(self):
+        """Convert context entry to dictionary."""
+        return {
+            "id": f"ctx_{self.id}",
+            "agent_id": self.agent_id,
+            "content": self.content,
+            "metadata": self.agent_metadata,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,144 @@
+"""Monthly range partitions for the PostgreSQL messages table."""
+
+import logging
+from typing import List, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_COLUMNS = "id, conversation_id, role, content, agent_metadata, created_at"
+
+# Indexes and the conversation foreign key, recreated after each table swap
+_MESSAGE_INDEXES = [
+    "CREATE INDEX ix_messages_conversation_id_created_at ON messages (conversation_id, created_at, id)",
+    "CREATE INDEX ix_messages_created_at ON messages USING brin (created_at)",
+    "ALTER TABLE messages ADD CONSTRAINT messages_conversation_id_fkey "
+    "FOREIGN KEY(conversation_id) REFERENCES conversations (id)",
+]
+
+# Partitions are created on the staging table and named after it
+_RENAME_STAGED_PARTITIONS = """
+DO $$
+DECLARE
+    child regclass;
+BEGIN
+    FOR child IN SELECT inhrelid::regclass FROM pg_inherits WHERE inhparent = 'messages'::regclass LOOP
+        IF child::text LIKE 'messages_partitioned_%' THEN
+            EXECUTE format(
+                'ALTER TABLE %s RENAME TO %I',
+                child, replace(child::text, 'messages_partitioned_', 'messages_')
+            );
+        END IF;
+    END LOOP;
+END $$
+"""
+
+
+def month_partitions_sql(table: str = "messages", months_ahead: int = 3, from_table: Optional[str] = None) -> str:
+    """PL/pgSQL block creating `<table>_YYYY_MM` partitions.
+
+    Covers the current month, or every month from the oldest row of `from_table`
+    if given, up to `months_ahead` months from now. Existing partitions are
+    left alone.
+    """
+    first = f"(SELECT min(created_at) FROM {from_table})" if from_table else "NULL"
+    return f"""
+DO $$
+DECLARE
+    month date := date_trunc('month', coalesce({first}, now()));
+    last_month date := date_trunc('month', now()) + interval '{int(months_ahead)} months';
+BEGIN
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+            '{table}_' || to_char(month, 'YYYY_MM'), month, month + interval '1 month'
+        );
+        month := month + interval '1 month';
+    END LOOP;
+END $$
+"""
+
+
+def partition_messages_statements(months_ahead: int = 3) -> List[str]:
+    """SQL converting an unpartitioned `messages` table into monthly range partitions.
+
+    The rows are copied into a partitioned table, which then replaces the old one
+    while writes to messages are blocked; reads continue. Run in one transaction.
+    """
+    return [
+        "LOCK TABLE messages IN EXCLUSIVE MODE",
+        # The partition key must be part of the primary key, so created_at becomes NOT NULL
+        "CREATE TABLE messages_partitioned (LIKE messages INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)",
+        "ALTER TABLE messages_partitioned ADD CONSTRAINT messages_partitioned_pkey PRIMARY KEY (id, created_at)",
+        month_partitions_sql("messages_partitioned", months_ahead, from_table="messages"),
+        "CREATE TABLE messages_partitioned_default PARTITION OF messages_partitioned DEFAULT",
+        f"INSERT INTO messages_partitioned ({MESSAGE_COLUMNS}) "
+        "SELECT id, conversation_id, role, content, agent_metadata, coalesce(created_at, now()) FROM messages",
+        "DROP TABLE messages",
+        "ALTER TABLE messages_partitioned RENAME TO messages",
+        "ALTER TABLE messages RENAME CONSTRAINT messages_partitioned_pkey TO messages_pkey",
+        "ALTER TABLE messages_partitioned_default RENAME TO messages_default",
+        _RENAME_STAGED_PARTITIONS,
+        *_MESSAGE_INDEXES,
+    ]
+
+
+def unpartition_messages_statements() -> List[str]:
+    """SQL turning a partitioned `messages` table back into a plain one."""
+    return [
+        "LOCK TABLE messages IN EXCLUSIVE MODE",
+        "CREATE TABLE messages_unpartitioned (LIKE messages INCLUDING DEFAULTS)",
+        f"INSERT INTO messages_unpartitioned ({MESSAGE_COLUMNS}) SELECT {MESSAGE_COLUMNS} FROM messages",
+        # Dropping the parent drops every partition
+        "DROP TABLE messages",
+        "ALTER TABLE messages_unpartitioned RENAME TO messages",
+        "ALTER TABLE messages ALTER COLUMN created_at DROP NOT NULL",
+        "ALTER TABLE messages ADD CONSTRAINT messages_pkey PRIMARY KEY (id)",
+        *_MESSAGE_INDEXES,
+    ]
+
+
+async def _is_partitioned(conn) -> bool:
+    return (await conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('messages'))"
+    ))).scalar()
+
+
+async def partition_messages(db, months_ahead: int = 3) -> bool:
+    """Partition `messages` by month unless it already is; returns whether it was converted.
+
+    This is the same conversion as `alembic -x partition_messages=true upgrade`,
+    for databases that applied that revision without the flag. It is a no-op on
+    other dialects.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return False
+    async with db.engine.begin() as conn:
+        if await _is_partitioned(conn):
+            return False
+        for statement in partition_messages_statements(months_ahead):
+            await conn.execute(text(statement))
+    logger.info("Partitioned the messages table by month")
+    return True
+
+
+async def ensure_message_partitions(db, months_ahead: int = 3) -> bool:
+    """Create upcoming monthly partitions if `messages` is partitioned; returns whether it is.
+
+    Rows for months without a partition land in `messages_default`. A month must
+    get its partition before such rows arrive, so call this at least monthly
+    (init_database does so on startup).
+    """
+    if db.engine.dialect.name != "postgresql":
+        return False
+    async with db.engine.begin() as conn:
+        if not await _is_partitioned(conn):
+            return False
+        try:
+            async with conn.begin_nested():
+                await conn.execute(text(month_partitions_sql("messages", months_ahead)))
+        except Exception as e:
+            # Typically rows for that month already sit in the default partition
+            logger.warning(f"Failed to create message partitions: {e}")
+    return True
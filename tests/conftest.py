@@ -0,0 +1,154 @@
+"""Shared fixtures for the test suite."""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from contextlib import asynccontextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+class _GroqStubHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a fixed OpenAI-style chat completion over keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests += 1
+        body = json.dumps({
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "stub-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "stub reply"},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7}
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def groq_stub():
+    """A local HTTP server standing in for the Groq API; yields its base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GroqStubHandler)
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class SQLiteDatabase:
+    """Stands in for DatabaseManager with an SQLite file, using the models' String uuid variant.
+
+    Connections are not pooled, so each test's asyncio.run gets fresh ones.
+    Foreign keys are enforced as they are on PostgreSQL.
+    """
+
+    def __init__(self, path: str):
+        from sqlalchemy import create_engine, event
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import NullPool
+
+        from microsoft_agent_framework.database.models import AgentContext, Base
+
+        # agent_contexts needs PostgreSQL full-text search; every other table is portable
+        tables = [table for table in Base.metadata.sorted_tables if table is not AgentContext.__table__]
+        schema_engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(schema_engine, tables=tables)
+        schema_engine.dispose()
+
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+        event.listen(self.engine.sync_engine, "connect", _enable_foreign_keys)
+        self.async_session = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def get_session(self):
+        """Commit on success and roll back on error, like DatabaseManager.get_session."""
+        async with self.async_session() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """An SQLiteDatabase with every table except agent_contexts created."""
+    pytest.importorskip("aiosqlite")
+    return SQLiteDatabase(str(tmp_path / "agents.db"))
+
+
+class PostgresDatabase:
+    """Stands in for DatabaseManager against the server named by TEST_DATABASE_URL.
+
+    Only the agent_contexts table is created (if missing); connections are not
+    pooled, so each test's asyncio.run gets fresh ones.
+    """
+
+    def __init__(self, url: str):
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import NullPool
+
+        if url.startswith("postgres://"):
+            url = url.replace("postgres://", "postgresql+asyncpg://", 1)
+        elif url.startswith("postgresql://"):
+            url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        self.engine = create_async_engine(url, poolclass=NullPool)
+        self.async_session = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def create_contexts_table(self):
+        from microsoft_agent_framework.database.models import AgentContext
+
+        async with self.engine.begin() as conn:
+            await conn.run_sync(AgentContext.__table__.create, checkfirst=True)
+
+    @asynccontextmanager
+    async def get_session(self):
+        """Commit on success and roll back on error, like DatabaseManager.get_session."""
+        async with self.async_session() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+
+@pytest.fixture
+def postgres_db():
+    """A PostgresDatabase, or a skip when TEST_DATABASE_URL is not set."""
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    pytest.importorskip("asyncpg")
+    db = PostgresDatabase(url)
+    asyncio.run(db.create_contexts_table())
+    return db
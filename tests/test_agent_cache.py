@@ -0,0 +1,161 @@
+"""Tests for the live agent instance cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+from microsoft_agent_framework.core.agent_cache import AgentInstanceCache
+from microsoft_agent_framework.core.agent_thread import AgentThread
+from microsoft_agent_framework.core.context_provider import InMemoryContextProvider
+
+
+class FakeAgent:
+    """Just enough of BaseAgent for the cache to size, flush and close it."""
+
+    def __init__(self, name: str, size: int = 0):
+        self.config = SimpleNamespace(name=name)
+        self.thread = AgentThread()
+        self.thread.add_user_message("x" * size)
+        self.context_provider = None
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def factory_for(name: str, size: int = 0, version=1):
+    async def factory():
+        return FakeAgent(name, size), version
+    return factory
+
+
+async def use(cache: AgentInstanceCache, conversation_id: str, factory):
+    """Look an agent up and release it at once, like a finished turn."""
+    entry = await cache.get_or_create("ops", conversation_id, factory)
+    cache.release(entry)
+    return entry
+
+
+def test_concurrent_misses_share_one_factory_call():
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return FakeAgent("ops"), 1
+
+    async def scenario():
+        cache = AgentInstanceCache()
+        first, second = await asyncio.gather(
+            cache.get_or_create("ops", "c1", factory), cache.get_or_create("ops", "c1", factory)
+        )
+        assert first is second
+        assert await cache.get_or_create("ops", "c1", factory) is first
+        return cache.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert calls == [1] and stats["misses"] == 1 and stats["hits"] == 1
+
+
+def test_least_recently_used_agent_is_evicted_and_closed():
+    async def scenario():
+        cache = AgentInstanceCache(max_agents=2)
+        first = await use(cache, "c1", factory_for("one"))
+        second = await use(cache, "c2", factory_for("two"))
+        await use(cache, "c1", factory_for("one"))
+        await use(cache, "c3", factory_for("three"))
+        await cache.close()
+        return first, second, cache
+
+    first, second, cache = asyncio.run(scenario())
+    assert second.agent.closed and first.agent.closed
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_agents_mid_turn_are_not_evicted():
+    async def scenario():
+        cache = AgentInstanceCache(max_agents=1, max_bytes=100)
+        busy = await cache.get_or_create("ops", "c1", factory_for("busy", size=80))
+        async with busy.lock:
+            idle = await use(cache, "c2", factory_for("idle", size=10))
+            # The busy agent is spared, so the cache overshoots its limit
+            assert len(cache) == 2 and not busy.agent.closed
+            await use(cache, "c3", factory_for("new", size=10))
+            assert ("ops", "c1") in cache._entries and ("ops", "c2") not in cache._entries
+        cache.release(busy)
+        # The turn is over: the busy agent is now the most recent, the newcomer goes
+        assert list(cache._entries) == [("ops", "c1")]
+        await cache.close()
+        return idle
+
+    idle = asyncio.run(scenario())
+    assert idle.agent.closed
+
+
+def test_changed_version_invalidates_every_instance_of_the_agent():
+    async def scenario():
+        cache = AgentInstanceCache(revalidate_after=0)
+        version = {"ops": 1}
+
+        async def current():
+            return version["ops"]
+
+        first = await cache.get_or_create("ops", "c1", factory_for("one"), current)
+        await cache.get_or_create("ops", "c2", factory_for("two"), current)
+        assert await cache.get_or_create("ops", "c1", factory_for("one"), current) is first
+
+        version["ops"] = 2
+        fresh = await cache.get_or_create("ops", "c1", factory_for("one", version=2), current)
+        assert fresh is not first and len(cache) == 1
+        await cache.close()
+        return cache.get_stats()
+
+    assert asyncio.run(scenario())["invalidations"] == 2
+
+
+def test_entries_stay_pinned_until_released():
+    async def scenario():
+        cache = AgentInstanceCache(max_agents=1)
+        # Looked up, but the caller has not taken the lock yet
+        pinned = await cache.get_or_create("ops", "c1", factory_for("pinned"))
+        await use(cache, "c2", factory_for("other"))
+        await use(cache, "c3", factory_for("third"))
+        assert ("ops", "c1") in cache._entries and not pinned.agent.closed
+        # Two callers share the entry; it stays pinned until both are done
+        again = await cache.get_or_create("ops", "c1", factory_for("pinned"))
+        cache.release(pinned)
+        await use(cache, "c4", factory_for("fourth"))
+        assert ("ops", "c1") in cache._entries
+        cache.release(again)
+        await use(cache, "c5", factory_for("fifth"))
+        await cache.close()
+        return pinned, cache
+
+    pinned, cache = asyncio.run(scenario())
+    assert pinned.agent.closed and pinned.pins == 0
+
+
+def test_size_is_tracked_incrementally():
+    walked = []
+
+    async def scenario():
+        cache = AgentInstanceCache()
+        entry = await cache.get_or_create("ops", "c1", factory_for("sized", size=10))
+        thread = entry.agent.thread
+        iterate = thread._iter_role_content
+        thread._iter_role_content = lambda start: walked.append(start) or iterate(start)
+        entry.agent.context_provider = InMemoryContextProvider()
+
+        thread.add_assistant_message("y" * 5)
+        await entry.agent.context_provider.add_context("z" * 7)
+        cache.release(entry)
+        assert entry.size == 22 and cache.get_stats()["estimated_bytes"] == 22
+
+        thread.clear_messages()
+        thread.add_user_message("w" * 3)
+        await use(cache, "c1", factory_for("sized"))
+        await cache.close()
+        return entry
+
+    entry = asyncio.run(scenario())
+    # Only the new message was walked, until clear_messages() forced a recount
+    assert walked == [1, 0] and entry.size == 10
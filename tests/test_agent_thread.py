@@ -0,0 +1,69 @@
+"""Tests for the agent thread's incrementally synced wire buffer."""
+
+from microsoft_agent_framework.core.agent_thread import SUMMARY_PREFIX, AgentThread, ThreadMessage
+from microsoft_agent_framework.core.groq_client import to_wire_messages
+
+
+def make_thread(*contents: str) -> AgentThread:
+    thread = AgentThread()
+    thread.add_system_message("be brief")
+    for i, content in enumerate(contents):
+        if i % 2 == 0:
+            thread.add_user_message(content)
+        else:
+            thread.add_assistant_message(content)
+    return thread
+
+
+def test_appended_messages_are_converted_once():
+    thread = make_thread("hi", "hello")
+    first = thread.get_wire_messages()
+    thread.add_user_message("how are you?")
+    second = thread.get_wire_messages()
+    assert second == thread.get_conversation_history()
+    # Earlier dicts are reused rather than rebuilt
+    assert all(a is b for a, b in zip(first, second)) and len(second) == 4
+
+
+def test_buffer_is_rebuilt_after_clear_and_generation_change():
+    thread = make_thread("hi", "hello")
+    thread.get_wire_messages()
+    thread.clear_messages()
+    thread.add_user_message("fresh start")
+    assert thread.get_wire_messages() == [{"role": "user", "content": "fresh start"}]
+
+    stale = thread.get_wire_messages()[0]
+    thread.generation += 1
+    assert thread.get_wire_messages()[0] is not stale
+
+
+def test_in_place_changes_invalidate_the_buffer():
+    thread = make_thread("hi", "hello")
+    thread.get_wire_messages()
+    thread.messages[2] = ThreadMessage.create_assistant_message("bonjour")
+    assert thread.get_wire_messages() == thread.get_conversation_history()
+    assert thread.get_wire_messages()[2]["content"] == "bonjour"
+
+    thread.messages.pop(1)
+    thread.messages.append(ThreadMessage.create_user_message("again"))
+    assert thread.get_wire_messages() == thread.get_conversation_history()
+
+    thread.messages = [ThreadMessage.create_user_message("a"), ThreadMessage.create_user_message("b")]
+    assert [m["content"] for m in thread.get_wire_messages()] == ["a", "b"]
+
+
+def test_summary_is_spliced_after_leading_system_messages():
+    thread = make_thread("one", "two", "three", "four")
+    thread.set_summary("talked about numbers", until=3)
+    wire = thread.get_wire_messages()
+    assert wire == thread.get_conversation_history()
+    assert [m["content"] for m in wire] == [
+        "be brief", f"{SUMMARY_PREFIX}talked about numbers", "three", "four"
+    ]
+
+
+def test_wire_dicts_pass_through_untouched():
+    wire = {"role": "user", "content": "hi"}
+    converted = to_wire_messages([wire, ThreadMessage.create_assistant_message("hello")])
+    assert converted[0] is wire
+    assert converted[1] == {"role": "assistant", "content": "hello"}
@@ -0,0 +1,69 @@
+"""Tests for the memoizing context provider wrapper."""
+
+import asyncio
+
+from microsoft_agent_framework.core.cached_context import CachedContextProvider, normalize_query
+from microsoft_agent_framework.core.context_provider import EvictionPolicy, InMemoryContextProvider
+
+
+def test_equivalent_queries_share_an_entry():
+    assert normalize_query("The Kubernetes, deployment!") == normalize_query("kubernetes   deployment")
+
+    async def scenario():
+        cached = CachedContextProvider(InMemoryContextProvider())
+        await cached.add_context("kubernetes deployment guide")
+        first = await cached.get_context("Kubernetes deployment?")
+        second = await cached.get_context("the kubernetes deployment")
+        assert first == second and len(first) == 1
+        # Callers get copies, never the cached result objects
+        second[0]["content"] = "mutated"
+        assert (await cached.get_context("kubernetes deployment"))[0]["content"] == "kubernetes deployment guide"
+        return cached.get_cache_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["entries"] == 1
+
+
+def test_writes_invalidate_cached_results():
+    async def scenario():
+        cached = CachedContextProvider(InMemoryContextProvider())
+        first = await cached.add_context("kubernetes pods")
+        assert len(await cached.get_context("kubernetes")) == 1
+        second = await cached.add_context("kubernetes services")
+        assert {r["id"] for r in await cached.get_context("kubernetes")} == {first, second}
+        await cached.delete_context(first)
+        assert [r["id"] for r in await cached.get_context("kubernetes")] == [second]
+        return cached.get_cache_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["hits"] == 0 and stats["stale"] == 2
+
+
+def test_max_entries_bounds_the_cache():
+    async def scenario():
+        cached = CachedContextProvider(InMemoryContextProvider(), max_entries=2)
+        await cached.add_context("alpha beta gamma")
+        for query in ("alpha", "beta", "gamma"):
+            await cached.get_context(query)
+        assert [key[0] for key in cached._cache] == ["beta", "gamma"]
+
+    asyncio.run(scenario())
+
+
+def test_cache_hits_refresh_lru_recency_of_the_wrapped_provider():
+    async def scenario():
+        provider = InMemoryContextProvider(eviction_policy=EvictionPolicy(max_entries=2))
+        cached = CachedContextProvider(provider)
+        first = await cached.add_context("alpha kubernetes")
+        second = await cached.add_context("beta weather")
+
+        await cached.get_context("kubernetes")
+        await cached.get_context("weather")
+        # Served from the cache, but still a retrieval of `first`
+        await cached.get_context("kubernetes")
+        assert cached.get_cache_stats()["hits"] == 1
+        await cached.add_context("gamma python")
+
+        assert first in provider.contexts and second not in provider.contexts
+
+    asyncio.run(scenario())
@@ -0,0 +1,125 @@
+"""Tests for the slotted, role-indexed thread store."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from microsoft_agent_framework.core import compact_thread
+from microsoft_agent_framework.core.agent_cache import estimate_agent_size
+from microsoft_agent_framework.core.agent_thread import SUMMARY_PREFIX, AgentThread
+from microsoft_agent_framework.core.compact_thread import CompactAgentThread, MessageRecord
+from microsoft_agent_framework.core.compaction import ThreadCompactor
+from microsoft_agent_framework.database.history import thread_summary_state
+
+
+def fill(thread: AgentThread, turns: int = 3, interleave: bool = False) -> AgentThread:
+    thread.add_system_message("You are helpful.")
+    for i in range(turns):
+        thread.add_user_message(f"question {i}", {"turn": i})
+        thread.add_assistant_message(f"answer {i}")
+        if interleave and i == 1:
+            thread.add_system_message("Mid-conversation note.")
+    return thread
+
+
+@pytest.mark.parametrize("interleave", [False, True])
+def test_matches_agent_thread_views(interleave):
+    plain = fill(AgentThread(), interleave=interleave)
+    compact = fill(CompactAgentThread(), interleave=interleave)
+
+    assert compact.get_conversation_history() == plain.get_conversation_history()
+    assert compact.get_conversation_history(include_system=False) == plain.get_conversation_history(include_system=False)
+    assert compact.get_wire_messages() == plain.get_wire_messages()
+    for role in ("user", "assistant", "system", "tool"):
+        assert [m.content for m in compact.get_messages(role=role)] == [m.content for m in plain.get_messages(role=role)]
+    assert [m.content for m in compact.get_messages(role="user", limit=2)] == ["question 1", "question 2"]
+    assert [m.content for m in compact.get_messages(limit=2)] == ["question 2", "answer 2"]
+    assert compact.get_last_message(role="user").content == "question 2"
+    assert compact.get_last_message(role="tool") is None
+
+    plain.set_summary("earlier turns", 3)
+    compact.set_summary("earlier turns", 3)
+    history = compact.get_conversation_history()
+    assert history == plain.get_conversation_history()
+    assert {"role": "system", "content": f"{SUMMARY_PREFIX}earlier turns"} in history
+    assert compact.get_wire_messages() == plain.get_wire_messages()
+
+
+def test_role_index_counts_and_slices():
+    thread = fill(CompactAgentThread(), turns=5)
+    assert thread.count_messages() == 11
+    assert thread.count_messages(role="user") == 5
+    assert thread.count_messages(role="tool") == 0
+    assert [m.content for m in thread.messages_since(7, role="user")] == ["question 3", "question 4"]
+    assert [m.content for m in thread.messages_since(9)] == ["question 4", "answer 4"]
+
+
+def test_records_materialize_stable_messages():
+    thread = CompactAgentThread()
+    added = thread.add_user_message("hello", {"source": "test"})
+    assert thread.messages[0].id == added.id
+    assert thread.messages[0].id == thread.messages[0].id
+    assert thread.messages[0].metadata == {"source": "test"}
+    assert len(thread.messages) == 1
+
+    thread.messages.append(thread.messages[0])
+    assert [m.content for m in thread.messages] == ["hello", "hello"]
+
+
+def test_clear_resets_records_index_and_wire_buffer():
+    thread = fill(CompactAgentThread())
+    thread.get_wire_messages()
+    generation = thread.generation
+
+    thread.clear_messages()
+    assert thread.generation == generation + 1
+    assert thread.count_messages() == 0
+    assert thread.get_messages(role="user") == []
+
+    thread.add_user_message("fresh start")
+    assert thread.get_wire_messages() == [{"role": "user", "content": "fresh start"}]
+
+
+def test_dict_round_trip_preserves_messages_and_summary():
+    thread = fill(CompactAgentThread())
+    thread.set_summary("earlier turns", 3)
+    restored = CompactAgentThread.from_dict(thread.to_dict())
+
+    assert isinstance(restored, CompactAgentThread)
+    assert [m.id for m in restored.messages] == [m.id for m in thread.messages]
+    assert restored.get_conversation_history() == thread.get_conversation_history()
+    assert restored.count_messages(role="assistant") == 3
+
+
+def test_per_turn_callers_never_materialize_messages(monkeypatch):
+    thread = fill(CompactAgentThread(), turns=10)
+    records = list(thread._records)
+
+    def forbidden(record):
+        raise AssertionError("ThreadMessage materialized")
+
+    monkeypatch.setattr(MessageRecord, "to_message", forbidden)
+    thread.add_user_message("one more")
+
+    async def summarize(messages, **kwargs):
+        return SimpleNamespace(content="summary")
+
+    compactor = ThreadCompactor(SimpleNamespace(async_chat_completion=summarize), max_messages=8, keep_recent=4)
+    assert compactor.needs_compaction(thread)
+    assert asyncio.run(compactor.compact(thread))
+    assert thread.summary_until == 18
+    assert thread_summary_state(thread)["summary_count"] == 17
+    assert estimate_agent_size(SimpleNamespace(thread=thread, context_provider=None)) > 0
+    assert len(thread.get_wire_messages()) == 6
+    # Nothing read the ids, so none were generated
+    assert all(record._id is None for record in records)
+    assert thread._wire == []
+
+
+def test_registered_roles_are_visible_to_importers():
+    roles = compact_thread.ROLES
+    thread = CompactAgentThread()
+    thread.add_message(thread.add_user_message("hi").to_message().model_copy(update={"role": "function"}))
+    assert roles is compact_thread.ROLES and roles[-1] == "function"
+    assert thread.get_conversation_history()[-1] == {"role": "function", "content": "hi"}
@@ -0,0 +1,96 @@
+"""Tests for rolling summarization of agent threads."""
+
+import asyncio
+from types import SimpleNamespace
+
+from microsoft_agent_framework.core.agent_thread import SUMMARY_PREFIX, AgentThread
+from microsoft_agent_framework.core.compaction import ThreadCompactor
+
+
+class SummaryClient:
+    """Fake Groq client that summarizes after an optional delay."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.transcripts = []
+
+    async def async_chat_completion(self, messages, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.transcripts.append(messages[-1].content)
+        return SimpleNamespace(content=f"summary #{len(self.transcripts)}")
+
+
+def make_thread(turns: int) -> AgentThread:
+    thread = AgentThread()
+    thread.add_system_message("You are helpful.")
+    for i in range(turns):
+        thread.add_user_message(f"question {i}")
+        thread.add_assistant_message(f"answer {i}")
+    return thread
+
+
+def test_compaction_keeps_recent_messages_verbatim():
+    thread = make_thread(10)
+    compactor = ThreadCompactor(SummaryClient(), max_messages=8, keep_recent=4)
+    assert compactor.needs_compaction(thread)
+
+    assert asyncio.run(compactor.compact(thread))
+    assert thread.summary == "summary #1"
+    assert not compactor.needs_compaction(thread)
+
+    history = thread.get_conversation_history()
+    assert history[0] == {"role": "system", "content": "You are helpful."}
+    assert history[1] == {"role": "system", "content": f"{SUMMARY_PREFIX}summary #1"}
+    assert [msg["content"] for msg in history[2:]] == ["question 8", "answer 8", "question 9", "answer 9"]
+    assert thread.get_wire_messages() == history
+    # Raw messages stay in the thread
+    assert len(thread.get_conversation_history(include_compacted=True)) == 21
+
+
+def test_second_compaction_folds_only_new_messages():
+    thread = make_thread(10)
+    client = SummaryClient()
+    compactor = ThreadCompactor(client, max_messages=8, keep_recent=4)
+    asyncio.run(compactor.compact(thread))
+
+    for i in range(10, 14):
+        thread.add_user_message(f"question {i}")
+        thread.add_assistant_message(f"answer {i}")
+    assert compactor.needs_compaction(thread)
+    asyncio.run(compactor.compact(thread))
+
+    second = client.transcripts[1]
+    assert second.startswith("Earlier summary:\nsummary #1")
+    assert "question 7" not in second and "question 8" in second and "question 12" not in second
+
+
+def test_schedule_runs_in_background_once_per_thread():
+    thread = make_thread(10)
+    client = SummaryClient(delay=0.05)
+    compactor = ThreadCompactor(client, max_messages=8, keep_recent=4)
+
+    async def scenario():
+        first = compactor.schedule(thread)
+        assert first is not None
+        assert compactor.schedule(thread) is None
+        assert thread.summary is None
+        await compactor.wait()
+
+    asyncio.run(scenario())
+    assert len(client.transcripts) == 1
+    assert thread.summary == "summary #1"
+
+
+def test_summary_is_discarded_if_thread_is_cleared_meanwhile():
+    thread = make_thread(10)
+    compactor = ThreadCompactor(SummaryClient(delay=0.05), max_messages=8, keep_recent=4)
+
+    async def scenario():
+        compactor.schedule(thread)
+        await asyncio.sleep(0.01)
+        thread.clear_messages()
+        await compactor.wait()
+
+    asyncio.run(scenario())
+    assert thread.summary is None
+    assert thread.summary_until == 0
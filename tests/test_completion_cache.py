@@ -0,0 +1,163 @@
+"""Tests for the exact-match completion cache backends."""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from microsoft_agent_framework.core.completion_cache import (
+    FileCompletionCache,
+    InMemoryCompletionCache,
+    SQLiteCompletionCache,
+    create_completion_cache,
+    make_cache_key,
+)
+from microsoft_agent_framework.core.groq_client import GroqClient, GroqConfig
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+VALUE = {"content": "hello", "model": "m", "usage": {}, "finish_reason": "stop"}
+
+
+def make_backend(name, tmp_path, ttl=3600.0):
+    if name == "memory":
+        return InMemoryCompletionCache(ttl=ttl)
+    if name == "file":
+        return FileCompletionCache(str(tmp_path / "completions"), ttl=ttl)
+    return SQLiteCompletionCache(str(tmp_path / "completions.db"), ttl=ttl)
+
+
+def test_cache_key_depends_on_every_request_field():
+    key = make_cache_key("m", MESSAGES, 0.0, 100)
+    assert key == make_cache_key("m", [dict(reversed(list(MESSAGES[0].items())))], 0.0, 100)
+    assert key != make_cache_key("other", MESSAGES, 0.0, 100)
+    assert key != make_cache_key("m", MESSAGES, 0.1, 100)
+    assert key != make_cache_key("m", MESSAGES, 0.0, 200)
+    assert key != make_cache_key("m", MESSAGES, 0.0, 100, tools=[{"type": "function"}])
+
+
+@pytest.mark.parametrize("backend", ["memory", "file", "sqlite"])
+def test_backend_round_trip_and_clear(backend, tmp_path):
+    cache = make_backend(backend, tmp_path)
+
+    async def scenario():
+        assert await cache.get("k") is None
+        await cache.set("k", VALUE)
+        assert await cache.get("k") == VALUE
+        await cache.clear()
+        assert await cache.get("k") is None
+
+    asyncio.run(scenario())
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    if backend == "sqlite":
+        cache.close()
+
+
+@pytest.mark.parametrize("backend", ["memory", "file", "sqlite"])
+def test_backend_expires_entries(backend, tmp_path):
+    cache = make_backend(backend, tmp_path, ttl=0.05)
+
+    async def scenario():
+        await cache.set("k", VALUE)
+        assert await cache.get("k") == VALUE
+        await asyncio.sleep(0.1)
+        assert await cache.get("k") is None
+
+    asyncio.run(scenario())
+    if backend == "sqlite":
+        cache.close()
+
+
+def test_memory_backend_evicts_least_recently_used():
+    cache = InMemoryCompletionCache(max_entries=2)
+
+    async def scenario():
+        await cache.set("a", VALUE)
+        await cache.set("b", VALUE)
+        await cache.get("a")
+        await cache.set("c", VALUE)
+        return [await cache.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [True, False, True]
+
+
+def test_sqlite_backend_caps_entries(tmp_path):
+    cache = SQLiteCompletionCache(str(tmp_path / "completions.db"), max_entries=2)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await cache.set(key, VALUE)
+            time.sleep(0.01)
+        return [await cache.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [False, True, True]
+    cache.close()
+
+
+def test_sqlite_backend_is_usable_from_successive_event_loops(tmp_path):
+    cache = SQLiteCompletionCache(str(tmp_path / "completions.db"))
+
+    async def contend(prefix):
+        await asyncio.gather(*(cache.set(f"{prefix}{i}", VALUE) for i in range(5)))
+        return await asyncio.gather(*(cache.get(f"{prefix}{i}") for i in range(5)))
+
+    assert asyncio.run(contend("a")) == [VALUE] * 5
+    assert asyncio.run(contend("b")) == [VALUE] * 5
+    cache.close()
+
+
+def test_file_backend_evicts_least_recently_used_files(tmp_path):
+    cache = FileCompletionCache(str(tmp_path / "completions"), max_entries=10)
+
+    async def scenario():
+        for i in range(10):
+            await cache.set(f"k{i}", VALUE)
+            time.sleep(0.01)
+        await cache.get("k0")
+        await cache.set("k10", VALUE)
+        return [await cache.get(f"k{i}") is not None for i in range(11)]
+
+    kept = asyncio.run(scenario())
+    # Over the cap, files are deleted down to 90% of it, least recently used first
+    assert kept == [True, False, False] + [True] * 8
+    assert cache.get_stats()["entries"] == 9
+    assert FileCompletionCache(str(tmp_path / "completions")).get_stats()["entries"] == 9
+
+
+def test_file_backend_concurrent_writes_of_one_key(tmp_path):
+    cache = FileCompletionCache(str(tmp_path / "completions"))
+
+    async def scenario():
+        await asyncio.gather(*(cache.set("k", {**VALUE, "content": str(i)}) for i in range(20)))
+        return await cache.get("k")
+
+    assert asyncio.run(scenario())["content"] in {str(i) for i in range(20)}
+    assert [path.name for path in (tmp_path / "completions").iterdir()] == ["k.json"]
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_completion_cache("redis")
+
+
+def test_client_serves_repeated_low_temperature_calls_from_cache(groq_stub):
+    server, base_url = groq_stub
+    client = GroqClient(
+        GroqConfig(api_key=f"test-{uuid.uuid4()}", base_url=base_url, retry_attempts=1),
+        cache=InMemoryCompletionCache()
+    )
+
+    async def ask(temperature):
+        response = await client.async_chat_completion(MESSAGES, temperature=temperature)
+        return response.content
+
+    assert asyncio.run(ask(0.0)) == "stub reply"
+    assert asyncio.run(ask(0.0)) == "stub reply"
+    assert server.requests == 1
+    # Above cache_max_temperature the response is never reused
+    asyncio.run(ask(0.9))
+    asyncio.run(ask(0.9))
+    assert server.requests == 3
+    assert client.get_cache_stats()["hits"] == 1
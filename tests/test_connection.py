@@ -0,0 +1,85 @@
+"""Tests for database pool configuration and telemetry."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from microsoft_agent_framework.database.connection import DatabaseConfig, DatabaseManager, PoolTelemetry
+
+
+def sqlite_manager(path: str, config: DatabaseConfig) -> DatabaseManager:
+    """A DatabaseManager whose engine is SQLite instead of asyncpg, with its pool events installed."""
+    pytest.importorskip("aiosqlite")
+    manager = DatabaseManager.__new__(DatabaseManager)
+    manager.config = config
+    manager.engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=config.pool_size)
+    manager.async_session = async_sessionmaker(manager.engine, class_=AsyncSession, expire_on_commit=False)
+    manager.telemetry = PoolTelemetry()
+    manager._install_pool_events()
+    return manager
+
+
+def test_config_is_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_PRE_PING", "always")
+    monkeypatch.setenv("DB_STATEMENT_CACHE_SIZE", "0")
+    monkeypatch.setenv("DB_ECHO", "yes")
+    config = DatabaseConfig.from_env()
+    assert config.pool_size == 20 and config.pre_ping == "always"
+    assert config.statement_cache_size == 0 and config.echo
+    assert config.max_overflow == 10 and config.pool_timeout == 30.0
+
+
+def test_manager_rejects_unknown_pre_ping_policy():
+    with pytest.raises(ValueError):
+        DatabaseManager("postgresql+asyncpg://u:p@localhost/db", DatabaseConfig(pre_ping="sometimes"))
+
+
+def test_telemetry_summarizes_recent_waits():
+    telemetry = PoolTelemetry(window=4)
+    for seconds in (0.5, 0.1, 0.2, 0.3, 0.4):
+        telemetry.record_wait(seconds)
+    wait = telemetry.snapshot()["wait"]
+    assert wait["count"] == 5 and wait["max"] == 0.5
+    assert wait["avg"] == pytest.approx(0.3)
+    # Percentiles cover only the last `window` waits
+    assert wait["p50"] == 0.3 and wait["p95"] == 0.4
+
+
+def test_sessions_are_counted_and_idle_connections_pinged(tmp_path):
+    manager = sqlite_manager(str(tmp_path / "pool.db"), DatabaseConfig(pool_size=2, pre_ping_idle_seconds=0))
+
+    async def scenario():
+        for _ in range(3):
+            async with manager.get_session() as session:
+                assert (await session.execute(text("SELECT 1"))).scalar_one() == 1
+        with pytest.raises(RuntimeError):
+            async with manager.get_session():
+                raise RuntimeError("rolled back")
+        stats = manager.get_pool_stats()
+        await manager.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["connects"] == 1 and stats["checkouts"] == 4 and stats["checkins"] == 4
+    # With no idle threshold every checkout pays for a ping
+    assert stats["pings"] == 4 and stats["ping_failures"] == 0
+    assert stats["peak_checked_out"] == 1 and stats["checked_out"] == 0
+    assert stats["wait"]["count"] == 4 and stats["pool_size"] == 2
+
+
+def test_recently_used_connections_skip_the_ping(tmp_path):
+    manager = sqlite_manager(str(tmp_path / "pool.db"), DatabaseConfig(pre_ping_idle_seconds=60))
+
+    async def scenario():
+        for _ in range(3):
+            async with manager.get_session() as session:
+                await session.execute(text("SELECT 1"))
+        stats = manager.get_pool_stats()
+        await manager.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats["checkouts"] == 3 and stats["pings"] == 0
@@ -0,0 +1,100 @@
+"""Tests for bounded context provider memory (LRU, TTL and size limits)."""
+
+import asyncio
+import time
+
+import pytest
+
+from microsoft_agent_framework.core.context_provider import (
+    EvictionPolicy,
+    FileContextProvider,
+    InMemoryContextProvider,
+)
+from microsoft_agent_framework.core.vector_context import VectorContextProvider
+
+
+def ids_of(results):
+    return [result["id"] for result in results]
+
+
+@pytest.mark.parametrize("provider_class", [InMemoryContextProvider, VectorContextProvider])
+def test_max_entries_evicts_the_least_recently_used(provider_class):
+    async def scenario():
+        provider = provider_class(eviction_policy=EvictionPolicy(max_entries=3))
+        first = await provider.add_context("alpha kubernetes")
+        second = await provider.add_context("beta weather")
+        await provider.add_context("gamma python")
+
+        # Retrieving the first entry makes the second the least recently used
+        assert first in ids_of(await provider.get_context("kubernetes"))
+        await provider.add_context("delta rust")
+
+        assert second not in provider.contexts and first in provider.contexts
+        assert await provider.get_context("weather") == []
+        stats = provider.get_eviction_stats()
+        assert stats["entries"] == 3 and stats["evicted"] == 1
+        assert stats["evicted_by_reason"]["max_entries"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_without_lru_entries_age_from_their_last_write():
+    async def scenario():
+        provider = InMemoryContextProvider(eviction_policy=EvictionPolicy(max_entries=2, lru=False))
+        first = await provider.add_context("alpha kubernetes")
+        second = await provider.add_context("beta weather")
+        await provider.get_context("kubernetes")
+        await provider.update_context(first, "alpha kubernetes updated")
+        await provider.add_context("gamma python")
+        assert first in provider.contexts and second not in provider.contexts
+
+    asyncio.run(scenario())
+
+
+def test_max_bytes_counts_encoded_content():
+    async def scenario():
+        provider = InMemoryContextProvider(eviction_policy=EvictionPolicy(max_bytes=10))
+        first = await provider.add_context("ééé")  # 6 bytes
+        await provider.add_context("abcd")
+        assert provider.get_eviction_stats()["bytes"] == 10 and first in provider.contexts
+        await provider.add_context("x")
+        assert first not in provider.contexts
+        stats = provider.get_eviction_stats()
+        assert stats["bytes"] == 5 and stats["evicted_bytes"] == 6
+
+    asyncio.run(scenario())
+
+
+def test_expired_entries_are_never_returned():
+    async def scenario():
+        provider = InMemoryContextProvider(eviction_policy=EvictionPolicy(ttl=0.05))
+        context_id = await provider.add_context("kubernetes deployment")
+        assert ids_of(await provider.get_context("kubernetes")) == [context_id]
+        time.sleep(0.06)
+        assert await provider.get_context("kubernetes") == []
+        assert context_id not in provider.contexts
+        assert provider.get_eviction_stats()["evicted_by_reason"]["ttl"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_file_provider_evictions_are_persisted(tmp_path):
+    path = str(tmp_path / "contexts.jsonl")
+
+    async def scenario():
+        provider = FileContextProvider(path, eviction_policy=EvictionPolicy(max_entries=2))
+        for i in range(4):
+            await provider.add_context(f"entry {i}")
+        await provider.close()
+        return sorted(provider.contexts)
+
+    kept = asyncio.run(scenario())
+    assert kept == ["ctx_3", "ctx_4"]
+    assert sorted(FileContextProvider(path).contexts) == kept
+
+
+def test_no_policy_means_no_tracking():
+    provider = InMemoryContextProvider()
+    asyncio.run(provider.add_context("anything"))
+    assert provider.get_eviction_stats() is None
+    assert not provider._recency
@@ -0,0 +1,154 @@
+"""Tests for the append-only JSONL context log."""
+
+import asyncio
+import json
+import os
+import time
+
+from microsoft_agent_framework.core.context_provider import FileContextProvider
+
+
+def read_records(path):
+    with open(path, "rb") as f:
+        return [json.loads(line) for line in f]
+
+
+def assert_offsets_match_log(provider: FileContextProvider):
+    with open(provider.file_path, "rb") as f:
+        data = f.read()
+    assert provider.get_log_stats()["log_bytes"] == len(data)
+    assert set(provider._offsets) == set(provider.contexts)
+    for context_id, (offset, length) in provider._offsets.items():
+        record = json.loads(data[offset:offset + length])
+        assert record["op"] == "put" and record["id"] == context_id
+        assert record["content"] == provider.contexts[context_id]["content"]
+
+
+def test_changes_append_records_and_replay_on_load(tmp_path):
+    path = str(tmp_path / "contexts.jsonl")
+
+    async def scenario():
+        provider = FileContextProvider(path, compact_min_bytes=10 ** 9)
+        first = await provider.add_context("kubernetes deployment", {"turn": 1})
+        second = await provider.add_context("weather forecast")
+        assert await provider.update_context(first, "kubernetes rollout")
+        assert await provider.delete_context(second)
+        assert_offsets_match_log(provider)
+        assert provider.content_chars == len("kubernetes rollout")
+        await provider.close()
+        return first
+
+    first = asyncio.run(scenario())
+    assert [record["op"] for record in read_records(path)] == ["put", "put", "put", "del"]
+
+    reloaded = FileContextProvider(path)
+    assert list(reloaded.contexts) == [first]
+    assert reloaded.contexts[first]["content"] == "kubernetes rollout"
+    assert reloaded.contexts[first]["metadata"] == {"turn": 1}
+    assert_offsets_match_log(reloaded)
+    assert reloaded.content_chars == len("kubernetes rollout")
+    # New ids continue after the replayed ones
+    assert asyncio.run(reloaded.add_context("next")) == "ctx_3"
+
+
+def test_concurrent_adds_share_batches(tmp_path):
+    path = str(tmp_path / "contexts.jsonl")
+    provider = FileContextProvider(path)
+    batches = []
+    write_batch = provider._write_batch
+
+    def counting_write_batch(lines):
+        batches.append(len(lines))
+        return write_batch(lines)
+
+    provider._write_batch = counting_write_batch
+
+    async def scenario():
+        await asyncio.gather(*(provider.add_context(f"entry {i}") for i in range(50)))
+        await provider.close()
+
+    asyncio.run(scenario())
+    assert sum(batches) == 50 and len(batches) < 50
+    assert_offsets_match_log(provider)
+
+
+def test_torn_tail_is_truncated_on_load(tmp_path):
+    path = str(tmp_path / "contexts.jsonl")
+    provider = FileContextProvider(path)
+    asyncio.run(provider.add_context("complete"))
+    asyncio.run(provider.close())
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'{"op":"put","id":"ctx_2","content":"half')
+
+    reloaded = FileContextProvider(path)
+    assert list(reloaded.contexts) == ["ctx_1"]
+    assert os.path.getsize(path) == size
+
+
+def test_legacy_json_file_is_migrated(tmp_path):
+    legacy = tmp_path / "contexts.json"
+    legacy.write_text(json.dumps({
+        "counter": 7,
+        "contexts": {"ctx_7": {"content": "old entry", "metadata": {}, "timestamp": "2024-01-01T00:00:00"}}
+    }))
+
+    provider = FileContextProvider(str(legacy))
+    assert provider.file_path.endswith("contexts.jsonl")
+    assert provider.contexts["ctx_7"]["content"] == "old entry"
+    assert (tmp_path / "contexts.json.migrated").exists()
+    assert asyncio.run(provider.add_context("new entry")) == "ctx_8"
+
+
+def test_log_is_compacted_once_mostly_garbage(tmp_path):
+    path = str(tmp_path / "contexts.jsonl")
+
+    async def scenario():
+        provider = FileContextProvider(path, fsync=False, compact_min_bytes=2000, compact_garbage_ratio=0.5)
+        context_id = await provider.add_context("keep me")
+        for i in range(100):
+            await provider.update_context(context_id, f"revision {i} " + "x" * 40)
+        await provider.flush()
+        # Without compaction the log would hold all 101 records (about 10 KB)
+        assert provider.get_log_stats()["log_bytes"] < 2200
+        assert_offsets_match_log(provider)
+        await provider.close()
+
+    asyncio.run(scenario())
+    assert FileContextProvider(path).contexts["ctx_1"]["content"].startswith("revision 99 ")
+
+
+def test_compaction_does_not_lose_writes_in_flight(tmp_path):
+    path = str(tmp_path / "contexts.jsonl")
+
+    async def scenario():
+        provider = FileContextProvider(path, fsync=False, compact_min_bytes=10 ** 9)
+        write_snapshot = provider._write_snapshot
+
+        def slow_write_snapshot(lines):
+            # Widen the window in which appends could race the snapshot
+            time.sleep(0.02)
+            return write_snapshot(lines)
+
+        provider._write_snapshot = slow_write_snapshot
+        ids = [await provider.add_context(f"old entry {i}") for i in range(40)]
+        for context_id in ids[::2]:
+            await provider.delete_context(context_id)
+
+        writes = [asyncio.create_task(provider.add_context(f"early {i}")) for i in range(10)]
+        compaction = asyncio.create_task(provider.compact())
+        for _ in range(5):
+            await asyncio.sleep(0.005)
+            writes.extend(asyncio.create_task(provider.add_context(f"late {i}")) for i in range(5))
+        writes.append(asyncio.create_task(provider.delete_context(ids[1])))
+        await asyncio.gather(compaction, *writes)
+        await provider.close()
+
+        assert_offsets_match_log(provider)
+        return {context_id: data["content"] for context_id, data in provider.contexts.items()}
+
+    expected = asyncio.run(scenario())
+    assert len(expected) == 19 + 10 + 25
+    reloaded = FileContextProvider(path)
+    assert {context_id: data["content"] for context_id, data in reloaded.contexts.items()} == expected
+    assert_offsets_match_log(reloaded)
@@ -0,0 +1,118 @@
+"""Tests for keyset-paginated history and thread rehydration, against SQLite."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from microsoft_agent_framework.core.agent_thread import AgentThread
+from microsoft_agent_framework.database.history import (
+    HISTORY_OFFSET_KEY,
+    SUMMARY_COUNT_KEY,
+    SUMMARY_KEY,
+    decode_cursor,
+    encode_cursor,
+    page_messages,
+    rehydrate_thread,
+    save_thread_summary,
+)
+from microsoft_agent_framework.database.models import Agent, Conversation, Message
+
+START = datetime(2024, 1, 1)
+
+
+async def seed_conversation(db, count: int, per_second: int = 1) -> str:
+    """Store a conversation of `count` alternating user/assistant messages, `per_second` per timestamp."""
+    async with db.get_session() as session:
+        agent = Agent(name="ops", instructions="help")
+        conversation = Conversation(agent=agent)
+        session.add(conversation)
+        for i in range(count):
+            session.add(Message(
+                conversation=conversation,
+                role="user" if i % 2 == 0 else "assistant",
+                content=f"message {i}",
+                created_at=START + timedelta(seconds=i // per_second)
+            ))
+    return conversation.id
+
+
+def test_pages_walk_back_through_the_whole_history(sqlite_db):
+    async def scenario():
+        conversation_id = await seed_conversation(sqlite_db, 7, per_second=2)
+        pages, cursor = [], None
+        async with sqlite_db.get_session() as session:
+            while True:
+                rows, cursor = await page_messages(session, conversation_id, limit=3, before=cursor)
+                pages.append([(row.created_at, row.id) for row in rows])
+                if cursor is None:
+                    break
+        return pages
+
+    pages = asyncio.run(scenario())
+    assert [len(page) for page in pages] == [3, 3, 1]
+    keys = [key for page in reversed(pages) for key in page]
+    # Oldest first within and across pages, ties on created_at broken by id
+    assert keys == sorted(keys) and len(set(keys)) == 7
+
+
+def test_cursors_round_trip_and_reject_garbage():
+    row = Message(id="6f1c0b1e-8d3a-4c55-9b1e-0d7f6a1e2b3c", created_at=START)
+    assert decode_cursor(encode_cursor(row)) == (START, row.id)
+    for cursor in ("not-a-cursor", encode_cursor(Message(id="oops", created_at=START))):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+def test_rehydrate_loads_the_recent_window_and_the_saved_summary(sqlite_db):
+    async def scenario():
+        conversation_id = await seed_conversation(sqlite_db, 10)
+        async with sqlite_db.get_session() as session:
+            conversation = await session.get(Conversation, conversation_id)
+            conversation.agent_metadata = {SUMMARY_KEY: "earlier talk", SUMMARY_COUNT_KEY: 7}
+
+        thread = AgentThread()
+        async with sqlite_db.get_session() as session:
+            conversation = await session.get(Conversation, conversation_id)
+            loaded = await rehydrate_thread(session, thread, conversation, max_messages=4)
+        return loaded, thread
+
+    loaded, thread = asyncio.run(scenario())
+    assert loaded == 4
+    assert [m.content for m in thread.messages] == [f"message {i}" for i in range(6, 10)]
+    assert [m.role for m in thread.messages] == ["user", "assistant", "user", "assistant"]
+    assert thread.metadata[HISTORY_OFFSET_KEY] == 6
+    # The summary covers messages 0-6, so the first loaded message is folded into it
+    assert thread.summary == "earlier talk" and thread.summary_until == 1
+
+
+def test_token_budget_drops_older_messages_but_keeps_the_latest(sqlite_db):
+    async def scenario():
+        conversation_id = await seed_conversation(sqlite_db, 6)
+        thread = AgentThread()
+        async with sqlite_db.get_session() as session:
+            conversation = await session.get(Conversation, conversation_id)
+            await rehydrate_thread(session, thread, conversation, max_tokens=1)
+        return thread
+
+    thread = asyncio.run(scenario())
+    assert [m.content for m in thread.messages] == ["message 5"]
+    assert thread.metadata[HISTORY_OFFSET_KEY] == 5
+
+
+def test_summary_is_saved_only_when_it_changed(sqlite_db):
+    async def scenario():
+        conversation_id = await seed_conversation(sqlite_db, 4)
+        thread = AgentThread()
+        async with sqlite_db.get_session() as session:
+            conversation = await session.get(Conversation, conversation_id)
+            await rehydrate_thread(session, thread, conversation, max_messages=2)
+        thread.set_summary("first two turns", 1)
+
+        async with sqlite_db.get_session() as session:
+            assert await save_thread_summary(session, conversation_id, thread)
+            assert not await save_thread_summary(session, conversation_id, thread)
+        async with sqlite_db.get_session() as session:
+            return (await session.get(Conversation, conversation_id)).agent_metadata
+
+    assert asyncio.run(scenario()) == {SUMMARY_KEY: "first two turns", SUMMARY_COUNT_KEY: 3}
@@ -0,0 +1,77 @@
+"""Tests for keyset-paginated agent and conversation listings, against SQLite."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from microsoft_agent_framework.database.listing import page_agents, page_conversations
+from microsoft_agent_framework.database.models import Agent, Conversation
+
+START = datetime(2024, 1, 1)
+
+
+async def collect(fetch, cursor_name: str):
+    """Follow cursors until the last page; returns the pages."""
+    pages, cursor = [], None
+    while True:
+        page, cursor = await fetch(**{cursor_name: cursor})
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+def test_agents_are_listed_oldest_first_across_pages(sqlite_db):
+    async def scenario():
+        async with sqlite_db.get_session() as session:
+            # Two agents per timestamp, so pages must break ties on id
+            session.add_all([
+                Agent(name=f"agent {i}", instructions="long instructions", is_active=i != 3,
+                      created_at=START + timedelta(minutes=i // 2))
+                for i in range(7)
+            ])
+        async with sqlite_db.get_session() as session:
+            active = await collect(lambda after: page_agents(session, limit=2, after=after), "after")
+            everything = await collect(
+                lambda after: page_agents(session, limit=4, after=after, include_inactive=True), "after"
+            )
+        return active, everything
+
+    active, everything = asyncio.run(scenario())
+    assert [len(page) for page in active] == [2, 2, 2]
+    listed = [agent for page in active for agent in page]
+    assert sorted(agent["name"] for agent in listed) == [f"agent {i}" for i in range(7) if i != 3]
+    keys = [(agent["created_at"], agent["id"]) for agent in listed]
+    assert keys == sorted(keys)
+    assert len([agent for page in everything for agent in page]) == 7
+    # Summaries leave the heavy columns to the detail endpoint
+    assert "instructions" not in listed[0] and listed[0]["created_at"].startswith("2024-01-01T00:00")
+
+
+def test_conversations_are_listed_newest_first_per_agent(sqlite_db):
+    async def scenario():
+        async with sqlite_db.get_session() as session:
+            ops, dev = Agent(name="ops", instructions="help"), Agent(name="dev", instructions="help")
+            session.add_all([
+                Conversation(agent=ops if i % 2 == 0 else dev, title=f"chat {i}", message_count=i,
+                             created_at=START + timedelta(minutes=i))
+                for i in range(5)
+            ])
+        async with sqlite_db.get_session() as session:
+            pages = await collect(lambda before: page_conversations(session, ops.id, limit=2, before=before), "before")
+            everything, cursor = await page_conversations(session, limit=10)
+        return pages, everything, cursor
+
+    pages, everything, cursor = asyncio.run(scenario())
+    assert [[c["title"] for c in page] for page in pages] == [["chat 4", "chat 2"], ["chat 0"]]
+    assert [c["message_count"] for page in pages for c in page] == [4, 2, 0]
+    assert len(everything) == 5 and cursor is None
+
+
+def test_malformed_cursors_are_rejected(sqlite_db):
+    async def scenario():
+        async with sqlite_db.get_session() as session:
+            await page_agents(session, after="bogus")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
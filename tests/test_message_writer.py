@@ -0,0 +1,62 @@
+"""Tests for the batching message writer, against SQLite."""
+
+import asyncio
+import uuid
+
+from sqlalchemy import func, select
+
+from microsoft_agent_framework.database.message_writer import MessageWriter
+from microsoft_agent_framework.database.models import Agent, Conversation, Message
+
+
+async def create_conversations(db, count: int):
+    async with db.get_session() as session:
+        agent = Agent(name="ops", instructions="help")
+        conversations = [Conversation(agent=agent) for _ in range(count)]
+        session.add_all(conversations)
+    return [conversation.id for conversation in conversations]
+
+
+async def stored_state(db):
+    async with db.get_session() as session:
+        contents = (await session.execute(select(Message.content).order_by(Message.content))).scalars().all()
+        counts = dict((await session.execute(select(Conversation.id, Conversation.message_count))).all())
+        total = (await session.execute(select(func.count()).select_from(Message))).scalar_one()
+    return list(contents), counts, total
+
+
+def test_messages_are_batched_and_counted(sqlite_db):
+    async def scenario():
+        first, second = await create_conversations(sqlite_db, 2)
+        writer = MessageWriter(sqlite_db, batch_size=10, max_delay=0.01)
+        ids = [await writer.submit(first if i % 3 else second, "user", f"message {i}") for i in range(12)]
+        await writer.close()
+        contents, counts, _ = await stored_state(sqlite_db)
+        return ids, contents, counts, (first, second), writer.get_stats()
+
+    ids, contents, counts, (first, second), stats = asyncio.run(scenario())
+    assert len(set(ids)) == 12
+    assert contents == sorted(f"message {i}" for i in range(12))
+    assert counts == {first: 8, second: 4}
+    assert stats["batches"] == 2 and stats["written"] == 12 and stats["failed"] == 0
+
+
+def test_only_the_offending_rows_of_a_batch_are_dropped(sqlite_db):
+    async def scenario():
+        first, second = await create_conversations(sqlite_db, 2)
+        deleted = str(uuid.uuid4())
+        writer = MessageWriter(sqlite_db, batch_size=50, max_delay=0.05, max_retries=0)
+        await writer.submit(first, "user", "kept 1")
+        await writer.submit(deleted, "user", "lost to a deleted conversation")
+        await writer.submit(second, "user", "kept 2")
+        await writer.submit(second, None, "lost to a missing role")
+        await writer.submit(second, "assistant", "kept 3")
+        await writer.submit(deleted, "assistant", "lost again")
+        await writer.close()
+        contents, counts, total = await stored_state(sqlite_db)
+        return contents, counts, total, (first, second), writer.get_stats()
+
+    contents, counts, total, (first, second), stats = asyncio.run(scenario())
+    assert contents == ["kept 1", "kept 2", "kept 3"] and total == 3
+    assert counts == {first: 1, second: 2}
+    assert stats["batches"] == 1 and stats["written"] == 3 and stats["failed"] == 3
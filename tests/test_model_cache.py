@@ -0,0 +1,103 @@
+"""Tests for the read-through model cache, against SQLite."""
+
+import asyncio
+import time
+
+from microsoft_agent_framework.database.model_cache import ModelCache
+from microsoft_agent_framework.database.models import Agent, AgentTemplate
+
+
+class CountingCache(ModelCache):
+    """ModelCache that counts the queries it sends and can pause them."""
+
+    def __init__(self, *args, delay: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.queries = 0
+
+    async def _query(self, statement, session=None):
+        if session is None:
+            self.queries += 1
+            await asyncio.sleep(self.delay)
+        return await super()._query(statement, session)
+
+
+async def add_agent(db, name: str = "ops") -> str:
+    async with db.get_session() as session:
+        agent = Agent(name=name, instructions="help")
+        session.add(agent)
+    return agent.id
+
+
+def test_rows_are_read_through_once_and_usable_detached(sqlite_db):
+    async def scenario():
+        agent_id = await add_agent(sqlite_db)
+        cache = CountingCache(Agent, db=sqlite_db, delay=0.01)
+        first, second = await asyncio.gather(cache.get(agent_id), cache.get(agent_id))
+        third = await cache.get(agent_id)
+        return first, second, third, cache
+
+    first, second, third, cache = asyncio.run(scenario())
+    assert first is second is third and first.name == "ops"
+    # Detached rows keep their loaded attributes after the session is gone
+    assert first.to_dict()["instructions"] == "help"
+    assert cache.queries == 1
+    stats = cache.get_stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1
+
+
+def test_missing_keys_are_remembered_for_the_negative_ttl(sqlite_db):
+    async def scenario():
+        cache = CountingCache(AgentTemplate, key_column=AgentTemplate.name, db=sqlite_db, negative_ttl=0.05)
+        assert await cache.get("research") is None
+        assert await cache.get("research") is None
+        async with sqlite_db.get_session() as session:
+            session.add(AgentTemplate(name="research", instructions="dig"))
+        assert await cache.get("research") is None
+        time.sleep(0.06)
+        template = await cache.get("research")
+        return template, cache
+
+    template, cache = asyncio.run(scenario())
+    assert template.instructions == "dig"
+    assert cache.queries == 2 and cache.get_stats()["negative_hits"] == 2
+
+
+def test_invalidation_forgets_rows_and_in_flight_loads(sqlite_db):
+    async def scenario():
+        agent_id = await add_agent(sqlite_db)
+        cache = CountingCache(Agent, db=sqlite_db, delay=0.02)
+        loading = asyncio.create_task(cache.get(agent_id))
+        await asyncio.sleep(0.01)
+        cache.invalidate(agent_id)
+        await loading
+        # The load raced the invalidation, so its result was not cached
+        assert agent_id not in cache._entries
+
+        await cache.get(agent_id)
+        async with sqlite_db.get_session() as session:
+            (await session.get(Agent, agent_id)).name = "renamed"
+        assert (await cache.get(agent_id)).name == "ops"
+        cache.invalidate(agent_id)
+        return await cache.get(agent_id), cache
+
+    agent, cache = asyncio.run(scenario())
+    assert agent.name == "renamed" and cache.queries == 3
+
+
+def test_entries_expire_and_are_bounded(sqlite_db):
+    async def scenario():
+        ids = [await add_agent(sqlite_db, f"agent {i}") for i in range(3)]
+        cache = CountingCache(Agent, db=sqlite_db, ttl=0.05, max_entries=2)
+        for agent_id in ids:
+            await cache.get(agent_id)
+        assert list(cache._entries) == ids[1:]
+        time.sleep(0.06)
+        await cache.get(ids[2])
+        async with sqlite_db.get_session() as session:
+            # On a miss the caller's session is used, without a connection of the cache's own
+            assert (await cache.get(ids[0], session)).name == "agent 0"
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.queries == 4 and cache.get_stats()["hits"] == 0
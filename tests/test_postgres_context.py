@@ -0,0 +1,175 @@
+"""Tests for the PostgreSQL full-text context provider.
+
+Most tests compile statements against the PostgreSQL dialect; the postgres_db
+ones run against a live server and are skipped unless TEST_DATABASE_URL is set.
+"""
+
+import asyncio
+import inspect
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from microsoft_agent_framework.core.context_provider import EvictionPolicy
+from microsoft_agent_framework.core.postgres_context import PostgresContextProvider
+from microsoft_agent_framework.database.models import CONTEXT_SEARCH_CONFIG, AgentContext
+
+
+class RecordingDatabase:
+    """Stands in for DatabaseManager; records statements instead of running them."""
+
+    def __init__(self):
+        self.statements = []
+
+    @asynccontextmanager
+    async def get_session(self):
+        yield self
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return SimpleNamespace(
+            all=lambda: [],
+            scalar_one=lambda: 42,
+            scalars=lambda: SimpleNamespace(all=lambda: []),
+            rowcount=1
+        )
+
+    def sql(self, index: int = -1) -> str:
+        compiled = self.statements[index].compile(dialect=postgresql.dialect())
+        return str(compiled), compiled.params
+
+
+def test_queries_use_the_configuration_of_the_stored_vector():
+    ddl = str(CreateTable(AgentContext.__table__).compile(dialect=postgresql.dialect()))
+    assert f"to_tsvector('{CONTEXT_SEARCH_CONFIG}', content)" in ddl
+    index = next(i for i in AgentContext.__table__.indexes if i.name == "ix_agent_contexts_search_vector")
+    assert "USING gin (search_vector)" in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert "search_config" not in inspect.signature(PostgresContextProvider).parameters
+
+    db = RecordingDatabase()
+    provider = PostgresContextProvider(agent_id="ops", db=db)
+    assert asyncio.run(provider.get_context("Deploying the kubernetes cluster", limit=3)) == []
+
+    sql, params = db.sql()
+    assert "agent_contexts.search_vector @@ to_tsquery(" in sql
+    assert "ts_rank(agent_contexts.search_vector, to_tsquery(" in sql
+    assert CONTEXT_SEARCH_CONFIG in params.values()
+    assert "deploying | kubernetes | cluster" in params.values()
+    assert "ops" in params.values()
+
+
+def test_writes_are_scoped_to_the_agent():
+    db = RecordingDatabase()
+    provider = PostgresContextProvider(agent_id="ops", db=db)
+
+    assert asyncio.run(provider.add_context("remember this")) == "ctx_42"
+    assert asyncio.run(provider.update_context("ctx_42", "changed"))
+    assert asyncio.run(provider.delete_context("ctx_42"))
+    assert not asyncio.run(provider.delete_context("bogus"))
+    assert len(db.statements) == 3
+
+    for index in (1, 2):
+        sql, params = db.sql(index)
+        assert "agent_contexts.agent_id = " in sql
+        assert params["agent_id_1"] == "ops" and params["id_1"] == 42
+
+
+def test_eviction_rules_compile_to_scoped_deletes():
+    db = RecordingDatabase()
+    provider = PostgresContextProvider(
+        agent_id="ops", db=db, eviction_policy=EvictionPolicy(ttl=60, max_entries=10, max_bytes=1000, lru=False)
+    )
+    assert asyncio.run(provider.enforce_limits()) == 0
+
+    ttl, entries, size = (db.sql(i)[0] for i in range(3))
+    assert ttl.startswith("DELETE FROM agent_contexts WHERE agent_contexts.created_at < ")
+    assert "ORDER BY agent_contexts.id DESC" in entries and "OFFSET" in entries
+    assert "sum(octet_length(agent_contexts.content)) OVER (ORDER BY agent_contexts.id DESC)" in size
+    assert all("RETURNING octet_length(agent_contexts.content)" in sql for sql in (ttl, entries, size))
+
+
+def scoped_provider(postgres_db, **options) -> PostgresContextProvider:
+    """A provider scoped to a fresh agent id, so runs never see each other's rows."""
+    return PostgresContextProvider(agent_id=f"test-{uuid.uuid4()}", db=postgres_db, **options)
+
+
+async def clear_rows(provider: PostgresContextProvider) -> None:
+    async with provider.db.get_session() as session:
+        await session.execute(delete(AgentContext).where(AgentContext.agent_id == provider.agent_id))
+
+
+def test_postgres_ranks_stemmed_matches_by_ts_rank(postgres_db):
+    async def scenario():
+        provider = scoped_provider(postgres_db)
+        other = scoped_provider(postgres_db)
+        try:
+            guide = await provider.add_context("Kubernetes deployment guide", {"turn": 1})
+            cluster = await provider.add_context("kubernetes cluster, kubernetes nodes, kubernetes pods")
+            await provider.add_context("python packaging notes")
+            await other.add_context("kubernetes everywhere")
+
+            ranked = await provider.get_context("kubernetes clusters")
+            stemmed = await provider.get_context("deploying")
+            return guide, cluster, ranked, stemmed
+        finally:
+            await clear_rows(provider)
+            await clear_rows(other)
+
+    guide, cluster, ranked, stemmed = asyncio.run(scenario())
+    assert [c["id"] for c in ranked] == [cluster, guide]
+    assert ranked[0]["score"] > ranked[1]["score"] > 0
+    assert [c["id"] for c in stemmed] == [guide] and stemmed[0]["metadata"] == {"turn": 1}
+
+
+def test_postgres_batch_ids_follow_the_input_order(postgres_db):
+    async def scenario():
+        provider = scoped_provider(postgres_db)
+        try:
+            items = [{"content": f"entry number {i}", "metadata": {"i": i}} for i in range(200)]
+            ids = await provider.add_contexts(items)
+            async with postgres_db.get_session() as session:
+                rows = (await session.execute(
+                    select(AgentContext.id, AgentContext.content).where(AgentContext.agent_id == provider.agent_id)
+                )).all()
+            return ids, {f"ctx_{row.id}": row.content for row in rows}
+        finally:
+            await clear_rows(provider)
+
+    ids, stored = asyncio.run(scenario())
+    assert [stored[context_id] for context_id in ids] == [f"entry number {i}" for i in range(200)]
+
+
+def test_postgres_eviction_keeps_the_newest_rows_of_the_agent(postgres_db):
+    async def scenario():
+        policy = EvictionPolicy(max_entries=3, max_bytes=40, lru=False)
+        provider = scoped_provider(postgres_db, eviction_policy=policy, eviction_interval=2)
+        other = scoped_provider(postgres_db)
+        try:
+            await other.add_context("memory kept by another agent")
+            for i in range(6):
+                await provider.add_context(f"memory {i:02d}")
+            await provider.add_context("memory " + "x" * 30)
+            await provider.add_context("memory tail")
+            found = await provider.get_context("memory", limit=10)
+            untouched = await other.get_context("memory")
+            return found, untouched, provider.eviction_stats.by_reason
+        finally:
+            await clear_rows(provider)
+            await clear_rows(other)
+
+    found, untouched, reasons = asyncio.run(scenario())
+    # Every second write trims to the newest 3 rows; then the 37-byte entry and
+    # the 11-byte tail exceed 40 bytes, so only the tail is left
+    assert [c["content"] for c in found] == ["memory tail"]
+    assert reasons["max_entries"] == 5 and reasons["max_bytes"] == 2
+    assert len(untouched) == 1
+
+
+def test_lru_policies_are_rejected():
+    with pytest.raises(ValueError):
+        PostgresContextProvider(agent_id="ops", db=RecordingDatabase(), eviction_policy=EvictionPolicy(max_entries=3))
@@ -0,0 +1,185 @@
+"""Tests for retries, circuit breaking, hedging and model fallback."""
+
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+import groq
+import httpx
+import pytest
+
+from microsoft_agent_framework.core.completion_cache import InMemoryCompletionCache
+from microsoft_agent_framework.core.groq_client import GroqClient, GroqConfig
+from microsoft_agent_framework.core.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    RetryPolicy,
+    build_model_chain,
+    hedged_call,
+    is_retryable,
+    should_fall_back,
+)
+
+
+def status_error(status_code: int) -> groq.APIStatusError:
+    request = httpx.Request("POST", "http://groq.test/openai/v1/chat/completions")
+    response = httpx.Response(status_code, request=request)
+    error_types = {404: groq.NotFoundError, 429: groq.RateLimitError, 400: groq.BadRequestError}
+    error_type = error_types.get(status_code, groq.InternalServerError)
+    return error_type(f"HTTP {status_code}", response=response, body=None)
+
+
+def completion(model: str):
+    return SimpleNamespace(
+        model=model,
+        usage=SimpleNamespace(total_tokens=7, model_dump=lambda: {"total_tokens": 7}),
+        choices=[SimpleNamespace(message=SimpleNamespace(content=f"from {model}", tool_calls=None), finish_reason="stop")]
+    )
+
+
+class ScriptedCompletions:
+    """Fake `chat.completions` returning scripted outcomes per model."""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+
+    async def create(self, model, **kwargs):
+        self.calls.append(model)
+        outcome = self.outcomes[model].pop(0) if isinstance(self.outcomes[model], list) else self.outcomes[model]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if kwargs.get("stream"):
+            return stream_of(f"from {model}")
+        return completion(model)
+
+
+async def stream_of(content: str):
+    for token in content.split(" "):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token + " "))])
+
+
+def make_client(outcomes, cache=None, **config) -> GroqClient:
+    client = GroqClient(GroqConfig(
+        api_key=f"test-{uuid.uuid4()}", model="primary", retry_base_delay=0.0, retry_max_delay=0.0, **config
+    ), cache=cache)
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=ScriptedCompletions(outcomes)))
+    return client
+
+
+def test_errors_are_classified():
+    assert is_retryable(status_error(429))
+    assert is_retryable(status_error(503))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(status_error(400))
+    assert not is_retryable(status_error(404))
+    assert should_fall_back(status_error(404))
+    assert not should_fall_back(ValueError())
+
+
+def test_backoff_delay_is_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    assert all(0 <= policy.backoff_delay(attempt) <= 4.0 for attempt in range(10))
+
+
+def test_breaker_opens_at_threshold_and_reorders_chain():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    breaker.record_failure("a")
+    assert not breaker.is_open("a")
+    breaker.record_failure("a")
+    assert breaker.is_open("a")
+    assert build_model_chain("a", {"a": ["b", "c"]}, breaker) == ["b", "c", "a"]
+
+    breaker._open_until["a"] = time.monotonic() - 1
+    assert not breaker.is_open("a")
+    assert build_model_chain("a", {"a": ["b", "a"]}, breaker) == ["a", "b"]
+
+
+def test_latency_percentile_needs_min_samples():
+    tracker = LatencyTracker(min_samples=3)
+    tracker.record("m", 1.0)
+    tracker.record("m", 2.0)
+    assert tracker.percentile("m") is None
+    tracker.record("m", 3.0)
+    assert tracker.percentile("m", 0.5) == 2.0
+
+
+def test_hedge_returns_the_faster_attempt():
+    delays = [0.5, 0.01]
+
+    async def call():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    async def scenario():
+        start = time.monotonic()
+        result = await hedged_call(call, hedge_delay=0.05)
+        return result, time.monotonic() - start
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == 0.01
+    assert elapsed < 0.3
+
+
+def test_hedge_raises_early_failure_without_duplicating():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise status_error(503)
+
+    with pytest.raises(groq.InternalServerError):
+        asyncio.run(hedged_call(call, hedge_delay=1.0))
+    assert len(calls) == 1
+
+
+def test_client_retries_transient_errors():
+    client = make_client({"primary": [status_error(503), status_error(503), None]})
+    response = asyncio.run(client.async_chat_completion([{"role": "user", "content": "hi"}]))
+    assert response.content == "from primary"
+    assert client.async_client.chat.completions.calls == ["primary"] * 3
+
+
+def test_client_does_not_retry_client_errors():
+    client = make_client({"primary": status_error(400)}, fallback_models={"primary": ["backup"]})
+    with pytest.raises(groq.BadRequestError):
+        asyncio.run(client.async_chat_completion([{"role": "user", "content": "hi"}]))
+    assert client.async_client.chat.completions.calls == ["primary"]
+
+
+def test_client_falls_back_and_trips_breaker():
+    client = make_client(
+        {"primary": status_error(404), "backup": None},
+        fallback_models={"primary": ["backup"]},
+        circuit_breaker_threshold=1
+    )
+    response = asyncio.run(client.async_chat_completion([{"role": "user", "content": "hi"}]))
+    assert response.content == "from backup"
+    # A missing model is not retried, and the tripped breaker sends the next call to the fallback first
+    assert client.async_client.chat.completions.calls == ["primary", "backup"]
+    assert build_model_chain("primary", client.config.fallback_models, client.circuit_breaker) == ["backup", "primary"]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_fallback_answers_are_not_cached_for_the_primary_model(streaming):
+    client = make_client(
+        {"primary": [status_error(404), None], "backup": None},
+        cache=InMemoryCompletionCache(),
+        fallback_models={"primary": ["backup"]},
+        temperature=0.0
+    )
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def ask(model="primary"):
+        if streaming:
+            return "".join([token async for token in client.stream_chat_completion(messages, model=model)]).strip()
+        return (await client.async_chat_completion(messages, model=model)).content
+
+    async def scenario():
+        return await ask(), await ask(), await ask("backup")
+
+    assert asyncio.run(scenario()) == ("from backup", "from primary", "from backup")
+    # The fallback's answer was cached under its own model and served to the explicit backup request
+    assert client.async_client.chat.completions.calls == ["primary", "backup", "primary"]
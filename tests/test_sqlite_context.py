@@ -0,0 +1,112 @@
+"""Tests for the SQLite FTS5 context provider."""
+
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from microsoft_agent_framework.core.context_provider import EvictionPolicy
+from microsoft_agent_framework.core.sqlite_context import SQLiteContextProvider
+
+
+def test_schema_connection_is_closed(tmp_path, monkeypatch):
+    opened = []
+    connect = SQLiteContextProvider._connect
+
+    def recording_connect(self):
+        conn = connect(self)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(SQLiteContextProvider, "_connect", recording_connect)
+    provider = SQLiteContextProvider(str(tmp_path / "contexts.db"))
+    assert len(opened) == 1 and provider._connections == []
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
+
+
+def test_full_text_search_ranks_and_filters(tmp_path):
+    async def scenario():
+        provider = SQLiteContextProvider(str(tmp_path / "contexts.db"))
+        try:
+            first = await provider.add_context("kubernetes deployment rollout", {"agent": "ops"})
+            second = await provider.add_context("kubernetes pods", {"agent": "dev"})
+            await provider.add_context("weather forecast")
+
+            results = await provider.get_context("kubernetes rollout")
+            assert [result["id"] for result in results] == [first, second]
+            assert results[0]["metadata"] == {"agent": "ops"} and results[0]["score"] > results[1]["score"]
+
+            assert [r["id"] for r in await provider.get_context("kubernetes", agent="dev")] == [second]
+            future = datetime.now() + timedelta(hours=1)
+            assert await provider.get_context("kubernetes", since=future) == []
+            assert len(await provider.get_context("kubernetes", until=future)) == 2
+            # Query syntax is quoted, never interpreted by FTS5
+            assert await provider.get_context('pods" OR "weather') != []
+            assert await provider.get_context("the and of") == []
+        finally:
+            await provider.close()
+
+    asyncio.run(scenario())
+
+
+def test_updates_deletes_and_batches(tmp_path):
+    async def scenario():
+        provider = SQLiteContextProvider(str(tmp_path / "contexts.db"))
+        try:
+            ids = await provider.add_contexts([{"content": f"entry number {i}"} for i in range(5)])
+            assert ids == [f"ctx_{i}" for i in range(1, 6)]
+
+            assert await provider.update_context(ids[0], "renamed kubernetes entry", {"agent": "ops"})
+            assert [r["id"] for r in await provider.get_context("kubernetes", agent="ops")] == [ids[0]]
+            assert await provider.delete_context(ids[1])
+            assert not await provider.delete_context(ids[1])
+            assert not await provider.update_context("bogus", "x")
+            assert await provider.count_contexts() == 4
+
+            page, cursor = await provider.list_contexts(limit=3)
+            assert [c["id"] for c in page] == [ids[0], ids[2], ids[3]] and cursor == ids[3]
+            page, cursor = await provider.list_contexts(after=cursor, limit=3)
+            assert [c["id"] for c in page] == [ids[4]] and cursor is None
+        finally:
+            await provider.close()
+
+    asyncio.run(scenario())
+
+
+def test_eviction_keeps_the_newest_entries(tmp_path):
+    async def scenario():
+        provider = SQLiteContextProvider(
+            str(tmp_path / "contexts.db"),
+            eviction_policy=EvictionPolicy(max_entries=3, lru=False),
+            eviction_interval=2
+        )
+        try:
+            ids = [await provider.add_context(f"entry {i}") for i in range(6)]
+            assert await provider.count_contexts() == 3
+            page, _ = await provider.list_contexts()
+            assert [c["id"] for c in page] == ids[3:]
+            assert provider.eviction_stats.by_reason["max_entries"] == 3
+        finally:
+            await provider.close()
+
+    asyncio.run(scenario())
+
+
+def test_lru_policies_are_rejected(tmp_path, monkeypatch):
+    with pytest.raises(ValueError):
+        SQLiteContextProvider(str(tmp_path / "contexts.db"), eviction_policy=EvictionPolicy(max_entries=3))
+
+    # The builder downgrades a template's lru policy rather than failing
+    from microsoft_agent_framework.core.agent_builder import AgentBuilder
+    from microsoft_agent_framework.core.groq_client import GroqClient, GroqConfig
+
+    monkeypatch.chdir(tmp_path)
+    policy = EvictionPolicy(max_entries=3)
+    builder = AgentBuilder(GroqClient(GroqConfig(api_key="test-key")))
+    provider = builder._create_context_provider("sqlite", "ops", policy)
+    try:
+        assert provider.eviction_policy == EvictionPolicy(max_entries=3, lru=False) and policy.lru
+    finally:
+        asyncio.run(provider.close())
@@ -0,0 +1,237 @@
+"""Tests for stream coalescing and the agent's streaming turn."""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from microsoft_agent_framework.core.base_agent import ChatCompletionAgent
+from microsoft_agent_framework.core.streaming import StreamAccumulator, StreamFrame, coalesce_chunks
+
+
+class TokenStream:
+    """Async token source that records whether it was closed early."""
+
+    def __init__(self, tokens, delays=None):
+        self.tokens = tokens
+        self.delays = delays or {}
+        self.closed = False
+        self.finished = False
+
+    async def __call__(self, **kwargs):
+        try:
+            for i, token in enumerate(self.tokens):
+                await asyncio.sleep(self.delays.get(i, 0))
+                yield token
+            self.finished = True
+        finally:
+            self.closed = True
+
+
+def make_agent(stream: TokenStream) -> ChatCompletionAgent:
+    groq_client = SimpleNamespace(
+        config=SimpleNamespace(model="llama3-70b-8192", max_tokens=1024),
+        stream_chat_completion=stream,
+    )
+    return ChatCompletionAgent(instructions="be brief", name="streamer", groq_client=groq_client)
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+def test_frames_are_bounded_by_size():
+    stream = TokenStream(["ab", "cd", "ef", "g"])
+    frames = asyncio.run(collect(coalesce_chunks(stream(), max_latency=None, max_bytes=4)))
+    assert frames == ["abcd", "efg"]
+    # Multi-byte characters count by their UTF-8 size
+    frames = asyncio.run(collect(coalesce_chunks(TokenStream(["é", "é", "x"])(), max_latency=None, max_bytes=4)))
+    assert frames == ["éé", "x"]
+
+
+def test_time_bound_flushes_while_upstream_is_quiet():
+    stream = TokenStream(["a", "b", "c"], delays={2: 0.2})
+
+    async def scenario():
+        started = time.monotonic()
+        arrivals = []
+        async for frame in coalesce_chunks(stream(), max_latency=0.02, max_bytes=1024):
+            arrivals.append((frame, time.monotonic() - started))
+        return arrivals
+
+    arrivals = asyncio.run(scenario())
+    assert [frame for frame, _ in arrivals] == ["ab", "c"]
+    # The first frame did not wait for the slow third token
+    assert arrivals[0][1] < 0.15 and arrivals[1][1] >= 0.2
+
+
+def test_upstream_is_closed_when_the_consumer_stops_early():
+    async def stop_after_first(stream, **bounds):
+        frames = coalesce_chunks(stream(), **bounds)
+        async for frame in frames:
+            break
+        await frames.aclose()
+        # Closed by the time aclose() returns, not at event loop shutdown
+        return frame, stream.closed
+
+    # Waiting on the upstream when the consumer leaves
+    quiet = TokenStream(["a"] * 10, delays={1: 0.05})
+    assert asyncio.run(stop_after_first(quiet, max_latency=0.01, max_bytes=1024)) == ("a", True)
+    # Suspended at a yield after a size-bound flush
+    busy = TokenStream(["ab"] * 10)
+    assert asyncio.run(stop_after_first(busy, max_latency=None, max_bytes=2)) == ("ab", True)
+    assert not quiet.finished and not busy.finished
+
+
+def test_agent_stream_closes_upstream_when_abandoned():
+    stream = TokenStream(["a", "b", "c"], delays={1: 0.05})
+    agent = make_agent(stream)
+
+    async def scenario():
+        updates = agent.run_streaming_async("hi", coalesce_ms=10, lightweight=True)
+        async for update in updates:
+            break
+        await updates.aclose()
+        await agent.close()
+        return stream.closed
+
+    assert asyncio.run(scenario()) and not stream.finished
+
+
+def test_final_frame_carries_the_joined_content():
+    tokens = [f"token{i} " for i in range(50)]
+    agent = make_agent(TokenStream(tokens))
+
+    async def scenario():
+        updates = await collect(agent.run_streaming_async("hi", coalesce_bytes=64, lightweight=True))
+        await agent.close()
+        return updates
+
+    updates = asyncio.run(scenario())
+    assert all(isinstance(update, StreamFrame) for update in updates)
+    *frames, final = updates
+    assert final.is_complete and final.metadata["full_content"] == "".join(tokens)
+    assert "".join(frame.text for frame in frames) == "".join(tokens)
+    assert len(frames) < len(tokens)
+    assert agent.thread.get_last_message("assistant").content == "".join(tokens)
+
+
+def test_accumulator_joins_once():
+    accumulator = StreamAccumulator()
+    assert accumulator.getvalue() == ""
+    for chunk in ("a", "bc", "def"):
+        accumulator.append(chunk)
+    assert len(accumulator) == 6 and accumulator.getvalue() == "abcdef"
+    accumulator.append("g")
+    assert accumulator.getvalue() == "abcdefg"
+
+
+def test_sse_endpoint_emits_coalesced_frames(monkeypatch):
+    import app
+
+    tokens = ["x"] * 200
+    agent = make_agent(TokenStream(tokens))
+    closed = []
+
+    async def open_turn(agent_id, conversation_id, message):
+        return SimpleNamespace(agent=agent, lock=asyncio.Lock(), key=(agent_id, "conversation"))
+
+    async def close_turn(entry, content):
+        closed.append(content)
+
+    monkeypatch.setattr(app, "agent_builder", object())
+    monkeypatch.setattr(app, "_open_turn", open_turn)
+    monkeypatch.setattr(app, "_close_turn", close_turn)
+    monkeypatch.setattr(app, "STREAM_COALESCE_BYTES", 64)
+
+    async def scenario():
+        response = await app.stream_chat_with_agent("agent", app.ChatRequest(message="hi"))
+        body = [event async for event in response.body_iterator]
+        await agent.close()
+        return body
+
+    events = [json.loads(event[len("data: "):]) for event in asyncio.run(scenario())]
+    *frames, done = events
+    assert len(frames) == 4 and all(len(frame["content"]) == 64 or frame is frames[-1] for frame in frames)
+    assert done["done"] and done["full_response"] == "x" * 200
+    assert closed == ["x" * 200]
+
+
+class FailingStream(TokenStream):
+    """Token source that fails after its tokens, like a dropped upstream connection."""
+
+    async def __call__(self, **kwargs):
+        async for token in super().__call__(**kwargs):
+            yield token
+        raise ConnectionError("upstream went away")
+
+
+def patch_turns(monkeypatch, agent):
+    """Route the SSE endpoint to `agent`; returns the contents passed to _close_turn and the released entries."""
+    import app
+
+    closed, released = [], []
+
+    async def open_turn(agent_id, conversation_id, message):
+        agent.thread.add_user_message(message)
+        return SimpleNamespace(agent=agent, lock=asyncio.Lock(), key=(agent_id, "conversation"))
+
+    async def close_turn(entry, content):
+        closed.append(content)
+
+    monkeypatch.setattr(app, "agent_builder", object())
+    monkeypatch.setattr(app, "_open_turn", open_turn)
+    monkeypatch.setattr(app, "_close_turn", close_turn)
+    monkeypatch.setattr(app.agent_cache, "release", released.append)
+    monkeypatch.setattr(app, "STREAM_COALESCE_BYTES", 4)
+    return app, closed, released
+
+
+def test_sse_disconnect_persists_the_partial_reply(monkeypatch):
+    stream = TokenStream(["ab", "cd", "ef", "gh"], delays={2: 0.05})
+    agent = make_agent(stream)
+    app, closed, released = patch_turns(monkeypatch, agent)
+
+    async def scenario():
+        response = await app.stream_chat_with_agent("agent", app.ChatRequest(message="hi"))
+        body = response.body_iterator
+        first = await body.__anext__()
+        # The client goes away while the next frame is still being generated
+        await body.aclose()
+        await agent.close()
+        return first
+
+    assert json.loads(asyncio.run(scenario())[len("data: "):])["content"] == "abcd"
+    assert closed == ["abcd"] and released == [] and stream.closed
+    assert agent.thread.get_last_message("assistant").content == "abcd"
+
+
+def test_sse_upstream_failure_keeps_the_partial_reply(monkeypatch):
+    agent = make_agent(FailingStream(["ab", "cd", "e"]))
+    app, closed, released = patch_turns(monkeypatch, agent)
+
+    async def scenario():
+        response = await app.stream_chat_with_agent("agent", app.ChatRequest(message="hi"))
+        body = [json.loads(event[len("data: "):]) async for event in response.body_iterator]
+        await agent.close()
+        return body
+
+    events = asyncio.run(scenario())
+    # "e" was still buffered in the coalescer when the upstream failed
+    assert events == [{"content": "abcd", "done": False}, {"error": "upstream went away"}]
+    assert closed == ["abcd"] and released == []
+
+
+def test_sse_failure_before_any_content_only_releases(monkeypatch):
+    agent = make_agent(FailingStream([]))
+    app, closed, released = patch_turns(monkeypatch, agent)
+
+    async def scenario():
+        response = await app.stream_chat_with_agent("agent", app.ChatRequest(message="hi"))
+        body = [event async for event in response.body_iterator]
+        await agent.close()
+        return body
+
+    assert "upstream went away" in asyncio.run(scenario())[0]
+    assert closed == [] and len(released) == 1
+    assert agent.thread.count_messages("assistant") == 0
@@ -0,0 +1,132 @@
+"""Tests for the BM25 inverted index and InMemoryContextProvider ranking."""
+
+import asyncio
+import heapq
+import random
+
+from microsoft_agent_framework.core.context_provider import InMemoryContextProvider
+from microsoft_agent_framework.core.text_index import BM25Index, tokenize
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize("The Quick brown fox, and THE dog!") == ["quick", "brown", "fox", "dog"]
+
+
+def test_rare_terms_outrank_common_ones_and_ties_favour_newer_documents():
+    index = BM25Index()
+    index.add("a", "python deployment guide")
+    index.add("b", "python packaging notes")
+    index.add("c", "python packaging notes")
+    index.add("d", "kubernetes deployment")
+
+    assert [doc_id for doc_id, _ in index.search("deployment")] == ["d", "a"]
+    assert index.search("python kubernetes", limit=1)[0][0] == "d"
+    # b and c score the same; the newer one comes first
+    assert [doc_id for doc_id, _ in index.search("packaging")] == ["c", "b"]
+    assert index.search("the and of") == []
+    assert index.search("python", limit=0) == []
+
+
+def test_replace_and_remove_keep_the_index_current():
+    index = BM25Index()
+    index.add("a", "alpha beta")
+    index.add("b", "beta gamma")
+    index.add("a", "delta")
+
+    assert [doc_id for doc_id, _ in index.search("alpha beta")] == ["b"]
+    assert index.remove("b")
+    assert not index.remove("b")
+    assert index.search("beta") == []
+    assert index.get_stats() == {"documents": 1, "terms": 1, "avg_document_length": 1.0}
+
+
+def make_corpus(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(60)]
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return [" ".join(rng.choices(words, weights=weights, k=rng.randint(3, 15))) for _ in range(count)]
+
+
+def assert_champions_are_best_postings(index: BM25Index):
+    for term, champions in index._champions.items():
+        postings = index._postings[term]
+        ranked = heapq.nsmallest(len(champions), (
+            (-tf / (tf + index._doc_norms[doc_id]), -index._doc_order[doc_id], doc_id)
+            for doc_id, tf in postings.items()
+        ))
+        assert champions == ranked, term
+    for term, postings in index._postings.items():
+        assert (len(postings) > index.champion_size) == (term in index._champions), term
+
+
+def test_champion_lists_track_adds_and_removes():
+    rng = random.Random(3)
+    index = BM25Index(champion_size=8)
+    live = []
+    for i, text in enumerate(make_corpus(400)):
+        index.add(f"d{i}", text)
+        live.append(f"d{i}")
+        if rng.random() < 0.3:
+            index.remove(live.pop(rng.randrange(len(live))))
+        if rng.random() < 0.1:
+            index.add(rng.choice(live), rng.choice(make_corpus(5, seed=i)))
+    assert_champions_are_best_postings(index)
+
+
+def test_champion_search_returns_exact_scores():
+    bounded = BM25Index(champion_size=16)
+    exhaustive = BM25Index(champion_size=None)
+    for i, text in enumerate(make_corpus(500)):
+        bounded.add(f"d{i}", text)
+        exhaustive.add(f"d{i}", text)
+
+    recalled = 0
+    for query in ["w0 w1", "w5 w17 w40", "w2 w33", "w59", "w3 w4 w5 w6"]:
+        expected = exhaustive.search(query, limit=5)
+        found = bounded.search(query, limit=5)
+        exact_scores = dict(exhaustive.search(query, limit=len(exhaustive)))
+        for doc_id, score in found:
+            assert abs(score - exact_scores[doc_id]) < 1e-9
+        assert [score for _, score in found] == sorted((score for _, score in found), reverse=True)
+        recalled += len({doc_id for doc_id, _ in found} & {doc_id for doc_id, _ in expected})
+    assert recalled >= 20
+
+    # Terms rarer than the champion size are scored exhaustively
+    assert bounded.search("w59", limit=50) == exhaustive.search("w59", limit=50)
+
+
+def test_in_memory_provider_ranks_updates_and_deletes():
+    async def scenario():
+        provider = InMemoryContextProvider()
+        first = await provider.add_context("User: how do I deploy to kubernetes?", {"turn": 1})
+        second = await provider.add_context("User: what is the weather today?")
+        await provider.add_context("User: python packaging question")
+
+        results = await provider.get_context("kubernetes deploy steps")
+        assert [result["id"] for result in results] == [first]
+        assert results[0]["metadata"] == {"turn": 1} and results[0]["score"] > 0
+
+        assert await provider.update_context(first, "User: unrelated now")
+        assert await provider.get_context("kubernetes") == []
+        assert await provider.delete_context(second)
+        assert await provider.get_context("weather") == []
+
+    asyncio.run(scenario())
+
+
+def test_provider_ranking_is_exact_unless_champions_are_requested():
+    corpus = make_corpus(500)
+    exhaustive = BM25Index(champion_size=None)
+
+    async def scenario(**options):
+        provider = InMemoryContextProvider(**options)
+        for text in corpus:
+            context_id = await provider.add_context(text)
+            exhaustive.add(context_id, text)
+        return provider
+
+    exact = asyncio.run(scenario())
+    assert exact._index.champion_size is None
+    for query in ["w0 w1", "w2 w33", "w3 w4 w5 w6"]:
+        assert exact._index.search(query, limit=5) == exhaustive.search(query, limit=5)
+    assert asyncio.run(scenario(champion_size=16))._index.champion_size == 16
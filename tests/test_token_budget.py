@@ -0,0 +1,129 @@
+"""Tests for context-window-aware prompt budgeting."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from microsoft_agent_framework.core.agent_thread import SUMMARY_PREFIX
+from microsoft_agent_framework.core.base_agent import ChatCompletionAgent
+from microsoft_agent_framework.core.token_budget import TokenBudget, get_context_window
+from microsoft_agent_framework.core.tokens import estimate_messages_tokens
+
+
+class SummaryClient:
+    """Fake Groq client that records summarization requests."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.transcripts = []
+        self.config = SimpleNamespace(model="llama3-8b-8192", max_tokens=100)
+
+    async def async_chat_completion(self, messages, **kwargs):
+        if self.fail:
+            raise RuntimeError("summarizer down")
+        self.transcripts.append(messages[-1].content)
+        return SimpleNamespace(content=f"summary #{len(self.transcripts)}")
+
+
+def conversation(turns: int):
+    messages = [{"role": "system", "content": "You are helpful."}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"question {i} " + "word " * 40})
+        messages.append({"role": "assistant", "content": f"answer {i} " + "word " * 40})
+    messages.append({"role": "user", "content": "latest question"})
+    return messages
+
+
+def test_prompt_budget_reserves_completion_tokens():
+    assert get_context_window("unknown-model") == 8192
+    budget = TokenBudget(safety_margin=1.0)
+    assert budget.prompt_budget("llama3-8b-8192", 1000) == 7192
+    assert TokenBudget(max_prompt_tokens=500).prompt_budget("llama3-8b-8192", 1000) == 500
+    with pytest.raises(ValueError):
+        TokenBudget(strategy="truncate_middle")
+
+
+def test_messages_within_budget_are_untouched():
+    messages = conversation(2)
+    budget = TokenBudget(max_prompt_tokens=10_000)
+    assert asyncio.run(budget.fit(messages, "llama3-8b-8192", 100)) is messages
+
+
+def test_drop_oldest_keeps_pinned_messages_and_newest_history():
+    messages = conversation(20)
+    budget = TokenBudget(max_prompt_tokens=400)
+    fitted = asyncio.run(budget.fit(messages, "llama3-8b-8192", 100))
+
+    assert estimate_messages_tokens(fitted) <= 400
+    assert fitted[0] == messages[0]
+    assert fitted[-1] == messages[-1]
+    # What survives is a contiguous run of the most recent history
+    kept = fitted[1:-1]
+    assert kept and kept == messages[-1 - len(kept):-1]
+
+
+def test_summarize_oldest_extends_the_running_summary_incrementally():
+    client = SummaryClient()
+    budget = TokenBudget(strategy="summarize_oldest", max_prompt_tokens=800, summary_max_tokens=100)
+
+    messages = conversation(20)
+    fitted = asyncio.run(budget.fit(messages, "llama3-8b-8192", 100, groq_client=client))
+    assert fitted[1] == {"role": "system", "content": f"{SUMMARY_PREFIX}summary #1"}
+    assert fitted[-1] == messages[-1]
+    assert len(client.transcripts) == 1
+
+    # Same history again: the cached summary is reused without another call
+    asyncio.run(budget.fit(messages, "llama3-8b-8192", 100, groq_client=client))
+    assert len(client.transcripts) == 1
+
+    # Two more turns: only the newly dropped messages are folded into the summary
+    longer = messages[:-1] + conversation(2)[1:]
+    fitted = asyncio.run(budget.fit(longer, "llama3-8b-8192", 100, groq_client=client))
+    assert fitted[1]["content"] == f"{SUMMARY_PREFIX}summary #2"
+    assert client.transcripts[1].startswith("Earlier summary:\nsummary #1")
+    assert "question 0 " not in client.transcripts[1]
+
+
+def test_failed_summarization_falls_back_to_dropping():
+    budget = TokenBudget(strategy="summarize_oldest", max_prompt_tokens=800, summary_max_tokens=100)
+    fitted = asyncio.run(budget.fit(conversation(20), "llama3-8b-8192", 100, groq_client=SummaryClient(fail=True)))
+    assert not any(msg["content"].startswith(SUMMARY_PREFIX) for msg in fitted)
+    assert estimate_messages_tokens(fitted) <= 800
+
+
+def test_running_summary_is_not_reused_after_clear_thread():
+    client = SummaryClient()
+    budget = TokenBudget(strategy="summarize_oldest", max_prompt_tokens=800, summary_max_tokens=100)
+    agent = ChatCompletionAgent("You are helpful.", "tester", groq_client=client, token_budget=budget)
+
+    def fill(label: str):
+        for i in range(20):
+            agent.thread.add_user_message(f"{label} question {i} " + "word " * 40)
+            agent.thread.add_assistant_message(f"{label} answer {i} " + "word " * 40)
+        agent.thread.add_user_message("latest question")
+
+    fill("old")
+    asyncio.run(agent._prepare_messages("latest question"))
+    assert len(client.transcripts) == 1
+
+    # The regrown thread drops as many messages as before, but different ones
+    agent.clear_thread()
+    fill("new")
+    fitted = asyncio.run(agent._prepare_messages("latest question"))
+
+    assert len(client.transcripts) == 2
+    assert not client.transcripts[1].startswith("Earlier summary:")
+    assert "old question" not in client.transcripts[1]
+    assert fitted[1]["content"] == f"{SUMMARY_PREFIX}summary #2"
+
+
+def test_running_summary_is_reset_when_dropped_prefix_changes():
+    client = SummaryClient()
+    budget = TokenBudget(strategy="summarize_oldest", max_prompt_tokens=800, summary_max_tokens=100)
+    asyncio.run(budget.fit(conversation(20), "llama3-8b-8192", 100, groq_client=client))
+
+    other = [dict(msg, content=msg["content"].replace("question", "query")) for msg in conversation(20)]
+    asyncio.run(budget.fit(other, "llama3-8b-8192", 100, groq_client=client))
+    assert len(client.transcripts) == 2
+    assert "Earlier summary:" not in client.transcripts[1]
@@ -0,0 +1,116 @@
+"""Tests for tool schemas and parallel tool execution."""
+
+import asyncio
+import json
+import time
+from typing import List, Optional, Union
+
+from microsoft_agent_framework.core.tool_calling import ToolExecutor, build_tool_schema
+
+
+def call(name: str, call_id: str, **arguments):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+
+def test_schema_unwraps_optional_and_pep604_unions():
+    def search(query: str, limit: int | None = None, tags: Optional[List[str]] = None,
+               score: float | int = 0.0, exact: Union[bool, None] = None) -> str:
+        """Tool: Search the index."""
+
+    schema = build_tool_schema("search", search)
+    params = schema["function"]["parameters"]
+    assert schema["function"]["description"] == "Search the index."
+    assert params["required"] == ["query"]
+    assert params["properties"] == {
+        "query": {"type": "string"},
+        "limit": {"type": "integer"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "score": {},
+        "exact": {"type": "boolean"},
+    }
+
+
+def test_calls_run_concurrently_and_keep_call_order():
+    async def slow(delay: float) -> str:
+        await asyncio.sleep(delay)
+        return f"slept {delay}"
+
+    def sync_tool(value: int) -> dict:
+        time.sleep(0.05)
+        return {"value": value}
+
+    executor = ToolExecutor(timeout=1.0)
+    tools = {"slow": slow, "sync_tool": sync_tool}
+    calls = [call("slow", "a", delay=0.1), call("sync_tool", "b", value=3), call("slow", "c", delay=0.05)]
+
+    started = time.perf_counter()
+    results = asyncio.run(executor.run_calls(calls, tools))
+    assert time.perf_counter() - started < 0.2
+
+    assert [r["tool_call_id"] for r in results] == ["a", "b", "c"]
+    assert [r["content"] for r in results] == ["slept 0.1", '{"value": 3}', "slept 0.05"]
+
+
+def test_failures_are_reported_to_the_model():
+    async def hang() -> str:
+        await asyncio.sleep(1)
+
+    def broken() -> str:
+        raise ValueError("boom")
+
+    executor = ToolExecutor(timeout=0.05)
+    tools = {"hang": hang, "broken": broken}
+    bad_arguments = {"id": "d", "function": {"name": "broken", "arguments": "{not json"}}
+    results = asyncio.run(executor.run_calls(
+        [call("hang", "a"), call("broken", "b"), call("missing", "c"), bad_arguments], tools
+    ))
+
+    assert "timed out" in results[0]["content"]
+    assert results[1]["content"] == "Error: tool 'broken' failed: boom"
+    assert results[2]["content"] == "Error: unknown tool 'missing'"
+    assert results[3]["content"].startswith("Error: invalid arguments for 'broken'")
+
+
+def test_concurrency_cap_holds_in_every_event_loop():
+    running = 0
+    peak = 0
+
+    async def tracked() -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return "ok"
+
+    executor = ToolExecutor(max_concurrency=2)
+    calls = [call("tracked", str(i)) for i in range(6)]
+    for _ in range(2):
+        # A fresh loop per run, as in repeated asyncio.run() calls
+        results = asyncio.run(executor.run_calls(calls, {"tracked": tracked}))
+        assert [r["content"] for r in results] == ["ok"] * 6
+    assert peak == 2
+
+
+def test_bound_methods_keep_their_registered_metadata():
+    from microsoft_agent_framework.core.agent_builder import AgentBuilder
+    from microsoft_agent_framework.core.groq_client import GroqClient, GroqConfig
+
+    class Files:
+        def read_file(self, path: str) -> str:
+            return path
+
+    files = Files()
+    builder = AgentBuilder(GroqClient(GroqConfig(api_key="test-key")))
+    schema = {"type": "object", "properties": {"path": {"type": "string"}}, "required": ["path"]}
+    builder.register_tool("read_file", files.read_file, "Read content from a file", schema)
+    builder.register_tool("read_again", files.read_file)
+
+    agent = builder.create_custom_agent("reader", "read things", tools=["read_file", "read_again", "missing"])
+    assert agent.tools["read_file"] == files.read_file
+    assert agent.tool_schemas["read_file"]["function"]["description"] == "Read content from a file"
+    assert agent.tool_schemas["read_file"]["function"]["parameters"] == schema
+    # Without registered metadata the schema comes from the signature
+    assert agent.tool_schemas["read_again"]["function"]["description"] == "read_again"
+    assert agent.tool_schemas["read_again"]["function"]["parameters"]["required"] == ["path"]
+    assert set(agent.tools) == {"read_file", "read_again"}
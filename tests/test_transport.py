@@ -0,0 +1,89 @@
+"""Tests for the shared Groq transport registry."""
+
+import asyncio
+import gc
+import uuid
+
+from microsoft_agent_framework.core.groq_client import GroqClient, GroqConfig
+from microsoft_agent_framework.core.transport import TransportRegistry, TransportSettings
+
+
+def make_client(base_url: str) -> GroqClient:
+    # A unique key gives each test its own transport in the global registry
+    return GroqClient(GroqConfig(api_key=f"test-{uuid.uuid4()}", base_url=base_url, retry_attempts=1))
+
+
+def test_client_works_across_event_loops(groq_stub):
+    server, base_url = groq_stub
+    client = make_client(base_url)
+
+    async def ask():
+        response = await client.async_chat_completion([{"role": "user", "content": "hi"}])
+        return response.content, client.async_client
+
+    first, first_async_client = asyncio.run(ask())
+    second, second_async_client = asyncio.run(ask())
+
+    assert first == second == "stub reply"
+    assert server.requests == 2
+    assert first_async_client is not second_async_client
+
+
+def test_async_clients_are_shared_within_a_loop(groq_stub):
+    _, base_url = groq_stub
+    first = make_client(base_url)
+    second = GroqClient(first.config)
+
+    async def clients():
+        return first.async_client, second.async_client
+
+    one, two = asyncio.run(clients())
+    assert one is two
+    assert first.client is second.client
+    assert first.transport is second.transport
+
+
+def test_closed_loops_release_their_pools():
+    registry = TransportRegistry()
+    transport = registry.get_transport("key", settings=TransportSettings())
+
+    async def touch():
+        transport.async_http_client
+        return transport.pool_stats()["event_loops"]
+
+    assert asyncio.run(touch()) == 1
+    # The first loop's pool is not counted or reused once that loop is closed
+    assert asyncio.run(touch()) == 1
+    assert transport.pool_stats()["event_loops"] == 0
+    # Neither pool could be closed on its own loop
+    gc.collect()
+    assert transport.stats.orphaned_pools == 2
+
+    asyncio.run(registry.close())
+    assert transport.http_client.is_closed
+    assert transport.stats.orphaned_pools == 2
+
+
+def test_pool_of_the_closing_loop_is_closed():
+    registry = TransportRegistry()
+    transport = registry.get_transport("key", settings=TransportSettings())
+
+    async def open_and_close():
+        pool = transport.async_http_client
+        await registry.close()
+        return pool
+
+    assert asyncio.run(open_and_close()).is_closed
+    assert transport.stats.orphaned_pools == 0
+
+
+def test_closed_clients_detach_from_the_transport():
+    config = GroqConfig(api_key=f"test-{uuid.uuid4()}", retry_attempts=1)
+    first, second = GroqClient(config), GroqClient(config)
+    assert first.get_pool_stats()["clients_attached"] == 2
+
+    first.close()
+    first.close()
+    assert second.get_pool_stats()["clients_attached"] == 1
+    asyncio.run(second.aclose())
+    assert second.get_pool_stats()["clients_attached"] == 0
@@ -0,0 +1,88 @@
+"""Tests for the embedding-based context provider."""
+
+import asyncio
+
+import numpy as np
+
+from microsoft_agent_framework.core.vector_context import HashingEmbedder, VectorContextProvider
+
+
+class SlowEmbedder(HashingEmbedder):
+    """Hashing embedder that yields to the event loop before answering."""
+
+    def __init__(self, delay: float = 0.02):
+        super().__init__(dimension=64)
+        self.delay = delay
+
+    async def embed(self, texts):
+        await asyncio.sleep(self.delay)
+        return await super().embed(texts)
+
+
+def test_hashing_embeddings_are_normalized_and_stable():
+    embedder = HashingEmbedder(dimension=128)
+    vectors = asyncio.run(embedder.embed(["deploy the service", "deploy the service", "the and of"]))
+    assert vectors.shape == (3, 128) and vectors.dtype == np.float32
+    assert abs(float(np.linalg.norm(vectors[0])) - 1.0) < 1e-5
+    assert np.array_equal(vectors[0], vectors[1])
+    # Stopword-only text embeds to the zero vector
+    assert not vectors[2].any()
+
+
+def test_ranks_by_similarity_and_keeps_rows_dense_across_deletes():
+    async def scenario():
+        provider = VectorContextProvider(initial_capacity=2)
+        ids = await provider.add_contexts([
+            {"content": "kubernetes deployment rollout"},
+            {"content": "weather forecast for tomorrow", "metadata": {"topic": "weather"}},
+            {"content": "python packaging with wheels"},
+        ])
+        extra = await provider.add_context("kubernetes pods crash looping")
+        assert provider._vectors.shape[0] == 4 and len(provider) == 4
+
+        results = await provider.get_context("kubernetes deployment", limit=2)
+        assert [result["id"] for result in results] == [ids[0], extra]
+        assert results[0]["score"] > results[1]["score"] > 0
+
+        assert await provider.delete_context(ids[0])
+        assert not await provider.delete_context(ids[0])
+        assert sorted(provider._rows.values()) == [0, 1, 2]
+        assert all(provider._row_ids[row] == context_id for context_id, row in provider._rows.items())
+
+        results = await provider.get_context("weather tomorrow")
+        assert [result["id"] for result in results] == [ids[1]]
+        assert results[0]["metadata"] == {"topic": "weather"}
+        assert await provider.get_context("completely unrelated words") == []
+
+    asyncio.run(scenario())
+
+
+def test_update_replaces_the_vector():
+    async def scenario():
+        provider = VectorContextProvider()
+        context_id = await provider.add_context("kubernetes deployment")
+        assert await provider.update_context(context_id, "weather forecast")
+        assert await provider.get_context("kubernetes") == []
+        assert [result["id"] for result in await provider.get_context("weather")] == [context_id]
+        assert not await provider.update_context("missing", "anything")
+
+    asyncio.run(scenario())
+
+
+def test_update_and_query_tolerate_deletes_during_embedding():
+    async def scenario():
+        provider = VectorContextProvider(embedder=SlowEmbedder())
+        first = await provider.add_context("kubernetes deployment")
+        second = await provider.add_context("kubernetes rollout")
+
+        update = asyncio.create_task(provider.update_context(first, "weather forecast"))
+        query = asyncio.create_task(provider.get_context("kubernetes"))
+        await asyncio.sleep(0)
+        await provider.delete_context(first)
+        await provider.delete_context(second)
+
+        assert await update is False
+        assert await query == []
+        assert len(provider) == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,109 @@
+"""Tests for write-behind persistence queues."""
+
+import asyncio
+
+from microsoft_agent_framework.core.context_provider import InMemoryContextProvider
+from microsoft_agent_framework.core.write_behind import ContextWriteBehind, WriteBehindQueue, flush_write_queues
+
+
+class RecordingStore:
+    """Batch writer that records batches and can be slowed down or made to fail."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.batches = []
+
+    async def write_batch(self, items):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("store unavailable")
+        self.batches.append(list(items))
+
+
+def test_submits_return_before_the_write_and_are_batched():
+    store = RecordingStore(delay=0.01)
+    queue = WriteBehindQueue(store.write_batch, batch_size=4, max_delay=0.05)
+
+    async def scenario():
+        for i in range(10):
+            await queue.submit(i)
+        assert store.batches == [] and queue.pending > 0
+        await queue.flush()
+        assert queue.pending == 0
+        await queue.close()
+
+    asyncio.run(scenario())
+    assert [item for batch in store.batches for item in batch] == list(range(10))
+    assert all(len(batch) <= 4 for batch in store.batches) and len(store.batches) == 3
+    assert queue.get_stats() == {"submitted": 10, "written": 10, "failed": 0, "batches": 3, "retries": 0, "pending": 0}
+
+
+def test_full_buffer_applies_backpressure():
+    store = RecordingStore(delay=0.05)
+    queue = WriteBehindQueue(store.write_batch, max_pending=2, batch_size=1, max_delay=0)
+
+    async def scenario():
+        for i in range(2):
+            await queue.submit(i)
+        # The worker holds one item in flight, so the buffer has room for one more
+        await asyncio.sleep(0)
+        await queue.submit(2)
+        blocked = asyncio.create_task(queue.submit(3))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        await blocked
+        await queue.close()
+
+    asyncio.run(scenario())
+    assert [batch[0] for batch in store.batches] == [0, 1, 2, 3]
+
+
+def test_failed_batches_are_retried_then_dropped():
+    store = RecordingStore(failures=1)
+    queue = WriteBehindQueue(store.write_batch, max_retries=1, max_delay=0)
+
+    async def scenario():
+        await queue.submit("kept")
+        await queue.flush()
+        store.failures = 2
+        await queue.submit("dropped")
+        await queue.flush()
+        await queue.submit("after")
+        await queue.close()
+
+    asyncio.run(scenario())
+    assert store.batches == [["kept"], ["after"]]
+    stats = queue.get_stats()
+    assert stats["failed"] == 1 and stats["retries"] == 2 and stats["written"] == 2
+
+
+def test_queue_is_usable_from_successive_event_loops():
+    store = RecordingStore()
+    queue = WriteBehindQueue(store.write_batch, max_delay=0)
+
+    async def write(item):
+        await queue.submit(item)
+        await queue.flush()
+
+    asyncio.run(write("first"))
+    asyncio.run(write("second"))
+    assert store.batches == [["first"], ["second"]]
+
+
+def test_context_writes_reach_the_provider_on_shutdown_flush():
+    provider = InMemoryContextProvider()
+    writer = ContextWriteBehind(provider, max_delay=1.0)
+
+    async def scenario():
+        await writer.submit("User: kubernetes question", {"agent": "ops"})
+        await writer.submit("User: weather question")
+        assert provider.contexts == {}
+        await flush_write_queues()
+
+    asyncio.run(scenario())
+    assert [entry["content"] for entry in provider.contexts.values()] == [
+        "User: kubernetes question", "User: weather question"
+    ]
+    assert provider.contexts["ctx_1"]["metadata"] == {"agent": "ops"}